@@ -1,13 +1,20 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
+
+from compdeck.live import follow, live_mode, present
+from compdeck.render import section_registry
+from compdeck.search import search_box
+from compdeck.spec import DeckSpecError, load_deck
+
+try:
+    deck = load_deck()
+except DeckSpecError as e:
+    st.error(f"**Deck spec error:** {e}")
+    st.stop()
 
 # Page config
 st.set_page_config(
-    page_title="AI Compliance Platform - Implementation Strategy",
-    page_icon="🚀",
+    page_title=deck.page["title"],
+    page_icon=deck.page.get("icon"),
     layout="wide"
 )
 
@@ -17,17 +24,18 @@ st.markdown("""
     .main {
         padding: 0rem 1rem;
     }
-    .stTabs [data-baseweb="tab-list"] {
+    /* Section navigation only: its radio group is labelled "Section" */
+    div[role="radiogroup"][aria-label="Section"] {
         gap: 8px;
     }
-    .stTabs [data-baseweb="tab"] {
+    div[role="radiogroup"][aria-label="Section"] label {
         height: 50px;
         padding-left: 20px;
         padding-right: 20px;
         background-color: #f0f2f6;
         border-radius: 5px;
     }
-    .stTabs [aria-selected="true"] {
+    div[role="radiogroup"][aria-label="Section"] label:has(input:checked) {
         background-color: #1f77b4;
         color: white;
     }
@@ -54,724 +62,42 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Header
-st.title("🚀 AI Compliance Platform")
-st.markdown("### Streamlined Implementation Strategy")
+st.title(deck.page["heading"])
+st.markdown(f"### {deck.page['subheading']}")
 st.markdown("---")
 
-# Create tabs
-tabs = st.tabs([
-    "📋 Overview",
-    "🎯 Strategy Shift",
-    "1️⃣ Org Setup",
-    "2️⃣ Team Engagement", 
-    "3️⃣ Partner Acquisition",
-    "4️⃣ Demo Development",
-    "5️⃣ Full Build",
-    "6️⃣ Partner Pilot",
-    "📊 Timeline",
-    "💰 Budget"
-])
-
-# Tab 1: Overview
-with tabs[0]:
-    st.header("Executive Summary")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.info("**🎯 Core Objective**\n\nBuild an AI-powered campaign finance compliance platform that reduces processing time from hours to seconds while maintaining >95% accuracy.")
-        
-        st.subheader("Key Success Metrics")
-        metrics_col1, metrics_col2 = st.columns(2)
-        with metrics_col1:
-            st.metric("Processing Time", "<30 sec", "-99% reduction")
-            st.metric("Accuracy Target", ">95%", "+15% vs manual")
-        with metrics_col2:
-            st.metric("System Uptime", ">99%", "Enterprise SLA")
-            st.metric("Time to Market", "24 weeks", "With validation")
-        
-        # Add a bar chart for time comparison with plotly
-        st.subheader("⏱️ Processing Time Comparison")
-        
-        fig1 = go.Figure(data=[
-            go.Bar(
-                x=['Manual Process', 'AI Platform'],
-                y=[180, 0.5],
-                text=['180 minutes', '0.5 minutes'],
-                textposition='outside',
-                marker_color=['#ff6b6b', '#4ecdc4']
-            )
-        ])
-        
-        fig1.update_layout(
-            yaxis_title="Time (Minutes)",
-            height=400,
-            showlegend=False,
-            template="plotly_white"
-        )
-        
-        st.plotly_chart(fig1, use_container_width=True)
-    
-    with col2:
-        st.success("**🤝 Partner-First Approach**\n\nSecure innovation partners BEFORE full build to ensure product-market fit, gain testimonials, and accelerate customer acquisition.")
-        
-        st.subheader("Implementation Phases")
-        
-        # Create a bar chart for timeline with plotly
-        st.subheader("📅 Project Timeline")
-        
-        phases = ['Org Setup', 'Team Engage', 'Partner Acquisition ⭐', 
-                 'Demo Dev', 'Full Build', 'Pilot Program']
-        weeks = [1, 2, 5, 5, 13, 5]
-        colors = ['#6c757d', '#6c757d', '#ffd93d', '#6c757d', '#0d6efd', '#28a745']
-        
-        fig2 = go.Figure(data=[
-            go.Bar(
-                x=phases,
-                y=weeks,
-                text=[f'{w} weeks' for w in weeks],
-                textposition='outside',
-                marker_color=colors
-            )
-        ])
-        
-        fig2.update_layout(
-            yaxis_title="Duration (Weeks)",
-            height=400,
-            showlegend=False,
-            template="plotly_white"
-        )
-        
-        st.plotly_chart(fig2, use_container_width=True)
-
-# Tab 2: Strategy Shift
-with tabs[1]:
-    st.header("🎯 Critical Strategy Shift: Partner-First Development")
-    
-    st.error("**⚠️ Key Change: Find Partners BEFORE Full Build**\n\nWe're moving partner acquisition from Week 8 to Week 2-6, running parallel with demo development.")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Why Partner-First?")
-        
-        # Create a visual representation of benefits with plotly
-        st.subheader("📊 Success Rate Improvement")
-        
-        benefits = ['First Client<br>Probability', 'Product-Market<br>Fit', 'Testimonials<br>& Referrals']
-        impact = [85, 90, 95]
-        
-        fig3 = go.Figure(data=[
-            go.Bar(
-                x=benefits,
-                y=impact,
-                text=[f'{val}%' for val in impact],
-                textposition='outside',
-                marker_color=['#ff9999', '#66b3ff', '#99ff99']
-            )
-        ])
-        
-        fig3.update_layout(
-            yaxis_title="Success Rate (%)",
-            yaxis=dict(range=[0, 100]),
-            height=400,
-            showlegend=False,
-            template="plotly_white"
-        )
-        
-        st.plotly_chart(fig3, use_container_width=True)
-        
-        st.markdown("""
-        ### Key Advantages:
-        
-        **📈 Increases First Client Probability**
-        - Partner becomes invested in success
-        - Product shaped to their needs
-        - Lower adoption barrier
-        
-        **🎯 Ensures Product-Market Fit**
-        - Build features companies need
-        - Real-world validation
-        - Avoid assumptions
-        
-        **🗣️ Testimonials Drive Growth**
-        - Most powerful B2B sales tool
-        - Peer recommendations matter
-        - Proven ROI with case studies
-        """)
-    
-    with col2:
-        st.subheader("Innovation Partner Benefits")
-        
-        # Create two columns for partner exchange
-        give_col, get_col = st.columns(2)
-        
-        with give_col:
-            st.info("""
-            **🎁 What Partners Get:**
-            - 6 months free usage
-            - First access to features
-            - Shaped to their needs
-            - Reduced pricing after
-            - Competitive advantage
-            """)
-        
-        with get_col:
-            st.warning("""
-            **💎 What We Get:**
-            - Product validation
-            - Real usage data
-            - Testimonials
-            - 2-3 referrals
-            - Case study rights
-            """)
-        
-        # Add a comparison chart with plotly grouped bar chart
-        st.subheader("📈 Development Approach Comparison")
-        
-        metrics = ['Success Rate (%)', 'Time to Revenue (mo)', 'Satisfaction (%)', 'Feature Relevance (%)']
-        traditional = [30, 12, 60, 50]
-        partner_first = [75, 6, 90, 95]
-        
-        fig4 = go.Figure(data=[
-            go.Bar(name='Traditional', x=metrics, y=traditional, marker_color='#ff7f50'),
-            go.Bar(name='Partner-First', x=metrics, y=partner_first, marker_color='#32cd32')
-        ])
-        
-        fig4.update_layout(
-            barmode='group',
-            height=350,
-            template="plotly_white",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig4, use_container_width=True)
-        
-        st.success("**🎯 Target:** Secure 1-2 innovation partners by Week 6")
-
-# Tab 3: Organizational Setup
-with tabs[2]:
-    st.header("Phase 1: Organizational Setup (Week 1)")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📧 Google Workspace Configuration")
-        st.markdown("""
-        **Domain Setup**
-        - Register primary domain
-        - Configure email routing
-        - Set up 2FA for all accounts
-        
-        **Shared Drive Structure**
-        ```
-        /Development
-        /Compliance Docs
-        /Demo Materials
-        /Partner Feedback
-        /Legal & Contracts
-        ```
-        
-        **Document Templates**
-        - Partnership agreements
-        - NDAs
-        - Innovation partner terms
-        - Feedback collection forms
-        """)
-    
-    with col2:
-        st.subheader("🏗️ Key Infrastructure Decisions")
-        
-        decisions = {
-            "Decision": ["Cloud Provider", "Database", "API Services", "Frontend", "Monitoring", "CI/CD"],
-            "Options": [
-                "AWS vs GCP vs Azure",
-                "PostgreSQL vs MongoDB",
-                "Claude + OCR + Embeddings",
-                "React vs Vue vs Angular",
-                "DataDog vs New Relic",
-                "GitHub Actions vs GitLab"
-            ],
-            "Priority": ["Critical", "Critical", "Critical", "High", "Medium", "Medium"]
-        }
-        
-        df = pd.DataFrame(decisions)
-        st.dataframe(df, use_container_width=True)
-        
-        st.warning("⚠️ **Action Required:** Cloud provider choice affects all downstream decisions")
-
-# Tab 4: Team Engagement
-with tabs[3]:
-    st.header("Phase 2: Outsourced Team Engagement (Weeks 1-2)")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📝 Contract Components")
-        
-        st.markdown("""
-        **Scope of Work**
-        - Cloud infrastructure setup
-        - API integration framework
-        - Basic data pipeline
-        - Dev/staging environments
-        - Cost monitoring setup
-        
-        **Timeline & Payment**
-        - 4-6 week initial engagement
-        - Milestone-based payments
-        - Option to extend for full build
-        
-        **IP & Legal**
-        - All work product owned by company
-        - Standard NDA required
-        - Code review rights
-        """)
-        
-    with col2:
-        st.subheader("🚀 Kickoff Tasks")
-        
-        tasks = [
-            {"Task": "Cloud platform access", "Owner": "CTO", "Day": 1},
-            {"Task": "API keys provisioning", "Owner": "CTO", "Day": 1},
-            {"Task": "Architecture review", "Owner": "Both", "Day": 2},
-            {"Task": "Development env setup", "Owner": "Team", "Day": 3},
-            {"Task": "Weekly sync schedule", "Owner": "CTO", "Day": 1},
-            {"Task": "Code repository setup", "Owner": "Team", "Day": 2}
-        ]
-        
-        st.dataframe(pd.DataFrame(tasks), use_container_width=True)
-        
-        st.info("💡 **Tip:** Set up daily standups for first week, then move to 3x/week")
+# Section registry: label -> render function. Only the selected section runs
+# on a rerun, so the cost of a click no longer scales with the whole deck.
+SECTIONS = section_registry(deck)
 
-# Tab 5: Partner Acquisition
-with tabs[4]:
-    st.header("Phase 3: Partner Acquisition (Weeks 2-6) 🆕")
-    
-    st.success("🎯 **Goal:** Secure 1-2 innovation partners BEFORE full build begins")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📋 Target Partner Profile")
-        st.markdown("""
-        **Must-Have Criteria**
-        - ✅ Processing 500+ contributions/month
-        - ✅ Multiple jurisdiction reporting
-        - ✅ Currently using 3+ FTEs for compliance
-        - ✅ Willing to provide weekly feedback
-        
-        **Nice-to-Have**
-        - Industry thought leader
-        - Connected to other potential clients
-        - Willing to be public reference
-        - Has budget for solution (post-pilot)
-        """)
-        
-        st.subheader("🎁 Innovation Partner Offer")
-        st.markdown("""
-        <div class="highlight-box">
-        <h4>Partnership Terms</h4>
-        <ul>
-        <li><b>6 months free</b> usage during development</li>
-        <li><b>50% discount</b> for year 1 after launch</li>
-        <li><b>Priority support</b> and feature requests</li>
-        <li><b>Co-marketing</b> opportunities</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col2:
-        st.subheader("📊 Partner Commitments")
-        st.markdown("""
-        **Time Investment**
-        - Weekly 30-min feedback sessions
-        - Monthly strategic review (1 hour)
-        - Access to compliance team for questions
-        
-        **Data & Testing**
-        - Provide anonymized test data
-        - Side-by-side accuracy testing
-        - Real-world use case validation
-        
-        **Growth Support**
-        - Case study participation
-        - 2-3 qualified referrals
-        - Speaking opportunities/webinars
-        """)
-        
-        st.subheader("🔄 Outreach Process")
-        process = pd.DataFrame({
-            "Week": ["2", "3", "4", "5", "6"],
-            "Activity": [
-                "Identify 20 targets",
-                "Initial outreach (10)",
-                "Demo meetings (5)",
-                "Deep dives (3)",
-                "Close 1-2 partners"
-            ],
-            "Success Metric": [
-                "List complete",
-                "50% response rate",
-                "5 demos scheduled",
-                "3 interested",
-                "Terms signed"
-            ]
-        })
-        st.dataframe(process, use_container_width=True)
+# Live mode: ?live=present publishes the presenter's section; ?live=follow
+# sessions mirror it from the shared recording instead of navigating and
+# rendering it themselves (see compdeck.live).
+mode = live_mode()
+if mode == "follow":
+    st.caption("📡 Following the presenter live")
+    section = st.empty()
+else:
+    # Sidebar search: a result's button selects its section in the radio below
+    search_box(deck)
 
-# Tab 6: Demo Development
-with tabs[5]:
-    st.header("Phase 4: CTO-Led Demo Development (Weeks 2-6)")
-    
-    st.info("📌 **Note:** Demo development runs parallel with partner acquisition")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🎯 Core AI Showcase Features")
-        st.markdown("""
-        **Processing Pipeline Demo**
-        1. Upload contribution check (PDF/Image)
-        2. OCR extraction with confidence scores
-        3. Automated data validation
-        4. Multi-jurisdiction compliance check
-        5. Generate formatted reports
-        
-        **Intelligence Features**
-        - RAG-powered Q&A on regulations
-        - Political activity classification
-        - Anomaly detection
-        - Trend analysis
-        """)
-        
-        st.subheader("📊 Mock Visualizations")
-        st.markdown("""
-        - Processing speed comparison chart
-        - Compliance dashboard (multi-state)
-        - Risk scoring heatmap
-        - Monthly trend analysis
-        - Audit trail viewer
-        """)
-        
-    with col2:
-        st.subheader("🗂️ Demo Data Strategy")
-        
-        demo_data = pd.DataFrame({
-            "Data Type": [
-                "Sample contributions",
-                "Jurisdiction rules",
-                "Test scenarios",
-                "Error cases",
-                "Edge cases"
-            ],
-            "Quantity": [
-                "20-30 samples",
-                "4 states",
-                "10 scenarios",
-                "5 common errors",
-                "5 edge cases"
-            ],
-            "Purpose": [
-                "Show variety",
-                "Prove flexibility",
-                "Validate accuracy",
-                "Error handling",
-                "Robustness"
-            ]
-        })
-        st.dataframe(demo_data, use_container_width=True)
-        
-        st.warning("⚠️ **Important:** Pre-compute results for smooth demo flow")
-        
-        st.subheader("🎨 Demo Flow (30 min)")
-        st.markdown("""
-        1. **Problem Statement** (3 min)
-        2. **Live Processing Demo** (10 min)
-        3. **Compliance Q&A** (5 min)
-        4. **Dashboard Tour** (5 min)
-        5. **ROI Discussion** (5 min)
-        6. **Q&A** (2 min)
-        """)
-
-# Tab 7: Full Build
-with tabs[6]:
-    st.header("Phase 5: Full Application Build (Weeks 8-20)")
-    
-    st.success("✅ **Prerequisites:** Innovation partner(s) secured with clear requirements")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🏗️ Production Pipeline")
-        st.markdown("""
-        **Core Processing System**
-        - Robust file ingestion (all formats)
-        - Production-grade OCR pipeline
-        - Data validation & cleansing
-        - Error handling & retry logic
-        
-        **Compliance Engine**
-        - Multi-jurisdiction rule engine
-        - RAG implementation at scale
-        - Classification models
-        - Audit trail generation
-        
-        **Reporting System**
-        - Automated report generation
-        - Custom templates per jurisdiction
-        - Export capabilities (PDF, Excel, API)
-        - Scheduled reporting
-        """)
-        
-    with col2:
-        st.subheader("⚙️ Infrastructure Scaling")
-        st.markdown("""
-        **Performance & Reliability**
-        - Auto-scaling for variable loads
-        - Queue management for peaks
-        - Database optimization
-        - Caching strategy
-        
-        **Security & Compliance**
-        - SOC 2 preparation
-        - Data encryption at rest/transit
-        - Access control & audit logs
-        - GDPR/CCPA compliance
-        
-        **Monitoring & Operations**
-        - Real-time performance monitoring
-        - Alert system setup
-        - Backup & disaster recovery
-        - Cost optimization
-        """)
-    
-    st.subheader("📅 Build Sprint Plan")
-    sprints = pd.DataFrame({
-        "Sprint": [f"Sprint {i}" for i in range(1, 7)],
-        "Weeks": ["8-10", "10-12", "12-14", "14-16", "16-18", "18-20"],
-        "Focus": [
-            "Core pipeline & infrastructure",
-            "Compliance engine & RAG",
-            "Partner integrations",
-            "Reporting & visualizations",
-            "Performance & security",
-            "Testing & refinement"
-        ],
-        "Partner Checkpoint": [
-            "Data format validation",
-            "Rule accuracy review",
-            "Integration testing",
-            "Report format approval",
-            "UAT begins",
-            "Final sign-off"
-        ]
-    })
-    st.dataframe(sprints, use_container_width=True)
-
-# Tab 8: Partner Pilot
-with tabs[7]:
-    st.header("Phase 6: Partner Pilot Program (Weeks 18-22)")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🚀 Pilot Structure")
-        st.markdown("""
-        **Week 18-19: Soft Launch**
-        - Single jurisdiction focus
-        - Side-by-side with manual process
-        - Daily accuracy checks
-        - Immediate issue resolution
-        
-        **Week 20-21: Expansion**
-        - Add additional jurisdictions
-        - Increase volume gradually
-        - Reduce manual oversight
-        - Performance optimization
-        
-        **Week 22: Full Production**
-        - All jurisdictions live
-        - Manual process phased out
-        - Full automation active
-        - Success metrics achieved
-        """)
-        
-    with col2:
-        st.subheader("📊 Success Criteria")
-        
-        metrics = pd.DataFrame({
-            "Metric": [
-                "Processing Speed",
-                "Accuracy Rate",
-                "System Uptime",
-                "User Satisfaction",
-                "Cost Reduction"
-            ],
-            "Target": [
-                "<30 seconds",
-                ">95%",
-                ">99%",
-                ">4.5/5",
-                ">70%"
-            ],
-            "Measurement": [
-                "Per contribution",
-                "vs manual audit",
-                "Weekly average",
-                "NPS survey",
-                "vs current FTE cost"
-            ]
-        })
-        st.dataframe(metrics, use_container_width=True)
-        
-        st.subheader("🏆 Pilot Deliverables")
-        st.markdown("""
-        - ✅ Performance report
-        - ✅ ROI analysis
-        - ✅ Case study draft
-        - ✅ Reference agreement
-        - ✅ Testimonial video
-        - ✅ 2-3 warm referrals
-        """)
-
-# Tab 9: Timeline
-with tabs[8]:
-    st.header("📊 Integrated Timeline")
-    
-    st.markdown("""
-    <div class="highlight-box">
-    <h4>🔄 Revised Timeline with Early Partner Engagement</h4>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Create timeline visualization
-    timeline_data = pd.DataFrame({
-        "Phase": [
-            "Org Setup",
-            "Team Contracts",
-            "Partner Outreach",
-            "Demo Development",
-            "Partner Selection",
-            "Full Build",
-            "Pilot Program",
-            "Production Launch"
-        ],
-        "Start Week": [1, 1, 2, 2, 5, 8, 18, 24],
-        "End Week": [1, 2, 6, 6, 6, 20, 22, 24],
-        "Duration": [1, 2, 5, 5, 2, 13, 5, 1],
-        "Owner": [
-            "CTO",
-            "CTO",
-            "CTO/Sales",
-            "CTO/Team",
-            "CTO",
-            "Team/CTO",
-            "Partner/Team",
-            "All"
-        ]
-    })
-    
-    st.dataframe(timeline_data, use_container_width=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("Total Duration", "24 weeks", "~6 months")
-    with col2:
-        st.metric("Partner Secured By", "Week 6", "Before full build")
-    with col3:
-        st.metric("Production Launch", "Week 24", "With case study")
-    
-    st.subheader("🎯 Critical Milestones")
-    milestones = pd.DataFrame({
-        "Week": [1, 2, 6, 8, 18, 24],
-        "Milestone": [
-            "Infrastructure decision made",
-            "Outsourced team onboarded",
-            "Innovation partner(s) secured",
-            "Full build begins with requirements",
-            "Pilot program starts",
-            "Production launch with testimonials"
-        ],
-        "Success Criteria": [
-            "Cloud platform selected",
-            "First code committed",
-            "Contracts signed",
-            "Requirements documented",
-            "Partner using system",
-            "Case study published"
-        ]
-    })
-    st.dataframe(milestones, use_container_width=True)
-
-# Tab 10: Budget
-with tabs[9]:
-    st.header("💰 Budget Considerations")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Cost Breakdown")
-        
-        costs = pd.DataFrame({
-            "Category": [
-                "Outsourced Dev Team",
-                "Infrastructure/APIs",
-                "Legal (contracts)",
-                "Demo Development",
-                "Marketing/Sales",
-                "Buffer (20%)"
-            ],
-            "Monthly Cost": [
-                "$20,000",
-                "$4,000",
-                "-",
-                "$2,000",
-                "$3,000",
-                "$6,000"
-            ],
-            "6-Month Total": [
-                "$120,000",
-                "$24,000",
-                "$8,000",
-                "$6,000",
-                "$18,000",
-                "$35,000"
-            ]
-        })
-        st.dataframe(costs, use_container_width=True)
-        
-        st.metric("Total 6-Month Budget", "$211,000", "Including 20% buffer")
-        
-    with col2:
-        st.subheader("💡 ROI Projections")
-        
-        st.markdown("""
-        **Cost Savings for Partners**
-        - Current: 3 FTEs @ $180k/year = $540k
-        - With Platform: $60k/year
-        - **Annual Savings: $480k**
-        
-        **Revenue Projections**
-        - Innovation Partners: 2 @ $0 (6 months)
-        - Year 1 Customers: 10 @ $60k = $600k
-        - Year 2 Target: 50 @ $60k = $3M
-        
-        **Break-even: Month 8**
-        """)
-        
-        st.success("💰 **Payback Period:** <4 months after launch")
-    
-    st.subheader("🎯 Immediate Action Items")
-    st.markdown("""
-    1. **Today:** Choose cloud provider (AWS/GCP/Azure)
-    2. **This Week:** Finalize outsourced team contract
-    3. **This Week:** Create target partner list (20 organizations)
-    4. **Next Week:** Begin partner outreach campaign
-    5. **Next Week:** Start demo development sprint
-    """)
+    # Navigation (replaces st.tabs, which executes every tab body on each rerun);
+    # the page CSS styles it as buttons by its "Section" label
+    selected = st.radio(
+        "Section",
+        list(SECTIONS),
+        key="section",
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    if mode == "present":
+        present(selected, SECTIONS[selected])
+    else:
+        SECTIONS[selected]()
 
 # Footer
 st.markdown("---")
-st.markdown("*💡 Remember: Partner feedback drives product success. Secure partners early, build with confidence.*")
+st.markdown(deck.page["footer"])
+
+if mode == "follow":
+    follow(section)
@@ -0,0 +1,44 @@
+"""Helpers shared by the benchmark scripts."""
+
+import json
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# `streamlit run` puts the script directory on sys.path; AppTest does not.
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "min": ordered[0],
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
+
+
+def write_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def check_thresholds(measured, thresholds, where=""):
+    """Compare ``measured`` metrics against ``thresholds`` maxima.
+
+    Returns a list of human-readable failures; metrics without a threshold
+    are ignored.
+    """
+    failures = []
+    for metric, limit in thresholds.items():
+        if metric in measured and measured[metric] > limit:
+            failures.append(f"{where}{metric}={measured[metric]:.2f} exceeds {limit}")
+    return failures
@@ -0,0 +1,89 @@
+"""Throughput and state size of the streaming anomaly detector.
+
+Streams a synthetic contribution feed through ``AnomalyDetector`` with an
+increasing number of distinct donors and reports events per second and the
+detector's memory: the per-key statistic arrays plus the key-to-slot map,
+in total and per donor. Memory per donor should stay flat as donors grow.
+It also times the event-at-a-time ``detect`` path (``chunk_size=1``)
+against chunked processing of the same events.
+
+    python benchmarks/bench_anomaly.py --donors 10000,100000,1000000,3000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from _common import RESULTS_DIR, write_results
+
+from compdeck.anomaly import AnomalyDetector, synthetic_feed
+
+
+def key_map_bytes(stats):
+    return (sys.getsizeof(stats.slots) + sys.getsizeof(stats.keys)
+            + sum(sys.getsizeof(k) for k in stats.keys))
+
+
+def run(donors, events, chunk):
+    detector = AnomalyDetector()
+    feed = list(synthetic_feed(events, donors, committees=500, days=365, chunk=chunk, seed=1))
+    alerts = 0
+    start = time.perf_counter()
+    for columns in feed:
+        alerts += len(detector.update(*columns))
+    elapsed = time.perf_counter() - start
+    arrays = detector.nbytes()
+    keys = key_map_bytes(detector.donors) + key_map_bytes(detector.committees)
+    return {
+        "events": events,
+        "donors_seen": len(detector.donors),
+        "seconds": elapsed,
+        "events_per_s": events / elapsed,
+        "alerts": alerts,
+        "state_mib": arrays / 2**20,
+        "key_map_mib": keys / 2**20,
+        "bytes_per_donor": (arrays + keys) / len(detector.donors),
+    }
+
+
+def event_at_a_time(events):
+    columns = next(synthetic_feed(events, 1000, committees=50, days=30, chunk=events, seed=2))
+    stream = [{"donor": d, "committee": c, "amount": a, "day": t}
+              for d, c, a, t in zip(*(col.tolist() for col in columns))]
+    timings = {}
+    for chunk_size in (1, 4096):
+        start = time.perf_counter()
+        alerts = list(AnomalyDetector().detect(iter(stream), chunk_size=chunk_size))
+        timings[chunk_size] = (time.perf_counter() - start, len(alerts))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--donors", default="10000,100000,1000000,3000000")
+    parser.add_argument("--events-per-donor", type=float, default=4.0)
+    parser.add_argument("--chunk", type=int, default=65_536)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "anomaly.json"))
+    args = parser.parse_args(argv)
+
+    results = {"by_donors": {}}
+    for donors in (int(n) for n in args.donors.split(",")):
+        row = run(donors, int(donors * args.events_per_donor), args.chunk)
+        results["by_donors"][donors] = row
+        print(f"{donors:>10,} donors ({row['donors_seen']:>9,} seen) {row['events']:>11,} events: "
+              f"{row['events_per_s']:>11,.0f} events/s  state {row['state_mib']:7.1f} MiB "
+              f"+ key map {row['key_map_mib']:7.1f} MiB = {row['bytes_per_donor']:.0f} B/donor  "
+              f"{row['alerts']:,} alerts")
+
+    timings = event_at_a_time(20_000)
+    results["event_at_a_time"] = {str(k): {"seconds": s, "alerts": n} for k, (s, n) in timings.items()}
+    for chunk_size, (seconds, n) in timings.items():
+        print(f"detect(chunk_size={chunk_size}): 20,000 events in {seconds:.2f} s "
+              f"({20_000 / seconds:,.0f} events/s), {n} alerts")
+    write_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Multi-worker cost of the deck's expensive artifacts with and without the shared cache.
+
+Starts ``--workers`` processes that, released together, each build every
+artifact the app shares through ``compdeck.artifacts``: the budget
+simulation, the ROI sweep, the risk cube and the trained classifier. Run
+three ways: with the cache off (every worker computes everything, as with
+per-process caches only), against an empty cache (single-flight: each
+artifact should be computed by exactly one worker) and against the filled
+cache (restarted workers compute nothing).
+A last run bounds the cache to ``--small-mb`` to check LRU eviction keeps it
+under the limit. Reported per run: artifacts computed, total worker CPU and
+the slowest worker's wall time.
+
+    python benchmarks/bench_artifacts.py --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+
+def _cpu_s():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def build_all():
+    """Every shared artifact of the deck, as the app's widgets request them."""
+    from compdeck.spec import load_deck
+    from compdeck.widgets import _budget_totals, activity_classifier, risk_cube, roi_sweep
+
+    deck = load_deck()
+    models = deck.models
+    _budget_totals(models["budget"]._replace(buffer_pct=0.0), 100_000, 1.0, 0)
+    roi_sweep(models["roi"])
+    risk_cube(models["riskmap"], models["demo"].jurisdictions)
+    activity_classifier(models["classifier"])
+
+
+def worker(start, results):
+    sys.stderr = open(os.devnull, "w")  # Streamlit warns about running without a runtime
+    import compdeck.widgets  # noqa: F401  (imports are not part of the measurement)
+    from compdeck.artifacts import artifact_cache
+
+    cache = artifact_cache()
+    start.wait()
+    cpu, wall = _cpu_s(), time.perf_counter()
+    build_all()
+    results.put({"cpu_s": _cpu_s() - cpu, "wall_s": time.perf_counter() - wall, **cache.counts})
+
+
+def run(workers, env):
+    os.environ.update(env)
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    processes = [context.Process(target=worker, args=(start, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    time.sleep(2.0)  # let every worker finish importing
+    start.set()
+    reports = [results.get(timeout=900) for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "computed": sum(r["computed"] for r in reports),
+        "hits": sum(r["hits"] for r in reports),
+        "waited": sum(r["waited"] for r in reports),
+        "cpu_s": sum(r["cpu_s"] for r in reports),
+        "wall_s": summarize([r["wall_s"] for r in reports]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--small-mb", type=float, default=1.0, help="cache bound for the eviction run")
+    parser.add_argument("--workdir", default=os.path.join(RESULTS_DIR, "artifact_cache"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "artifacts.json"))
+    args = parser.parse_args(argv)
+
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    small = os.path.join(args.workdir, "small")
+    runs = {
+        "off": {"COMPDECK_CACHE": "off"},
+        "cold": {"COMPDECK_CACHE": args.workdir, "COMPDECK_CACHE_MB": "256"},
+        "warm": {"COMPDECK_CACHE": args.workdir, "COMPDECK_CACHE_MB": "256"},
+        "small": {"COMPDECK_CACHE": small, "COMPDECK_CACHE_MB": str(args.small_mb)},
+    }
+    results = {"workers": args.workers}
+    for name, env in runs.items():
+        results[name] = run(args.workers, env)
+        print(f"{name:5}: {results[name]['computed']:4} artifacts computed, {results[name]['hits']:4} read from "
+              f"the cache, {results[name]['waited']:3} waits; worker CPU {results[name]['cpu_s']:6.1f} s, "
+              f"slowest worker {results[name]['wall_s']['max']:5.1f} s")
+
+    from compdeck.artifacts import SQLiteCache
+
+    stats = SQLiteCache(args.workdir).stats()
+    bounded = SQLiteCache(small, args.small_mb * 2**20).stats()
+    results["cache"] = {"entries": stats["entries"], "bytes": stats["bytes"]}
+    results["small_cache"] = {"entries": bounded["entries"], "bytes": bounded["bytes"],
+                              "max_bytes": bounded["max_bytes"]}
+    print(f"cache: {stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MiB; bounded to {args.small_mb:g} MiB: "
+          f"{bounded['entries']} entries, {bounded['bytes'] / 2**20:.2f} MiB")
+    print(f"worker CPU {results['off']['cpu_s'] / max(results['cold']['cpu_s'], 1e-9):.1f}x lower with a cold "
+          f"shared cache, {results['off']['cpu_s'] / max(results['warm']['cpu_s'], 1e-9):.0f}x with a warm one")
+    write_results(args.output, results)
+    shutil.rmtree(args.workdir, ignore_errors=True)
+
+    artifacts = results["off"]["computed"] // args.workers
+    ok = results["cold"]["computed"] == artifacts and not results["warm"]["computed"]
+    ok = ok and bounded["bytes"] <= bounded["max_bytes"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Audit trail lookups and pages as the append-only log grows.
+
+Grows one log under ``--root`` to each size in ``--sizes`` by appending
+synthetic history in ``--chunk``-entry segments, then times, on a freshly
+opened log (cold process caches, warm OS page cache): a single
+contribution's full history, the newest page, a page deep in the log
+(keyset cursor half-way back), a page filtered by user and action, and a
+one-day time-range page. Lookups and pages should stay in milliseconds
+and flat as the log grows; only the build scales with the entries.
+
+    python benchmarks/bench_audit.py --sizes 1000000,10000000,100000000
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import time
+
+import numpy as np
+from _common import RESULTS_DIR, summarize, write_results
+
+from compdeck.audit import AuditLog, synthetic_history
+
+YEAR = 86_400 * 365
+GAP = np.timedelta64(2, "D")  # after each chunk's last entry, so appends stay in time order
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def disk_mib(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files) / 2**20
+
+
+def timed(call, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = call(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000000,10000000,100000000")
+    parser.add_argument("--chunk", type=int, default=5_000_000, help="entries per appended segment")
+    parser.add_argument("--root", default=os.path.join(RESULTS_DIR, "audit_log"))
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="keep the log directory afterwards")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "audit.json"))
+    args = parser.parse_args(argv)
+
+    shutil.rmtree(args.root, ignore_errors=True)
+    log = AuditLog(args.root)
+    rng = np.random.default_rng(0)
+    start, contributions, build_s = np.datetime64("2020-01-01", "us"), 0, 0.0
+    results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        while len(log) < size:
+            n = min(args.chunk, size - len(log))
+            begin = time.perf_counter()
+            history = synthetic_history(n, start=start, seconds=YEAR, seed=len(log), first_id=contributions)
+            log.append(history)
+            build_s += time.perf_counter() - begin
+            contributions += len(np.unique(history["contribution"].to_numpy(zero_copy_only=False)))
+            start = history["ts"][-1] + GAP
+            del history
+
+        fresh = AuditLog(args.root)
+        ids = [f"C{i:08d}" for i in rng.integers(0, contributions, args.lookups)]
+        middle = len(fresh) // 2
+        ts = np.datetime64(fresh.manifest["segments"][-1]["ts_min"], "us")
+        day = (str(ts.astype("datetime64[D]")), str(ts.astype("datetime64[D]") + 1))
+        history_ms, history = timed(lambda i: fresh.history(ids[i]), args.lookups)
+        pages = {
+            "newest": timed(lambda i: fresh.page(limit=50), 50),
+            "deep": timed(lambda i: fresh.page(before=middle - i, limit=50), 50),
+            "user+action": timed(lambda i: fresh.page(before=middle - i, limit=50, user="k.lee",
+                                                      action="amended"), 50),
+            "one day": timed(lambda i: fresh.page(limit=50, since=day[0], until=day[1]), 50),
+        }
+        results[size] = {
+            "segments": len(fresh.manifest["segments"]),
+            "build_s": build_s,
+            "disk_mib": disk_mib(args.root),
+            "history_ms": history_ms,
+            "history_entries": len(history),
+            "pages_ms": {name: ms for name, (ms, _) in pages.items()},
+            "rows_examined": {name: page.rows_examined for name, (_, page) in pages.items()},
+            "peak_rss_mib": peak_rss_mib(),
+        }
+        print(f"{size:>12,} entries in {results[size]['segments']} segments ({results[size]['disk_mib']:,.0f} MiB, "
+              f"built in {build_s:.0f} s): history p50 {history_ms['p50']:.2f} ms / p95 {history_ms['p95']:.2f} ms; "
+              + ", ".join(f"{name} page p50 {ms['p50']:.2f} ms" for name, (ms, _) in pages.items())
+              + f"; peak RSS {results[size]['peak_rss_mib']:.0f} MiB")
+    write_results(args.output, results)
+    if not args.keep:
+        shutil.rmtree(args.root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Throughput of the batch compliance rule engine at increasing volumes.
+
+Generates synthetic contribution batches (repeat donors, several committees,
+the deck's jurisdictions, categorical source/method columns) and times
+``check_batch`` over each whole batch, against the deck's Processing Speed
+target of under 30 seconds. At the smallest size it also times the same rows
+checked one at a time, for comparison.
+
+    python benchmarks/bench_compliance.py --sizes 1000,100000,10000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+from _common import RESULTS_DIR, write_results
+
+import numpy as np
+
+from compdeck.compliance import RULES, RuleSet, check_batch, synthetic_batch
+from compdeck.spec import load_deck
+
+TARGET_S = 30.0
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000,100000,10000000")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "compliance.json"))
+    args = parser.parse_args(argv)
+
+    rules = RuleSet(load_deck().models["demo"].jurisdictions)
+    results = {}
+    for i, n in enumerate(int(s) for s in args.sizes.split(",")):
+        batch = synthetic_batch(n, rules.codes)
+        start = time.perf_counter()
+        checked = check_batch(batch, rules)
+        elapsed = time.perf_counter() - start
+        flags = checked["flags"].to_numpy()
+        row = {
+            "seconds": elapsed,
+            "rows_per_s": n / elapsed,
+            "within_target": elapsed < TARGET_S,
+            "status": checked["status"].value_counts().to_dict(),
+            "rule_hits": {rule.id: int(np.count_nonzero(flags & (1 << b))) for b, rule in enumerate(RULES)},
+            "peak_rss_mib": peak_rss_mib(),
+        }
+        if i == 0:
+            start = time.perf_counter()
+            for j in range(n):
+                check_batch(batch.iloc[j:j + 1], rules)
+            row["row_by_row_seconds"] = time.perf_counter() - start
+        results[n] = row
+        print(f"{n:>12,} rows: {elapsed:8.3f} s  {n / elapsed:>14,.0f} rows/s  "
+              f"{'OK' if elapsed < TARGET_S else 'OVER'} vs <{TARGET_S:.0f} s  peak RSS {row['peak_rss_mib']:.0f} MiB"
+              + (f"  (one at a time: {row['row_by_row_seconds']:.2f} s)" if "row_by_row_seconds" in row else ""))
+        del batch, checked
+    write_results(args.output, results)
+    return 0 if all(r["within_target"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Memory and throughput of chunked partner-file ingestion.
+
+Writes a synthetic partner CSV of ``--rows`` rows (in a subprocess, so the
+peak RSS reported is the ingest's alone), ingests it into a fresh dataset at
+``--chunk-rows``, re-ingests it (skipped by hash) and times reading one
+jurisdiction-month partition against reading everything. Peak RSS should
+track the chunk size, not the file size.
+
+    python benchmarks/bench_ingest.py --rows 20000000 --chunk-rows 100000
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+from _common import RESULTS_DIR, ROOT, write_results
+
+from compdeck.ingest import PartnerDataset
+from compdeck.spec import load_deck
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--workdir", default=os.path.join(RESULTS_DIR, "ingest"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "ingest.json"))
+    args = parser.parse_args(argv)
+
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    os.makedirs(args.workdir)
+    path = os.path.join(args.workdir, "partner.csv")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "compdeck.ingest", "--write-sample", path, "--rows", str(args.rows)],
+                   cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    write_s = time.perf_counter() - start
+    size_mib = os.path.getsize(path) / 2**20
+
+    codes = [j.code for j in load_deck().models["demo"].jurisdictions]
+    dataset = PartnerDataset(os.path.join(args.workdir, "dataset"))
+    rss_before = peak_rss_mib()
+    start = time.perf_counter()
+    entry = dataset.ingest(path, codes, args.chunk_rows)
+    ingest_s = time.perf_counter() - start
+    rss = peak_rss_mib()
+    start = time.perf_counter()
+    skipped = dataset.ingest(path, codes, args.chunk_rows)["skipped"]
+    skip_s = time.perf_counter() - start
+
+    jurisdiction, month = next(iter(dataset.partitions()))
+    start = time.perf_counter()
+    one = dataset.read([jurisdiction], (month, month)).num_rows
+    one_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    everything = dataset.read().num_rows
+    all_ms = (time.perf_counter() - start) * 1000
+
+    results = {
+        "rows": args.rows,
+        "chunk_rows": args.chunk_rows,
+        "file_mib": size_mib,
+        "write_sample_s": write_s,
+        "ingest_s": ingest_s,
+        "rows_per_s": args.rows / ingest_s,
+        "mib_per_s": size_mib / ingest_s,
+        "ingested": entry["ingested"],
+        "rejected": entry["rejected"],
+        "partitions": len(entry["parts"]),
+        "peak_rss_mib_before": rss_before,
+        "peak_rss_mib": rss,
+        "reingest_skipped": skipped,
+        "reingest_s": skip_s,
+        "read_one_partition_ms": one_ms,
+        "read_one_partition_rows": one,
+        "read_all_ms": all_ms,
+        "read_all_rows": everything,
+    }
+    print(f"{args.rows:,} rows ({size_mib:,.0f} MiB) ingested in {ingest_s:.1f} s "
+          f"({args.rows / ingest_s:,.0f} rows/s, {size_mib / ingest_s:.0f} MiB/s) into {len(entry['parts'])} "
+          f"partitions; peak RSS {rss:.0f} MiB (before ingest {rss_before:.0f} MiB)")
+    print(f"re-ingest {'skipped' if skipped else 'NOT skipped'} in {skip_s:.1f} s; one partition "
+          f"{one:,} rows in {one_ms:.0f} ms vs all {everything:,} rows in {all_ms:.0f} ms")
+    write_results(args.output, results)
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    return 0 if skipped else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
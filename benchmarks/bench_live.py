@@ -0,0 +1,243 @@
+"""Load test: server CPU per viewer when many viewers follow one presenter.
+
+Starts the app with ``streamlit run`` on a free local port and connects
+``--followers`` websocket clients with ``?live=follow`` plus one presenter
+(``?live=present``), speaking Streamlit's browser protocol directly. The
+presenter then steps through ``--steps`` sections. For each step the
+harness waits until every follower has received the new section and nothing
+more has arrived for half a second, and charges the server process's CPU
+time over that span (from /proc/<pid>/stat, heartbeats included) to the
+step. Reported: server CPU
+per viewer per section change, how long followers took to receive it,
+idle CPU per viewer per second (heartbeats) and server RSS.
+
+With ``--baseline`` the same number of plain sessions instead select each
+section themselves, i.e. every viewer re-runs ``app.py`` as before live
+mode, for comparison.
+
+    python benchmarks/bench_live.py --followers 500 --steps 8 --baseline
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from _common import APP, RESULTS_DIR, ROOT, summarize, write_results
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+TICK = os.sysconf("SC_CLK_TCK")
+
+
+def server_cpu_s(pid):
+    with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / TICK  # utime + stime
+
+
+def server_rss_mib(pid):
+    with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, timeout=120):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true", "--server.port", str(port),
+         "--server.address", "127.0.0.1", "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit server did not start")
+
+
+class Client:
+    """One browser tab: sends reruns, counts what the server sends back."""
+
+    def __init__(self, port, query):
+        self.url, self.query = f"ws://127.0.0.1:{port}/_stcore/stream", query
+        self.messages = 0
+        self.last_message = 0.0
+        self.finished = asyncio.Event()  # set by script_finished
+        self.radio = None  # (widget id, options) of the section radio
+        self.slot = None  # follower: delta path of the section placeholder
+        self.arrivals = []  # follower: when each section started arriving
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.url, max_message_size=2**30)
+        asyncio.ensure_future(self._read())
+
+    def rerun(self, section=None):
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query
+        if section is not None:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id, widget.int_value = self.radio[0], section
+        self.finished.clear()
+        return self.ws.write_message(msg.SerializeToString(), binary=True)
+
+    async def _read(self):
+        while (data := await self.ws.read_message()) is not None:
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            self.messages += 1
+            self.last_message = time.perf_counter()
+            kind = msg.WhichOneof("type")
+            if kind == "script_finished":
+                self.finished.set()
+            elif kind == "delta":
+                path = tuple(msg.metadata.delta_path)
+                element = msg.delta.new_element
+                if element.WhichOneof("type") == "radio":
+                    self.radio = (element.radio.id, list(element.radio.options))
+                elif element.WhichOneof("type") == "markdown" and element.markdown.body.startswith("📡 Following"):
+                    self.slot = path[:-1] + (path[-1] + 1,)  # the section placeholder comes next
+                elif msg.delta.WhichOneof("type") == "add_block" and path == self.slot:
+                    self.arrivals.append(self.last_message)
+
+
+async def settle(clients, quiet=0.5, timeout=600):
+    """Wait until no client has received anything for ``quiet`` seconds."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(quiet / 2)
+        if time.perf_counter() - max(c.last_message for c in clients) >= quiet:
+            return
+
+
+async def run(args, port, pid):
+    presenter = Client(port, "live=present")
+    await presenter.connect()
+    await presenter.rerun()
+    await asyncio.wait_for(presenter.finished.wait(), 300)
+    labels = presenter.radio[1]
+
+    start_cpu, start = server_cpu_s(pid), time.perf_counter()
+    followers = [Client(port, "live=follow") for _ in range(args.followers)]
+    for i in range(0, len(followers), 50):
+        await asyncio.gather(*(f.connect() for f in followers[i:i + 50]))
+        await asyncio.gather(*(f.rerun() for f in followers[i:i + 50]))
+    while sum(bool(f.arrivals) for f in followers) < len(followers) and time.perf_counter() - start < 600:
+        await asyncio.sleep(0.1)
+    await settle(followers)
+    connect = {"s": time.perf_counter() - start, "cpu_per_viewer_ms": (server_cpu_s(pid) - start_cpu) * 1000
+               / len(followers)}
+    print(f"{len(followers)} followers joined in {connect['s']:.1f} s, "
+          f"server CPU {connect['cpu_per_viewer_ms']:.1f} ms per follower")
+
+    before, start = server_cpu_s(pid), time.perf_counter()
+    await asyncio.sleep(args.idle)
+    idle_rate = (server_cpu_s(pid) - before) / (time.perf_counter() - start)
+
+    steps = []
+    for step in range(args.steps):
+        section = (step + 1) % len(labels)
+        seen = [len(f.arrivals) for f in followers]
+        start, start_cpu = time.perf_counter(), server_cpu_s(pid)
+        await presenter.rerun(section)
+        await asyncio.wait_for(presenter.finished.wait(), 300)
+        presenter_ms = (time.perf_counter() - start) * 1000
+        while any(len(f.arrivals) == n for f, n in zip(followers, seen)) and time.perf_counter() - start < 600:
+            await asyncio.sleep(0.05)
+        await settle(followers + [presenter])
+        cpu = server_cpu_s(pid) - start_cpu
+        latency = [(f.arrivals[n] - start) * 1000 for f, n in zip(followers, seen) if len(f.arrivals) > n]
+        complete = [(f.last_message - start) * 1000 for f in followers]
+        steps.append({
+            "section": labels[section],
+            "presenter_ms": presenter_ms,
+            "reached": len(latency),
+            "first_message_ms": summarize(latency),
+            "complete_ms": summarize(complete),
+            "server_cpu_s": cpu,
+            "cpu_per_viewer_ms": cpu * 1000 / len(followers),
+        })
+        print(f"  {labels[section]}: reached {len(latency)}/{len(followers)} followers, section complete p50 "
+              f"{steps[-1]['complete_ms']['p50']:.0f} ms / max {steps[-1]['complete_ms']['max']:.0f} ms; "
+              f"server CPU {steps[-1]['cpu_per_viewer_ms']:.2f} ms per follower")
+    return {"connect": connect, "idle_cpu_per_viewer_ms_per_s": idle_rate * 1000 / len(followers),
+            "steps": steps, "labels": labels}
+
+
+async def run_baseline(args, port, pid, labels):
+    viewers = [Client(port, "") for _ in range(args.followers)]
+    for i in range(0, len(viewers), 50):
+        await asyncio.gather(*(v.connect() for v in viewers[i:i + 50]))
+        await asyncio.gather(*(v.rerun() for v in viewers[i:i + 50]))
+        await asyncio.gather(*(v.finished.wait() for v in viewers[i:i + 50]))
+    steps = []
+    for step in range(args.steps):
+        section = (step + 1) % len(labels)
+        start, start_cpu = time.perf_counter(), server_cpu_s(pid)
+        await asyncio.gather(*(v.rerun(section) for v in viewers))
+        await asyncio.wait_for(asyncio.gather(*(v.finished.wait() for v in viewers)), 1800)
+        complete = [(v.last_message - start) * 1000 for v in viewers]
+        steps.append({"section": labels[section], "complete_ms": summarize(complete),
+                      "cpu_per_viewer_ms": (server_cpu_s(pid) - start_cpu) * 1000 / len(viewers)})
+        print(f"  {labels[section]}: section complete p50 {steps[-1]['complete_ms']['p50']:.0f} ms / max "
+              f"{steps[-1]['complete_ms']['max']:.0f} ms; server CPU {steps[-1]['cpu_per_viewer_ms']:.2f} ms "
+              "per viewer")
+    for v in viewers:
+        v.ws.close()
+    return {"steps": steps}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--followers", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=8, help="section changes by the presenter")
+    parser.add_argument("--idle", type=float, default=5.0, help="seconds to measure heartbeat CPU over")
+    parser.add_argument("--baseline", action="store_true",
+                        help="also time as many independent sessions selecting each section themselves")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "live.json"))
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        results = {"followers": args.followers}
+        results["live"] = asyncio.run(run(args, port, server.pid))
+        results["live"]["server_rss_mib"] = server_rss_mib(server.pid)
+        live = [s["cpu_per_viewer_ms"] for s in results["live"]["steps"]]
+        print(f"live: {sum(live) / len(live):.2f} ms server CPU per follower per section change, idle "
+              f"{results['live']['idle_cpu_per_viewer_ms_per_s']:.3f} ms per follower per second, server RSS "
+              f"{results['live']['server_rss_mib']:.0f} MiB")
+        missed = sum(args.followers - s["reached"] for s in results["live"]["steps"])
+        if args.baseline:
+            server.kill()
+            server.wait()
+            server = start_server(port)
+            results["baseline"] = asyncio.run(run_baseline(args, port, server.pid, results["live"]["labels"]))
+            base = [s["cpu_per_viewer_ms"] for s in results["baseline"]["steps"]]
+            print(f"baseline: {sum(base) / len(base):.2f} ms server CPU per viewer per section change "
+                  f"({sum(base) / max(sum(live), 1e-9):.0f}x live)")
+    finally:
+        server.kill()
+        server.wait()
+    write_results(args.output, results)
+    if missed:
+        print(f"{missed} follower updates never arrived", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Build, incremental-update and query cost of the regulation Q&A index.
+
+Generates a synthetic regulation corpus (documents of headed sections drawn
+from the vocabulary of ``regulations/``), then measures the full index build,
+adding one document to the existing index, and batched query latency in each
+search mode. Worker processes then open the same index and answer queries;
+their private (anonymous) memory is reported next to the on-disk index size,
+since the memory-mapped arrays are shared page cache, not per-process copies.
+
+    python benchmarks/bench_rag.py --docs 2000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from _common import ROOT, RESULTS_DIR, summarize, write_results
+
+import numpy as np
+
+from compdeck.rag import RegulationIndex, tokenize
+
+QUERIES = [
+    "cash contribution limit", "corporations prohibited", "employer and occupation required",
+    "aggregate limit per election", "refund of contribution", "anonymous contributions",
+    "records kept four years", "contribution from a union", "itemization threshold",
+    "report late contributions", "limit for political action committees", "check images",
+]
+
+
+def vocabulary():
+    words = []
+    for name in sorted(os.listdir(os.path.join(ROOT, "regulations"))):
+        with open(os.path.join(ROOT, "regulations", name), encoding="utf-8") as f:
+            words += f.read().split()
+    return [w for w in words if tokenize(w)]
+
+
+def write_corpus(path, n, rng, words, start=0):
+    os.makedirs(path, exist_ok=True)
+    for i in range(start, start + n):
+        sections = []
+        for s in range(rng.integers(4, 9)):
+            picked = rng.choice(len(words), int(rng.integers(60, 240)))
+            sections.append(f"## Section {s}\n\n" + " ".join(words[j] for j in picked))
+        with open(os.path.join(path, f"doc{i:05d}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Synthetic regulation {i}\n\n" + "\n\n".join(sections))
+
+
+def dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def private_kib():
+    """Anonymous (non-file-backed) resident memory of this process."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _worker(args):
+    index_dir, queries, rounds = args
+    before = private_kib()
+    index = RegulationIndex(index_dir)
+    for _ in range(rounds):
+        index.search(queries, k=5)
+    return private_kib() - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=64, help="queries per search call")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "rag.json"))
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    words = vocabulary()
+    tmp = tempfile.mkdtemp(prefix="bench-rag-")
+    try:
+        docs, index_dir = os.path.join(tmp, "docs"), os.path.join(tmp, "index")
+        write_corpus(docs, args.docs, rng, words)
+
+        index = RegulationIndex(index_dir)
+        start = time.perf_counter()
+        index.update(docs)
+        build_s = time.perf_counter() - start
+        passages = index.manifest["live"]
+
+        write_corpus(docs, 1, rng, words, start=args.docs)
+        start = time.perf_counter()
+        added, _, unchanged = index.update(docs)
+        add_s = time.perf_counter() - start
+
+        queries = [QUERIES[i % len(QUERIES)] for i in range(args.batch)]
+        latency = {}
+        for mode in ("dense", "bm25", "auto"):
+            index.search(queries, k=5, mode=mode)
+            samples = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                index.search(queries, k=5, mode=mode)
+                samples.append((time.perf_counter() - start) * 1000)
+            latency[mode] = summarize(samples)
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.workers) as pool:
+            private = pool.map(_worker, [(index_dir, queries, args.rounds)] * args.workers)
+
+        results = {
+            "docs": args.docs + 1,
+            "passages": index.manifest["live"],
+            "segments": len(index.segments),
+            "index_mib": dir_bytes(index_dir) / 2**20,
+            "build_s": build_s,
+            "incremental_add_ms": add_s * 1000,
+            "batch": args.batch,
+            "batch_latency_ms": latency,
+            "worker_private_mib": [kib / 1024 for kib in private],
+        }
+        print(f"{args.docs:,} docs -> {passages:,} passages, index {results['index_mib']:.1f} MiB, "
+              f"built in {build_s:.2f} s")
+        print(f"add 1 doc ({added} new, {unchanged:,} unchanged): {add_s * 1000:.0f} ms, "
+              f"{results['segments']} segments")
+        for mode, stats in latency.items():
+            print(f"{mode:>5}: {args.batch} queries p50 {stats['p50']:.1f} ms "
+                  f"({stats['p50'] / args.batch:.2f} ms/query), p95 {stats['p95']:.1f} ms")
+        print("worker private memory after queries: "
+              + ", ".join(f"{mib:.1f}" for mib in results["worker_private_mib"]) + " MiB")
+        write_results(args.output, results)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Measure what a rerun of ``app.py`` costs, per deck section.
+
+Drives the app headlessly with ``streamlit.testing.v1.AppTest`` and records,
+for the initial full-script run and for every section:
+
+* wall time (cold first run, then p50/p95 over warm reruns),
+* peak Python memory allocated during a rerun (tracemalloc),
+* number of elements rendered,
+* serialized payload size (sum of element protobuf sizes).
+
+Results are written as JSON. Thresholds (``rerun_thresholds.json`` by default)
+are checked per section, and ``--baseline`` additionally fails any metric that
+grew by more than ``--tolerance`` relative to a previous results file.
+
+    python benchmarks/bench_rerun.py --runs 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from _common import APP, RESULTS_DIR, ROOT, check_thresholds, summarize, write_results
+
+from streamlit.testing.v1 import AppTest
+
+from compdeck.spec import load_deck
+
+DEFAULT_THRESHOLDS = os.path.join(ROOT, "benchmarks", "rerun_thresholds.json")
+
+
+def _walk(node):
+    for child in getattr(node, "children", {}).values():
+        yield child
+        yield from _walk(child)
+
+
+def measure_tree(at):
+    """Element count and serialized size of the rendered tree."""
+    elements = 0
+    payload = 0
+    for node in _walk(at._tree):
+        proto = getattr(node, "proto", None)
+        if node.type == "unknown" or proto is None:
+            continue
+        if node.type != "block":
+            elements += 1
+        payload += proto.ByteSize()
+    return elements, payload
+
+
+def _timed_run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def _peak_run(at, timeout):
+    tracemalloc.start()
+    try:
+        at.run(timeout=timeout)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def bench(runs, timeout=60):
+    deck = load_deck()
+    ids = {section["label"]: section["id"] for section in deck.sections}
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    cold_ms = _timed_run(at, timeout)
+    elements, payload = measure_tree(at)
+    results = {
+        "app": {
+            "cold_run_ms": cold_ms,
+            "elements": elements,
+            "payload_kib": payload / 1024,
+        },
+        "sections": {},
+    }
+
+    for label in at.radio[0].options:
+        at.radio[0].set_value(label)
+        cold_ms = _timed_run(at, timeout)
+        samples = [_timed_run(at, timeout) for _ in range(runs)]
+        elements, payload = measure_tree(at)
+        timing = summarize(samples)
+        results["sections"][ids.get(label, label)] = {
+            "label": label,
+            "cold_run_ms": cold_ms,
+            "rerun_ms_p50": timing["p50"],
+            "rerun_ms_p95": timing["p95"],
+            "rerun_ms_max": timing["max"],
+            "peak_kib": _peak_run(at, timeout),
+            "elements": elements,
+            "payload_kib": payload / 1024,
+        }
+    return results
+
+
+def regressions(results, thresholds, baseline=None, tolerance=0.2):
+    failures = []
+    default = thresholds.get("default", {})
+    for section_id, measured in results["sections"].items():
+        limits = dict(default, **thresholds.get("sections", {}).get(section_id, {}))
+        failures += check_thresholds(measured, limits, f"{section_id}: ")
+        if baseline and section_id in baseline.get("sections", {}):
+            previous = baseline["sections"][section_id]
+            grown = {
+                metric: previous[metric] * (1 + tolerance)
+                for metric in limits
+                if isinstance(previous.get(metric), (int, float)) and previous[metric] > 0
+            }
+            failures += check_thresholds(measured, grown, f"{section_id} vs baseline: ")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="warm reruns per section")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "rerun.json"))
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative growth vs --baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = bench(args.runs)
+    with open(args.thresholds, encoding="utf-8") as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failures = regressions(results, thresholds, baseline, args.tolerance)
+    results["thresholds"] = thresholds
+    results["failures"] = failures
+    write_results(args.output, results)
+
+    print(f"{'section':<22}{'p50 ms':>9}{'p95 ms':>9}{'peak KiB':>10}{'elements':>10}{'KiB':>8}")
+    for section_id, r in results["sections"].items():
+        print(f"{section_id:<22}{r['rerun_ms_p50']:>9.1f}{r['rerun_ms_p95']:>9.1f}"
+              f"{r['peak_kib']:>10.0f}{r['elements']:>10}{r['payload_kib']:>8.1f}")
+    print(f"results written to {args.output}")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
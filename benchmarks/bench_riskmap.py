@@ -0,0 +1,82 @@
+"""Cost of the server-side binned risk heatmap as contribution volume grows.
+
+For each size, fills a ``RiskCube`` from synthetic contributions (checked
+against the deck's jurisdictions in chunks), then times heatmap views at
+several zoom/filter levels and measures the JSON payload the browser
+receives. Cube memory and payload size should stay flat as rows grow; only
+the fill time scales with the data.
+
+    python benchmarks/bench_riskmap.py --sizes 10000,1000000,10000000,50000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+from compdeck.compliance import RuleSet
+from compdeck.riskmap import synthetic_cube
+from compdeck.spec import load_deck
+
+LEVELS = [
+    # (first day, last day, granularity, states, metric)
+    (0, 729, "auto", None, "High-risk share"),
+    (0, 729, "week", None, "Mean risk score"),
+    (90, 180, "auto", None, "Contributions"),
+    (100, 120, "day", ("CA", "TX"), "Amount"),
+]
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10000,1000000,10000000,50000000")
+    parser.add_argument("--chunk", type=int, default=2_000_000)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "riskmap.json"))
+    args = parser.parse_args(argv)
+
+    rules = RuleSet(load_deck().models["demo"].jurisdictions)
+    results = {}
+    for rows in (int(s) for s in args.sizes.split(",")):
+        start = time.perf_counter()
+        cube = synthetic_cube(rules, rows, "2025-01-01", 730, seed=1, chunk=args.chunk)
+        fill_s = time.perf_counter() - start
+        views = {}
+        for first, last, granularity, states, metric in LEVELS:
+            samples = []
+            for _ in range(20):
+                start = time.perf_counter()
+                data = cube.view(first, last, granularity, states, metric)
+                samples.append((time.perf_counter() - start) * 1000)
+            views[f"{first}-{last}/{granularity}/{','.join(states or ['all'])}/{metric}"] = {
+                "ms": summarize(samples),
+                "bins": len(data["x"]) * len(data["y"]),
+                "payload_bytes": len(json.dumps(data)),
+            }
+        results[rows] = {
+            "fill_s": fill_s,
+            "rows_per_s": rows / fill_s,
+            "cube_kib": cube.nbytes / 1024,
+            "peak_rss_mib": peak_rss_mib(),
+            "views": views,
+        }
+        worst_ms = max(v["ms"]["p50"] for v in views.values())
+        biggest = max(v["payload_bytes"] for v in views.values())
+        print(f"{rows:>12,} rows: filled in {fill_s:7.2f} s ({rows / fill_s:>10,.0f} rows/s), cube "
+              f"{cube.nbytes / 1024:.0f} KiB, views p50 <= {worst_ms:.2f} ms, payload <= {biggest / 1024:.1f} KiB, "
+              f"peak RSS {results[rows]['peak_rss_mib']:.0f} MiB")
+        del cube
+    write_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Scheduler benchmark: full critical-path pass vs incremental updates.
+
+Builds a random layered DAG of ``--tasks`` phases (each depends on up to
+``--fan-in`` phases from earlier layers), then times a full schedule, single
+duration edits at random phases, and the slack/critical-path pass that the
+Gantt view needs after each edit. Incremental edits are checked against a
+from-scratch schedule so a propagation bug fails the run.
+
+    python benchmarks/bench_schedule.py --tasks 5000 --edits 200
+"""
+
+import argparse
+import os
+import random
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+from compdeck.schedule import Phase, Scheduler
+
+
+def random_plan(tasks, fan_in, layers, rng):
+    phases = []
+    per_layer = max(1, tasks // layers)
+    for i in range(tasks):
+        layer = i // per_layer
+        earlier = range(0, layer * per_layer)
+        after = tuple(f"p{j}" for j in sorted(set(rng.sample(earlier, min(fan_in, len(earlier))))))
+        phases.append(Phase(id=f"p{i}", name=f"Task {i}", duration=rng.randint(1, 6), after=after, lag=rng.randint(-1, 1)))
+    return phases
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--fan-in", type=int, default=3)
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "schedule.json"))
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    phases = random_plan(args.tasks, args.fan_in, args.layers, rng)
+    full_ms, scheduler = timed(lambda: Scheduler(phases))
+    slack_full_ms, _ = timed(scheduler.slack)
+
+    edit_ms, slack_ms, moved = [], [], []
+    for _ in range(args.edits):
+        pid = f"p{rng.randrange(args.tasks)}"
+        ms, changed = timed(lambda: scheduler.set_duration(pid, rng.randint(1, 6)))
+        edit_ms.append(ms)
+        moved.append(len(changed))
+        slack_ms.append(timed(scheduler.slack)[0])
+
+    reference = Scheduler(list(scheduler.phases.values()))
+    if reference.start != scheduler.start or reference.end != scheduler.end:
+        raise SystemExit("incremental schedule diverged from a full recompute")
+
+    results = {
+        "tasks": args.tasks,
+        "full_schedule_ms": full_ms,
+        "full_slack_ms": slack_full_ms,
+        "edit_ms": summarize(edit_ms),
+        "edit_plus_slack_ms": summarize([a + b for a, b in zip(edit_ms, slack_ms)]),
+        "phases_moved_per_edit": summarize(moved),
+    }
+    write_results(args.output, results)
+    print(f"{args.tasks} tasks: full schedule {full_ms:.1f} ms, slack {slack_full_ms:.1f} ms")
+    print(f"edit p50 {results['edit_ms']['p50']:.2f} ms (moves p50 {results['phases_moved_per_edit']['p50']} phases), "
+          f"edit+slack p50 {results['edit_plus_slack_ms']['p50']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Lookup latency of the deck search index, at the deck's size and larger.
+
+Builds ``DeckIndex`` over the deck and over decks made of ``--scale`` copies
+of its sections, then times ``--repeat`` lookups of each query: exact words,
+short prefixes ("ref", "comp", "s") and multi-word queries, with snippets as
+the sidebar shows them. Every lookup should stay under a millisecond.
+
+    python benchmarks/bench_search.py --scale 1 10 100
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+from compdeck.search import DeckIndex
+from compdeck.spec import load_deck
+
+QUERIES = ["GDPR", "SOC 2", "referrals", "ref", "comp", "s", "partner pilot", "compliance platform accuracy",
+           "zzz"]
+BUDGET_MS = 1.0
+
+
+def scaled(deck, copies):
+    sections = [dict(section, label=f"{section['label']} #{i}") for i in range(copies) for section in deck.sections]
+    return deck._replace(sections=sections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "search.json"))
+    args = parser.parse_args(argv)
+
+    deck, results, slow = load_deck(), [], 0
+    for copies in args.scale:
+        start = time.perf_counter()
+        index = DeckIndex(scaled(deck, copies))
+        build_ms = (time.perf_counter() - start) * 1000
+        row = {"copies": copies, "entries": len(index.entries), "terms": len(index.terms), "build_ms": build_ms,
+               "queries": {}}
+        print(f"x{copies}: {len(index.entries):,} entries, {len(index.terms):,} terms, built in {build_ms:.0f} ms")
+        for query in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                found = index.search(query)
+                samples.append((time.perf_counter() - start) * 1000)
+            row["queries"][query] = dict(summarize(samples), results=len(found))
+            slow += row["queries"][query]["p95"] >= BUDGET_MS
+            print(f"  {query!r:32} {len(found)} results  p50 {row['queries'][query]['p50']:.3f} ms  "
+                  f"p95 {row['queries'][query]['p95']:.3f} ms")
+        results.append(row)
+    write_results(args.output, {"repeat": args.repeat, "budget_ms": BUDGET_MS, "scales": results})
+    if slow:
+        print(f"{slow} queries had p95 >= {BUDGET_MS} ms", file=sys.stderr)
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Load test: resident memory per concurrent viewer session.
+
+Opens ``--sessions`` AppTest sessions of ``app.py``; each renders every deck
+section, and all of them are kept alive together while the process's resident
+set size (RSS) is sampled, as a server holds its connected viewers. The
+per-session cost is the RSS growth over the warmed-up process, divided by the
+session count. (AppTest installs a process-global runtime for each run, so the
+script runs themselves are driven one at a time.)
+
+It also checks that every session got the same shared, read-only table frames
+from ``compdeck.store`` and reports the store's footprint next to what plain
+object-dtype frames of the same tables would take.
+
+    python benchmarks/bench_sessions.py --sessions 200
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+
+from _common import APP, RESULTS_DIR, write_results
+
+from streamlit.testing.v1 import AppTest
+
+from compdeck import store
+from compdeck.spec import load_deck
+
+
+def rss_mib():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def open_session(labels, timeout):
+    """One viewer: render every section in turn, return the live AppTest."""
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    for label in labels:
+        at.radio[0].set_value(label).run()
+        if at.exception:
+            raise RuntimeError(f"{label}: {at.exception[0].value}")
+    return at
+
+
+def footprint(deck):
+    """Deep bytes of the shared frames vs plain object-dtype frames."""
+    import pandas as pd
+
+    shared = sum(store.frame_bytes(deck.frame(name)) for name in deck.tables)
+    plain = sum(int(pd.DataFrame(columns).memory_usage(deep=True).sum()) for columns in deck.tables.values())
+    return shared, plain
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "sessions.json"))
+    args = parser.parse_args(argv)
+
+    deck = load_deck()
+    labels = [section["label"] for section in deck.sections]
+
+    # Warm imports and process-wide caches so the baseline only excludes sessions.
+    open_session(labels, args.timeout)
+    gc.collect()
+    baseline = rss_mib()
+
+    start = time.perf_counter()
+    sessions = [open_session(labels, args.timeout) for _ in range(args.sessions)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    loaded = rss_mib()
+
+    deck = load_deck()
+    frames = {name: id(deck.frame(name)) for name in deck.tables}
+    shared_bytes, plain_bytes = footprint(deck)
+    results = {
+        "sessions": len(sessions),
+        "sections_per_session": len(labels),
+        "wall_s": elapsed,
+        "rss_baseline_mib": baseline,
+        "rss_loaded_mib": loaded,
+        "rss_per_session_kib": (loaded - baseline) * 1024 / len(sessions),
+        "store": dict(store.stats(), tables=len(frames)),
+        "tables_shared_bytes": shared_bytes,
+        "tables_object_dtype_bytes": plain_bytes,
+    }
+    write_results(args.output, results)
+
+    print(f"{results['sessions']} sessions x {len(labels)} sections in {elapsed:.1f} s")
+    print(f"RSS {baseline:.0f} MiB warmed up -> {loaded:.0f} MiB "
+          f"({results['rss_per_session_kib']:.0f} KiB per session)")
+    print(f"store: {results['store']['frames']} shared frames for {len(frames)} tables, "
+          f"{shared_bytes / 1024:.1f} KiB (object dtype: {plain_bytes / 1024:.1f} KiB)")
+    if results["store"]["frames"] > len(frames):
+        print("sessions did not share table frames", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
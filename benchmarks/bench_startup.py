@@ -0,0 +1,118 @@
+"""Cold-start benchmark: fresh interpreter -> first rendered section.
+
+Each sample starts a new ``python -X importtime`` process that imports
+Streamlit and renders one section of ``app.py`` with AppTest, the same work a
+newly scaled-up worker does before its first response. The import-time log is
+folded into a per-package breakdown (self time summed by top-level package),
+and the run fails if the median cold start exceeds ``--budget-ms``.
+
+    python benchmarks/bench_startup.py --samples 5 --section org_setup
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from _common import APP, RESULTS_DIR, ROOT, summarize, write_results
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+from compdeck.spec import load_deck
+imported = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=60)
+section = {section!r}
+if section:
+    at.session_state["section"] = load_deck().section(section)["label"]
+at.run()
+done = time.perf_counter()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_run_ms": (done - imported) * 1000,
+    "total_ms": (done - start) * 1000,
+    # Streamlit itself imports pandas and parts of plotly; this flags whether
+    # the render went on to load the bar-chart machinery.
+    "plotly_bar_loaded": "plotly.validators.bar" in sys.modules,
+}}))
+"""
+
+IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """Sum import self-time (ms) per top-level package."""
+    by_package = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            by_package[match.group(4).split(".")[0]] += int(match.group(1)) / 1000
+    return dict(by_package)
+
+
+def sample(section):
+    code = CHILD.format(root=ROOT, app=APP, section=section)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--section", default="", help="section id to render first (default: the deck's first)")
+    parser.add_argument("--budget-ms", type=float, default=4000, help="max median cold start")
+    parser.add_argument("--top", type=int, default=15, help="packages to keep in the breakdown")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "startup.json"))
+    args = parser.parse_args(argv)
+
+    samples = [sample(args.section) for _ in range(args.samples)]
+    packages = defaultdict(list)
+    for s in samples:
+        for name, ms in s["imports"].items():
+            packages[name].append(ms)
+    breakdown = sorted(
+        ((name, statistics.median(ms)) for name, ms in packages.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    total = summarize([s["total_ms"] for s in samples])
+    results = {
+        "section": args.section or None,
+        "total_ms": total,
+        "import_ms": summarize([s["import_ms"] for s in samples]),
+        "first_run_ms": summarize([s["first_run_ms"] for s in samples]),
+        "plotly_bar_loaded": samples[-1]["plotly_bar_loaded"],
+        "imports_ms": dict(breakdown),
+        "budget_ms": args.budget_ms,
+        "over_budget": total["p50"] > args.budget_ms,
+    }
+    write_results(args.output, results)
+
+    print(f"cold start p50 {total['p50']:.0f} ms (budget {args.budget_ms:.0f} ms), "
+          f"first run p50 {results['first_run_ms']['p50']:.0f} ms, "
+          f"bar charts loaded: {results['plotly_bar_loaded']}")
+    for name, ms in breakdown:
+        print(f"  {name:<24}{ms:>8.1f} ms")
+    if results["over_budget"]:
+        print("REGRESSION cold start over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
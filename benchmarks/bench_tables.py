@@ -0,0 +1,71 @@
+"""Per-table cost of rendering the deck's tables: Arrow bytes and server time.
+
+For every table in the deck, compares the old path — ``st.dataframe`` on a
+plain DataFrame, which converts it to Arrow on each rerun — with the current
+one, which sends the store's pre-encoded payload (compact dtypes, encoded
+once). Both are called the way a rerun calls them, outside a script run, so
+the timings are the server-side element cost only.
+
+    python benchmarks/bench_tables.py --runs 200
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+import pandas as pd
+import streamlit as st
+from streamlit import type_util
+
+from compdeck.render import BLOCK_RENDERERS
+from compdeck.spec import load_deck
+
+
+def _time(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "tables.json"))
+    args = parser.parse_args(argv)
+    # Bare-mode calls warn about the missing ScriptRunContext on every element.
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    deck = load_deck()
+    render_table = BLOCK_RENDERERS["table"]
+    results = {}
+    for name, columns in deck.tables.items():
+        plain = pd.DataFrame(columns)
+        block = {"type": "table", "name": name}
+        render_table(deck, block)  # encode once, as the first viewer would
+        before = _time(lambda: st.dataframe(pd.DataFrame(columns), use_container_width=True), args.runs)
+        after = _time(lambda: render_table(deck, block), args.runs)
+        results[name] = {
+            "bytes_before": len(type_util.data_frame_to_bytes(plain)),
+            "bytes_after": len(deck.arrow(name)),
+            "ms_before_p50": before["p50"],
+            "ms_after_p50": after["p50"],
+        }
+    write_results(args.output, results)
+
+    print(f"{'table':<16}{'bytes before':>14}{'after':>8}{'ms before':>11}{'after':>8}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['bytes_before']:>14}{r['bytes_after']:>8}"
+              f"{r['ms_before_p50']:>11.3f}{r['ms_after_p50']:>8.3f}")
+    total_before = sum(r["bytes_before"] for r in results.values())
+    total_after = sum(r["bytes_after"] for r in results.values())
+    print(f"{'total':<16}{total_before:>14}{total_after:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Dashboard load and late-arrival patch cost of the monthly trend store.
+
+Grows one store under ``--root`` to each size in ``--sizes`` by folding in
+synthetic contributions ``--chunk`` at a time over ``--days`` days, then,
+on a freshly opened store, times opening it, building the dashboard (trend
+chart plus monthly report) and patching in ``--late``-record batches of
+late filings, each dated within one old 30-day stretch, with the save that
+rewrites their months. The open, dashboard and patch times should stay flat
+as the history grows; only the build, which is what regrouping the full
+history on every load would cost, scales with it.
+
+    python benchmarks/bench_trends.py --sizes 1000000,10000000,50000000
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import time
+
+from _common import RESULTS_DIR, summarize, write_results
+
+from compdeck.compliance import RuleSet, synthetic_batch
+from compdeck.spec import load_deck
+from compdeck.trends import METRICS, TrendStore, late_batch
+
+START = "2024-01-01"
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000000,10000000,50000000")
+    parser.add_argument("--chunk", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--late", type=int, default=2_000)
+    parser.add_argument("--patches", type=int, default=20)
+    parser.add_argument("--root", default=os.path.join(RESULTS_DIR, "trends"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "trends.json"))
+    args = parser.parse_args(argv)
+
+    jurisdictions = load_deck().models["demo"].jurisdictions
+    rules = RuleSet(jurisdictions)
+    shutil.rmtree(args.root, ignore_errors=True)
+    store = TrendStore(args.root, jurisdictions)
+    build_s, results = 0.0, {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        while len(store) < size:
+            n = min(args.chunk, size - len(store))
+            begin = time.perf_counter()
+            store.add(synthetic_batch(n, rules.codes, seed=len(store), donor_offset=len(store), start=START,
+                                      days=args.days), rules)
+            build_s += time.perf_counter() - begin
+        begin = time.perf_counter()
+        store.save()
+        build_s += time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        fresh = TrendStore(args.root, jurisdictions)
+        open_ms = (time.perf_counter() - begin) * 1000
+        dashboard = []
+        for metric in METRICS * 5:
+            begin = time.perf_counter()
+            fresh.view(None, metric), fresh.table()
+            dashboard.append((time.perf_counter() - begin) * 1000)
+        patches, saves, buckets = [], [], []
+        for i in range(args.patches):
+            batch = late_batch(rules, args.late, START, args.days, seed=size + i)
+            begin = time.perf_counter()
+            patch = fresh.add(batch, rules)
+            patches.append((time.perf_counter() - begin) * 1000)
+            begin = time.perf_counter()
+            fresh.save()
+            saves.append((time.perf_counter() - begin) * 1000)
+            buckets.append(sum(patch.buckets.values()))
+        store = TrendStore(args.root, jurisdictions)  # includes the late batches
+
+        results[size] = {
+            "build_s": build_s,
+            "open_ms": open_ms,
+            "dashboard_ms": summarize(dashboard),
+            "patch_ms": summarize(patches),
+            "save_ms": summarize(saves),
+            "buckets_patched_mean": sum(buckets) / len(buckets),
+            "months": len(fresh.months),
+            "committees": len(fresh.committees),
+            "peak_rss_mib": peak_rss_mib(),
+        }
+        print(f"{size:>12,} contributions (built in {build_s:.0f} s): open {open_ms:.1f} ms, dashboard "
+              f"p50 {results[size]['dashboard_ms']['p50']:.2f} ms, {args.late:,}-record late patch p50 "
+              f"{results[size]['patch_ms']['p50']:.1f} ms ({results[size]['buckets_patched_mean']:.0f} buckets) "
+              f"+ save p50 {results[size]['save_ms']['p50']:.1f} ms; peak RSS {results[size]['peak_rss_mib']:.0f} MiB")
+    write_results(args.output, results)
+    shutil.rmtree(args.root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Support code for the AI Compliance Platform strategy deck (``app.py``)."""
@@ -0,0 +1,363 @@
+"""Artifact cache shared by every worker process on the host.
+
+``st.cache_resource`` and ``st.cache_data`` live in one process, so several
+Streamlit workers behind a load balancer would each rebuild the same
+simulation and sweep results, risk cube and trained classifier. ``shared()``
+sits below those per-process caches and keeps the pickled result in a cache
+every worker can read, so each artifact is computed once per host. It is
+meant for artifacts that take seconds to build; payloads built per view
+(figure specs, Arrow tables) cost less to rebuild than to store and stay in
+the per-process caches:
+
+* ``SQLiteCache`` (the default) -- one SQLite database in WAL mode under
+  ``COMPDECK_CACHE`` (default ``.artifact_cache/``). A value is written in a
+  single transaction, so readers never see a partial entry. The total size
+  is bounded by ``COMPDECK_CACHE_MB``: least recently used entries are
+  evicted in the transaction that goes over the limit.
+* ``NullCache`` (``COMPDECK_CACHE=off``) -- no sharing; every process
+  computes its own.
+
+A miss is single-flight: the worker that finds an entry missing takes an
+exclusive ``flock`` on the key's lock file, computes and stores the value;
+workers asking for it meanwhile wait on that lock and then read the stored
+value. The kernel drops the lock if the worker dies, and a waiter gives up
+after ``LOCK_TIMEOUT`` seconds and computes the value itself.
+
+Keys include a hash of this package's source, so a code change never serves
+artifacts built by older code; those age out of the LRU. Install another
+backend (anything implementing ``ArtifactCache``) with ``use_cache()``.
+
+    python -m compdeck.artifacts stats
+    python -m compdeck.artifacts clear
+"""
+
+import abc
+import argparse
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH_ENV, SIZE_ENV = "COMPDECK_CACHE", "COMPDECK_CACHE_MB"
+DEFAULT_PATH = os.path.join(ROOT, ".artifact_cache")
+DEFAULT_MB = 256
+LOCK_STRIPES = 256
+LOCK_TIMEOUT = 300.0  # seconds a waiter waits for another worker's computation
+TOUCH_INTERVAL = 60.0  # seconds between LRU timestamp updates of a hot entry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    compute_s REAL NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed);
+"""
+
+_code_version = None
+
+
+def code_version():
+    """Hash of the package's source files, part of every key."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+            with open(path, "rb") as f:
+                digest.update(os.path.basename(path).encode() + b"\0" + f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def artifact_key(namespace, key):
+    """Stable digest of ``namespace`` and ``key`` (JSON-able; NamedTuples are encoded as lists)."""
+    payload = json.dumps([code_version(), namespace, key], sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache(abc.ABC):
+    """Get-or-compute over a store of pickled values; backends implement the storage and the lock."""
+
+    def __init__(self):
+        self.counts = {"hits": 0, "misses": 0, "computed": 0, "waited": 0}
+        self._counts_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def load(self, digest):
+        """The pickled value stored under ``digest``, or None."""
+
+    @abc.abstractmethod
+    def store(self, digest, namespace, blob, compute_s):
+        """Keep ``blob``, the pickled result of ``compute_s`` seconds' work, under ``digest``."""
+
+    @abc.abstractmethod
+    def discard(self, digest):
+        """Drop whatever is stored under ``digest``."""
+
+    @abc.abstractmethod
+    def lock(self, digest):
+        """Context manager held while computing ``digest``; True if it was contended."""
+
+    def _count(self, name):
+        with self._counts_lock:
+            self.counts[name] += 1
+
+    def _cached(self, digest):
+        blob = self.load(digest)
+        if blob is None:
+            return False, None
+        try:
+            return True, pickle.loads(blob)
+        except Exception:  # written by an incompatible build: recompute
+            self.discard(digest)
+            return False, None
+
+    def fetch(self, namespace, key, compute):
+        """``compute()``, or its stored result for ``(namespace, key)``."""
+        digest = artifact_key(namespace, key)
+        found, value = self._cached(digest)
+        if found:
+            self._count("hits")
+            return value
+        self._count("misses")
+        with self.lock(digest) as contended:
+            if contended:
+                self._count("waited")
+            # Another worker may have stored it between our miss and the lock.
+            found, value = self._cached(digest)
+            if found:
+                self._count("hits")
+                return value
+            start = time.perf_counter()
+            value = compute()
+            compute_s = time.perf_counter() - start
+            self._count("computed")
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                return value  # not shareable; callers still get it
+            self.store(digest, namespace, blob, compute_s)
+        return value
+
+    def stats(self):
+        return dict(self.counts)
+
+
+class NullCache(ArtifactCache):
+    """Stores nothing: every process computes its own artifacts."""
+
+    def load(self, digest):
+        return None
+
+    def store(self, digest, namespace, blob, compute_s):
+        pass
+
+    def discard(self, digest):
+        pass
+
+    def lock(self, digest):
+        return nullcontext(False)
+
+
+class SQLiteCache(ArtifactCache):
+    """Pickled artifacts in ``<root>/artifacts.sqlite``, LRU-bounded to ``max_bytes``.
+
+    Storage errors (a full disk, a locked database) are not fatal: the value
+    is computed and returned without being shared.
+    """
+
+    def __init__(self, root=DEFAULT_PATH, max_bytes=DEFAULT_MB * 2**20):
+        super().__init__()
+        self.root, self.max_bytes = root, max_bytes
+        self.path = os.path.join(root, "artifacts.sqlite")
+        os.makedirs(os.path.join(root, "locks"), exist_ok=True)
+        self._local = threading.local()  # per-thread connection and held lock stripes
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _thread(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():  # not shared with a forked parent
+            local.pid, local.db, local.held = os.getpid(), self._connect(), set()
+        return local
+
+    @property
+    def _db(self):
+        return self._thread().db
+
+    def load(self, digest):
+        try:
+            row = self._db.execute("SELECT value, accessed FROM artifacts WHERE key = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL:
+                self._db.execute("UPDATE artifacts SET accessed = ? WHERE key = ?", (now, digest))
+            return row[0]
+        except sqlite3.Error:
+            return None
+
+    def store(self, digest, namespace, blob, compute_s):
+        if len(blob) > self.max_bytes:
+            return
+        db, now = self._db, time.time()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (digest, namespace, blob, len(blob), compute_s, now, now))
+                self._evict(db, digest)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db, keep):
+        excess = db.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM artifacts WHERE key != ? ORDER BY accessed", (keep,)):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM artifacts WHERE key = ?", doomed)
+
+    def discard(self, digest):
+        try:
+            self._db.execute("DELETE FROM artifacts WHERE key = ?", (digest,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        self._db.execute("DELETE FROM artifacts")
+        self._db.execute("VACUUM")
+
+    @contextmanager
+    def lock(self, digest, timeout=LOCK_TIMEOUT):
+        stripe = int(digest[:8], 16) % LOCK_STRIPES
+        held = self._thread().held
+        if stripe in held:  # nested fetch from the computation holding this stripe
+            yield False
+            return
+        with open(os.path.join(self.root, "locks", f"{stripe:03d}.lock"), "a+b") as f:
+            contended, locked, delay = False, False, 0.005
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except BlockingIOError:
+                    contended = True
+                    if time.monotonic() >= deadline:
+                        break  # the holder seems stuck: compute without the lock
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.1)
+            held.add(stripe)
+            try:
+                yield contended
+            finally:
+                held.discard(stripe)
+                if locked:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def stats(self):
+        stats = super().stats()
+        rows = self._db.execute(
+            "SELECT namespace, COUNT(*), SUM(size), SUM(compute_s) FROM artifacts GROUP BY namespace ORDER BY namespace"
+        ).fetchall()
+        stats["namespaces"] = {name: {"entries": n, "bytes": size, "compute_s": cost} for name, n, size, cost in rows}
+        stats["entries"] = sum(n for _, n, _, _ in rows)
+        stats["bytes"] = sum(size for _, _, size, _ in rows)
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def cache_from_env():
+    """The backend ``COMPDECK_CACHE`` and ``COMPDECK_CACHE_MB`` select."""
+    path = os.environ.get(PATH_ENV, DEFAULT_PATH)
+    if path.lower() in ("", "0", "off", "none"):
+        return NullCache()
+    try:
+        return SQLiteCache(os.path.join(ROOT, path), float(os.environ.get(SIZE_ENV, DEFAULT_MB)) * 2**20)
+    except (OSError, sqlite3.Error):  # e.g. a read-only checkout: run unshared
+        return NullCache()
+
+
+def artifact_cache():
+    """This process's cache backend, created from the environment on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = cache_from_env()
+        return _cache
+
+
+def use_cache(cache):
+    """Install ``cache`` as the backend for ``shared()``; returns the previous one."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+    return previous
+
+
+def shared(namespace, key, compute):
+    """``compute()``, computed once across the host's worker processes for ``(namespace, key)``.
+
+    ``key`` identifies the inputs (JSON-able, with ``repr`` for other
+    objects); the result must pickle to be shared.
+    """
+    return artifact_cache().fetch(namespace, key, compute)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the shared artifact cache.")
+    parser.add_argument("command", choices=("stats", "clear"))
+    args = parser.parse_args(argv)
+
+    cache = artifact_cache()
+    if not isinstance(cache, SQLiteCache):
+        print(f"the artifact cache is off ({PATH_ENV}={os.environ.get(PATH_ENV)})")
+        return 0
+    if args.command == "clear":
+        cache.clear()
+    stats = cache.stats()
+    print(f"{cache.path}: {stats['entries']} entries, {stats['bytes'] / 2**20:.1f} of "
+          f"{stats['max_bytes'] / 2**20:.0f} MiB")
+    for name, entry in stats["namespaces"].items():
+        print(f"  {name:20} {entry['entries']:4} entries {entry['bytes'] / 2**20:8.2f} MiB  "
+              f"{entry['compute_s']:7.2f} s to compute")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
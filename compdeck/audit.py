@@ -0,0 +1,455 @@
+"""Append-only audit log in memory-mapped Arrow segments, with indexes.
+
+Each ``append`` writes one immutable segment directory::
+
+    seg-000042/
+        data.arrow          Arrow IPC file: ts, user, action, contribution, detail
+        contribution.npy    sorted 64-bit hashes of contribution ids ...
+        contribution_rows.npy   ... and the row each belongs to
+        user_rows.npy       rows grouped by user dictionary code ...
+        user_offsets.npy    ... with a CSR offset per code
+
+Entries are numbered by a global sequence (``seq``): a segment holds
+``first_seq .. first_seq + rows - 1`` in order, so seq is implicit and
+timestamps are non-decreasing. ``manifest.json`` (replaced atomically) lists
+the segments with their seq and time ranges and the users and actions they
+contain.
+
+Several processes may share a log: writers hold an ``flock`` on ``.lock``
+and re-read the manifest under it before naming, appending or deleting
+segments, and readers pick up a replaced manifest on their next page.
+
+Reads never load the log: segments are memory-mapped, the manifest prunes
+segments by seq/time range and user/action (predicate pushdown), the
+indexes narrow a segment to candidate rows, and only a page's rows are
+materialized. Pages are keyset-paginated by seq (newest first): the cursor
+is the last seq of the previous page, so any page costs the same however
+deep it is.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROOT = os.path.join(ROOT, ".audit_log")
+
+COLUMNS = ("ts", "user", "action", "contribution", "detail")
+COMPACT_BELOW = 4096  # segments smaller than this are merged by compact()
+SCAN_BLOCK = 4096  # rows examined at a time when a filter has no index
+
+
+class AuditSpec(NamedTuple):
+    root: str  # log directory
+    history: int  # synthetic entries to seed an empty demo log with
+    seed: int
+
+
+def parse_audit(raw):
+    root = raw.get("root", ".audit_log")
+    spec = AuditSpec(root if os.path.isabs(root) else os.path.join(ROOT, root),
+                     int(raw.get("history", 0)), int(raw.get("seed", 0)))
+    if spec.history < 0:
+        raise ValueError("audit.history: must not be negative")
+    return spec
+
+
+class Page(NamedTuple):
+    entries: list  # dicts with seq + COLUMNS, newest first
+    cursor: object  # pass as ``before`` for the next (older) page; None at the end
+    segments_scanned: int
+    segments_total: int
+    rows_examined: int
+
+
+def hash_ids(values):
+    """Stable 64-bit hashes of string ids (same in every process)."""
+    import pandas as pd
+
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _schema():
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int16(), pa.string())
+    # Details repeat across a workflow but are open-ended (live runs name
+    # their scan), so their dictionary may outgrow int16 codes.
+    return pa.schema([("ts", pa.timestamp("us")), ("user", category), ("action", category),
+                      ("contribution", pa.string()), ("detail", pa.dictionary(pa.int32(), pa.string()))])
+
+
+def _table(entries):
+    """Arrow table for ``entries``: a dict of columns or a list of row dicts."""
+    import pyarrow as pa
+
+    if isinstance(entries, list):
+        entries = {c: [e[c] for e in entries] for c in COLUMNS}
+    ts = entries["ts"]
+    if not isinstance(ts, (pa.Array, pa.ChunkedArray)):
+        ts = np.asarray(ts, dtype="datetime64[us]")
+    columns = []
+    for field in _schema():
+        column = ts if field.name == "ts" else entries[field.name]
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        if pa.types.is_dictionary(field.type):
+            column = (column if isinstance(column, pa.Array) else pa.array(column, pa.string())).dictionary_encode()
+            column = column.cast(field.type)
+        else:
+            column = pa.array(column, field.type) if not isinstance(column, pa.Array) else column.cast(field.type)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=_schema())
+
+
+class Segment:
+    """One memory-mapped segment and its indexes."""
+
+    def __init__(self, root, meta):
+        import pyarrow as pa
+
+        self.meta = meta
+        self.first = meta["first_seq"]
+        self.rows = meta["rows"]
+        path = os.path.join(root, meta["name"])
+        self.table = pa.ipc.open_file(pa.memory_map(os.path.join(path, "data.arrow"))).read_all()
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")  # noqa: E731
+        self.contribution_hashes = load("contribution.npy")
+        self.contribution_rows = load("contribution_rows.npy")
+        self.user_rows = load("user_rows.npy")
+        self.user_offsets = load("user_offsets.npy")
+        self.ts = self.table.column("ts").chunk(0).cast("int64").to_numpy()
+        self._codes = {}
+
+    def code(self, column, value):
+        """Dictionary code of ``value`` in this segment's ``column`` (-1 if absent)."""
+        key = (column, value)
+        if key not in self._codes:
+            dictionary = self.table.column(column).chunk(0).dictionary.to_pylist()
+            self._codes[key] = dictionary.index(value) if value in dictionary else -1
+        return self._codes[key]
+
+    def indices(self, column, rows):
+        return self.table.column(column).chunk(0).indices.take(rows).to_numpy()
+
+    def candidates(self, user=None, contribution=None, contribution_hash=None):
+        """Candidate rows (ascending) from the indexes, or None for all rows."""
+        rows = None
+        if contribution is not None:
+            lo = np.searchsorted(self.contribution_hashes, contribution_hash, side="left")
+            hi = np.searchsorted(self.contribution_hashes, contribution_hash, side="right")
+            rows = np.sort(np.asarray(self.contribution_rows[lo:hi]))
+            if len(rows):  # hash collisions: confirm against the stored ids
+                ids = self.table.column("contribution").chunk(0).take(rows).to_numpy(zero_copy_only=False)
+                rows = rows[ids == contribution]
+        if user is not None:
+            code = self.code("user", user)
+            if code < 0:
+                return np.zeros(0, np.int64)
+            if rows is None:
+                rows = np.asarray(self.user_rows[self.user_offsets[code]:self.user_offsets[code + 1]])
+            else:
+                rows = rows[self.indices("user", rows) == code]
+        return rows
+
+
+def _write_segment(root, name, table, first_seq):
+    tmp = tempfile.mkdtemp(dir=root, prefix=".seg-")
+    try:
+        _write_files(tmp, table)
+        os.replace(tmp, os.path.join(root, name))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    user = table.column("user").combine_chunks()
+    ts = table.column("ts").cast("int64").to_numpy()
+    return {
+        "name": name,
+        "first_seq": first_seq,
+        "rows": len(table),
+        "ts_min": int(ts[0]),
+        "ts_max": int(ts[-1]),
+        "users": sorted(set(user.dictionary.to_pylist())),
+        "actions": sorted(set(table.column("action").combine_chunks().dictionary.to_pylist())),
+    }
+
+
+def _write_files(tmp, table):
+    import pyarrow as pa
+
+    with pa.OSFile(os.path.join(tmp, "data.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=len(table) or None)
+
+    hashes = hash_ids(table.column("contribution").to_numpy(zero_copy_only=False))
+    order = np.argsort(hashes, kind="stable")
+    np.save(os.path.join(tmp, "contribution.npy"), hashes[order])
+    np.save(os.path.join(tmp, "contribution_rows.npy"), order.astype(np.uint32))
+    user = table.column("user").combine_chunks()
+    codes = user.indices.to_numpy()
+    np.save(os.path.join(tmp, "user_rows.npy"), np.argsort(codes, kind="stable").astype(np.uint32))
+    offsets = np.zeros(len(user.dictionary) + 1, np.int64)
+    offsets[1:] = np.cumsum(np.bincount(codes, minlength=len(user.dictionary)))
+    np.save(os.path.join(tmp, "user_offsets.npy"), offsets)
+
+
+class AuditLog:
+    """Append-only audit log under ``root``; safe to share across threads and processes."""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+        self._segments = {}
+        self.manifest = {"segments": [], "next_seq": 0}
+        self._version = None  # (inode, mtime) of the manifest file self.manifest was read from
+        os.makedirs(root, exist_ok=True)
+        self._reload()
+
+    def __len__(self):
+        return self._reload()["next_seq"]
+
+    def _reload(self):
+        """The current manifest, re-read if another writer replaced the file."""
+        path = os.path.join(self.root, "manifest.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                stat = os.fstat(f.fileno())
+                version = (stat.st_ino, stat.st_mtime_ns)
+                if version != self._version:
+                    self.manifest, self._version = json.load(f), version
+        except FileNotFoundError:
+            pass
+        return self.manifest
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive across threads and processes, with the manifest re-read under the lock."""
+        with self._lock, open(os.path.join(self.root, ".lock"), "a+b") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._reload()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _segment(self, meta):
+        segment = self._segments.get(meta["name"])
+        if segment is None:
+            segment = self._segments[meta["name"]] = Segment(self.root, meta)
+        return segment
+
+    def _save(self, manifest):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.root, "manifest.json"))
+        stat = os.stat(os.path.join(self.root, "manifest.json"))
+        self.manifest, self._version = manifest, (stat.st_ino, stat.st_mtime_ns)
+        # Called under _writing(), so the manifest is current and no other
+        # writer is mid-segment: anything it does not list is garbage.
+        live = {s["name"] for s in manifest["segments"]}
+        for name in os.listdir(self.root):
+            if (name.startswith("seg-") and name not in live) or name.startswith(".seg-"):
+                self._segments.pop(name, None)
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def _next_name(self, segments):
+        # Directories left by a writer that died before saving the manifest count too.
+        taken = [s["name"] for s in segments] + [n for n in os.listdir(self.root) if n.startswith("seg-")]
+        return f"seg-{max([int(name[4:]) for name in taken] + [0]) + 1:06d}"
+
+    # -- writing -----------------------------------------------------------
+
+    def append(self, entries, if_empty=False, clamp=False):
+        """Append entries (a dict of columns or a list of row dicts).
+
+        Timestamps must not go back in time: the batch is ordered by ``ts``
+        and must start no earlier than the log's latest entry. With
+        ``clamp`` (entries stamped with the current time, which a concurrent
+        writer may have overtaken before this one got the lock), earlier
+        timestamps are raised to the latest entry's instead. Returns the
+        seq of the first appended entry. With ``if_empty`` (seeding), nothing
+        is appended if another writer got there first; returns None then.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        table = _table(entries)
+        if not len(table):
+            return self._reload()["next_seq"]
+        table = table.take(pc.sort_indices(table, [("ts", "ascending")]))
+        with self._writing():
+            if if_empty and self.manifest["next_seq"]:
+                return None
+            segments = self.manifest["segments"]
+            first_ts = table.column("ts").cast("int64")[0].as_py()
+            if segments and first_ts < segments[-1]["ts_max"]:
+                if not clamp:
+                    raise ValueError("audit log is append-only: entries are older than the latest entry")
+                latest = pa.scalar(segments[-1]["ts_max"], pa.timestamp("us"))
+                table = table.set_column(0, "ts", pc.max_element_wise(table.column("ts"), latest))
+            first_seq = self.manifest["next_seq"]
+            meta = _write_segment(self.root, self._next_name(segments), table, first_seq)
+            self._save({"segments": segments + [meta], "next_seq": first_seq + len(table)})
+            small = [s for s in self.manifest["segments"] if s["rows"] < COMPACT_BELOW]
+            if len(small) > 16:
+                self._compact()
+        return first_seq
+
+    def compact(self):
+        """Merge runs of adjacent small segments into one segment each."""
+        with self._writing():
+            self._compact()
+
+    def _compact(self):
+        import pyarrow as pa
+
+        merged, run = [], []
+        plain = pa.schema([(f.name, pa.string() if pa.types.is_dictionary(f.type) else f.type) for f in _schema()])
+
+        def flush():
+            if len(run) > 1:
+                # Decode the per-segment dictionaries (whatever their index
+                # width when written); _table re-encodes them as one.
+                table = pa.concat_tables([self._segment(m).table.cast(plain) for m in run])
+                columns = {c: table.column(c) for c in COLUMNS}
+                merged.append(_write_segment(self.root, self._next_name(self.manifest["segments"] + merged),
+                                             _table(columns), run[0]["first_seq"]))
+            else:
+                merged.extend(run)
+            run.clear()
+
+        for meta in self.manifest["segments"]:
+            if meta["rows"] < COMPACT_BELOW:
+                run.append(meta)
+            else:
+                flush()
+                merged.append(meta)
+        flush()
+        self._save({"segments": merged, "next_seq": self.manifest["next_seq"]})
+
+    # -- reading -----------------------------------------------------------
+
+    def page(self, before=None, limit=50, user=None, action=None, contribution=None, since=None, until=None):
+        """One page of entries, newest first, matching every given filter.
+
+        ``before`` is the cursor from the previous page (entries with a
+        smaller seq are returned). ``since``/``until`` bound the timestamp
+        (anything ``numpy.datetime64`` accepts, inclusive).
+        """
+        try:
+            return self._page(before, limit, user, action, contribution, since, until)
+        except FileNotFoundError:  # another process compacted the segments away: read its manifest
+            self._version = None
+            return self._page(before, limit, user, action, contribution, since, until)
+
+    def _page(self, before, limit, user, action, contribution, since, until):
+        since = None if since is None else int(np.datetime64(since, "us").astype(np.int64))
+        until = None if until is None else int(np.datetime64(until, "us").astype(np.int64))
+        contribution_hash = None if contribution is None else np.uint64(hash_ids([contribution])[0])
+        manifest = self._reload()
+        before = manifest["next_seq"] if before is None else before
+        segments = manifest["segments"]
+        found, taken, scanned, examined = [], 0, 0, 0
+
+        for meta in reversed(segments):
+            if taken >= limit:
+                break
+            if (meta["first_seq"] >= before
+                    or (since is not None and meta["ts_max"] < since)
+                    or (until is not None and meta["ts_min"] > until)
+                    or (user is not None and user not in meta["users"])
+                    or (action is not None and action not in meta["actions"])):
+                continue
+            scanned += 1
+            segment = self._segment(meta)
+            end = min(before - segment.first, segment.rows)
+            lo = 0 if since is None else int(np.searchsorted(segment.ts, since, side="left"))
+            hi = end if until is None else min(end, int(np.searchsorted(segment.ts, until, side="right")))
+            rows = segment.candidates(user, contribution, contribution_hash)
+            if rows is None:  # no index applies: every row in [lo, hi)
+                floor, stop, pick = lo, hi, np.arange
+            else:
+                rows = rows[(rows >= lo) & (rows < hi)]
+                floor, stop, pick = 0, len(rows), lambda a, b, rows=rows: rows[a:b]
+            action_code = None if action is None else segment.code("action", action)
+
+            # Newest rows first, a block at a time, until the page is full.
+            # Without the action filter every candidate matches: read just enough.
+            while stop > floor and taken < limit:
+                start = max(stop - (SCAN_BLOCK if action_code is not None else limit - taken), floor)
+                block = pick(start, stop)
+                examined += len(block)
+                if action_code is not None:
+                    block = block[segment.indices("action", block) == action_code]
+                block = block[::-1][:limit - taken]
+                found.append((segment, block))
+                taken += len(block)
+                stop = start
+
+        entries = []
+        for segment, rows in found:
+            for row, record in zip(rows.tolist(), segment.table.take(rows).to_pylist()):
+                entries.append(dict(seq=segment.first + row, **record))
+        more = len(entries) == limit and entries[-1]["seq"] > 0
+        return Page(entries, entries[-1]["seq"] if more else None, scanned, len(segments), examined)
+
+    def history(self, contribution):
+        """Every entry for one contribution, oldest first."""
+        entries, cursor = [], None
+        while True:
+            page = self.page(before=cursor, limit=500, contribution=contribution)
+            entries += page.entries
+            if page.cursor is None:
+                return entries[::-1]
+            cursor = page.cursor
+
+
+# -- Synthetic history --------------------------------------------------------
+
+USERS = ("system", "a.smith", "j.doe", "m.garcia", "k.lee", "r.patel")
+WORKFLOW = (("uploaded", "scan received"), ("extracted", "fields extracted"), ("validated", "checks passed"),
+            ("checked", "compliance: pass"), ("reported", "report generated"))
+REVIEW = (("reviewed", "flagged for review"), ("amended", "employer corrected"), ("approved", "approved"),
+          ("exported", "included in filing"))
+
+
+def synthetic_history(n, start="2024-01-01", seconds=86_400 * 365, seed=0, first_id=0):
+    """Columns for about ``n`` audit entries of synthetic contributions.
+
+    Each contribution gets the five pipeline entries from ``system`` and,
+    for about a third, review entries by a staff user.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    rng = np.random.default_rng(seed)
+    per = len(WORKFLOW) + len(REVIEW) / 3
+    count = max(1, int(n / per))
+    ids = np.arange(first_id, first_id + count)
+    steps = np.repeat(len(WORKFLOW), count) + np.where(rng.random(count) < 1 / 3, len(REVIEW), 0)
+    contribution = np.repeat(ids, steps)
+    step = np.arange(len(contribution)) - np.repeat(np.cumsum(steps) - steps, steps)
+    base = np.sort(rng.integers(0, seconds, count)) * 1_000_000
+    spacing = np.repeat(rng.integers(60, 3_600, count), steps) * 1_000_000
+    ts = np.datetime64(start, "us") + np.repeat(base, steps) + step * spacing
+    names = np.array([a for a, _ in WORKFLOW + REVIEW])
+    details = np.array([d for _, d in WORKFLOW + REVIEW])
+    user = np.where(step < len(WORKFLOW), 0, rng.integers(1, len(USERS), len(step)))
+    text = pc.utf8_slice_codeunits(pc.cast(pa.array(contribution + 100_000_000), pa.string()), 1)
+    order = np.argsort(ts, kind="stable")
+    return {
+        "ts": ts[order],
+        "user": np.array(USERS)[user][order],
+        "action": names[step][order],
+        "contribution": pc.binary_join_element_wise("C", text, "").take(pa.array(order)),
+        "detail": details[step][order],
+    }
@@ -0,0 +1,136 @@
+"""Numeric budget model and vectorized Monte Carlo risk simulation.
+
+The model lives under ``budget:`` in ``deck.yaml``. Each category has either a
+``monthly`` cost for ``months`` months or a ``one_time`` cost, plus a
+``range: [low, high]`` of multipliers on the planned amount. Every simulated
+scenario draws each category-month from a triangular(low, 1, high)
+distribution around the plan; all scenarios are drawn as one NumPy array.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Category(NamedTuple):
+    name: str
+    monthly: float  # 0 for one-time costs
+    months: int
+    one_time: float
+    low: float
+    high: float
+
+    @property
+    def planned(self):
+        return self.monthly * self.months + self.one_time
+
+
+class BudgetModel(NamedTuple):
+    categories: tuple
+    months: int
+    buffer_pct: float
+
+    @property
+    def planned(self):
+        return sum(c.planned for c in self.categories)
+
+    @property
+    def buffer(self):
+        return self.planned * self.buffer_pct / 100
+
+    @property
+    def total(self):
+        return self.planned + self.buffer
+
+
+def parse_budget(raw):
+    """Build a ``BudgetModel`` from the ``budget:`` mapping of the spec."""
+    months = int(raw["months"])
+    categories = []
+    for item in raw["categories"]:
+        low, high = item.get("range", [1, 1])
+        if not 0 <= low <= 1 <= high:
+            raise ValueError(f"budget category {item['name']!r}: range must satisfy low <= 1 <= high")
+        categories.append(Category(
+            name=item["name"],
+            monthly=float(item.get("monthly", 0)),
+            months=int(item.get("months", months if "monthly" in item else 0)),
+            one_time=float(item.get("one_time", 0)),
+            low=float(low),
+            high=float(high),
+        ))
+    return BudgetModel(tuple(categories), months, float(raw.get("buffer_pct", 0)))
+
+
+def money(value):
+    return f"${value:,.0f}"
+
+
+def money_short(value):
+    """$540k / $3M style amounts for prose."""
+    for divisor, suffix in ((1e6, "M"), (1e3, "k")):
+        if abs(value) >= divisor:
+            return f"${value / divisor:,.3g}{suffix}"
+    return money(value)
+
+
+def cost_table(model):
+    """Columns for the Budget tab's cost breakdown, with computed totals."""
+    monthly_buffer = sum(c.monthly for c in model.categories) * model.buffer_pct / 100
+    return {
+        "Category": [c.name for c in model.categories] + [f"Buffer ({model.buffer_pct:g}%)"],
+        "Monthly Cost": [money(c.monthly) if c.monthly else "-" for c in model.categories]
+                        + [money(monthly_buffer)],
+        f"{model.months}-Month Total": [money(c.planned) for c in model.categories]
+                                       + [money(model.buffer)],
+    }
+
+
+def simulate(model, n=100_000, spread=1.0, seed=0, chunk=100_000):
+    """Simulate ``n`` scenarios of total spend over the model's horizon.
+
+    ``spread`` scales every category's uncertainty range around the plan.
+    Scenarios are drawn ``chunk`` at a time to bound peak memory. Returns an
+    array of ``n`` scenario totals.
+    """
+    # One column per category-month (or per one-time cost).
+    planned, low, high = [], [], []
+    for c in model.categories:
+        lo = max(1 - (1 - c.low) * spread, 0.0)
+        hi = 1 + (c.high - 1) * spread
+        for amount in [c.monthly] * c.months + ([c.one_time] if c.one_time else []):
+            planned.append(amount)
+            low.append(lo)
+            high.append(hi)
+    planned = np.asarray(planned)
+    low = np.asarray(low)
+    high = np.asarray(high)
+
+    # numpy's triangular() rejects left == right, so sample the unit shape
+    # Tri(0, mode, 1) by inverse CDF and scale it into [low, high] per column.
+    width = high - low
+    mode = np.divide(1.0 - low, width, out=np.zeros_like(width), where=width > 0)
+
+    rng = np.random.default_rng(seed)
+    totals = np.empty(n)
+    for start in range(0, n, chunk):
+        u = rng.random((min(chunk, n - start), planned.size))
+        x = np.where(u < mode, np.sqrt(u * mode), 1 - np.sqrt((1 - u) * (1 - mode)))
+        totals[start:start + len(u)] = (low + x * width) @ planned
+    return totals
+
+
+def risk_summary(model, totals, bins=40):
+    """P50/P90 spend, overrun probability and a histogram of ``totals``."""
+    p50, p90 = np.percentile(totals, [50, 90])
+    counts, edges = np.histogram(totals, bins=bins)
+    return {
+        "planned": model.planned,
+        "budget": model.total,
+        "p50": float(p50),
+        "p90": float(p90),
+        "p_over_plan": float(np.mean(totals > model.planned)),
+        "p_over_budget": float(np.mean(totals > model.total)),
+        "hist_centers": ((edges[:-1] + edges[1:]) / 2).tolist(),
+        "hist_counts": counts.tolist(),
+    }
@@ -0,0 +1,298 @@
+"""Jurisdiction contribution rules, declared as data and checked in batches.
+
+Each jurisdiction in ``deck.yaml`` declares its limits -- per contribution, and
+per donor and committee over a rolling ``window_days`` -- the source types it
+prohibits, cash and anonymous limits, and the aggregate above which a donor's
+employer and occupation must be reported. ``RuleSet`` compiles them into
+per-jurisdiction parameter arrays, so every rule is a single vectorized
+expression over a whole batch in which each row reads its own jurisdiction's
+thresholds by index. Rolling per-donor totals are computed once per distinct
+window length and shared by every rule and jurisdiction that uses it.
+
+The demo values in the deck are illustrative, not legal guidance.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+SOURCE_TYPES = ("individual", "corporation", "union", "pac", "anonymous")
+METHODS = ("check", "card", "cash", "wire")
+STATUSES = ("pass", "review", "fail")
+
+# Columns ``check_batch`` reads. donor/committee may be strings or integer
+# ids; source/method/jurisdiction are strings or categoricals.
+BATCH_COLUMNS = ("donor", "committee", "jurisdiction", "source", "method", "amount", "date", "disclosed")
+
+
+class Jurisdiction(NamedTuple):
+    code: str
+    name: str
+    individual_limit: float  # per contribution; inf = no limit
+    aggregate_limit: float  # per donor and committee within window_days; inf = no limit
+    window_days: int
+    cash_limit: float
+    anonymous_limit: float
+    itemize_over: float  # employer/occupation required once the donor's window total exceeds this
+    prohibited: tuple = ()
+
+
+def _limit(value):
+    return float("inf") if value is None else float(value)
+
+
+def parse_jurisdictions(raw):
+    jurisdictions = []
+    for item in raw:
+        prohibited = tuple(item.get("prohibited", ()))
+        for source in prohibited:
+            if source not in SOURCE_TYPES:
+                raise ValueError(f"jurisdiction {item['code']}: unknown source type '{source}'")
+        jurisdictions.append(Jurisdiction(
+            code=item["code"],
+            name=item.get("name", item["code"]),
+            individual_limit=_limit(item.get("individual_limit")),
+            aggregate_limit=_limit(item.get("aggregate_limit")),
+            window_days=int(item.get("window_days", 365)),
+            cash_limit=float(item["cash_limit"]),
+            anonymous_limit=float(item["anonymous_limit"]),
+            itemize_over=float(item["itemize_over"]),
+            prohibited=prohibited,
+        ))
+    return tuple(jurisdictions)
+
+
+# -- Rules --------------------------------------------------------------------
+
+class Rule(NamedTuple):
+    id: str
+    status: str  # what a hit makes the row: review or fail
+    message: str  # formatted with the row's Jurisdiction
+
+
+RULES = (
+    Rule("unknown_jurisdiction", "fail", "unknown jurisdiction"),
+    Rule("unreadable", "review", "amount, source or date could not be read"),
+    Rule("prohibited_source", "fail", "{source} contributions are prohibited"),
+    Rule("anonymous_limit", "fail", "anonymous over ${j.anonymous_limit:,.0f}"),
+    Rule("individual_limit", "fail", "over the ${j.individual_limit:,.0f} limit"),
+    Rule("aggregate_limit", "fail", "donor total over ${j.aggregate_limit:,.0f} in {j.window_days} days"),
+    Rule("cash_limit", "fail", "cash over ${j.cash_limit:,.0f}"),
+    Rule("itemization", "review", "employer/occupation required over ${j.itemize_over:,.0f}"),
+    Rule("refund", "review", "refund: match to the original contribution"),
+)
+RULE_BITS = {rule.id: np.uint16(1 << i) for i, rule in enumerate(RULES)}
+_FAIL_MASK = sum(int(RULE_BITS[r.id]) for r in RULES if r.status == "fail")
+_REVIEW_MASK = sum(int(RULE_BITS[r.id]) for r in RULES if r.status == "review")
+
+
+class RuleSet:
+    """Jurisdiction rules compiled to arrays indexed by jurisdiction code."""
+
+    def __init__(self, jurisdictions):
+        self.jurisdictions = tuple(jurisdictions)
+        self.codes = [j.code for j in self.jurisdictions]
+        js = self.jurisdictions
+
+        def column(field):
+            # One trailing row for unknown jurisdictions; its rules never fire.
+            return np.array([getattr(j, field) for j in js] + [np.inf])
+
+        self.individual_limit = column("individual_limit")
+        self.aggregate_limit = column("aggregate_limit")
+        self.cash_limit = column("cash_limit")
+        self.anonymous_limit = column("anonymous_limit")
+        self.itemize_over = column("itemize_over")
+        self.windows = sorted({j.window_days for j in js})
+        self.window_index = np.array([self.windows.index(j.window_days) for j in js] + [0])
+        self.prohibited = np.zeros((len(js) + 1, len(SOURCE_TYPES)), dtype=bool)
+        for i, j in enumerate(js):
+            for source in j.prohibited:
+                self.prohibited[i, SOURCE_TYPES.index(source)] = True
+
+    def explain(self, flags, code, source=""):
+        """Reasons for one row's rule ``flags`` under jurisdiction ``code``."""
+        # Rules that format jurisdiction fields never fire for unknown codes.
+        j = self.jurisdictions[self.codes.index(code)] if code in self.codes else None
+        return [rule.message.format(j=j, source=source) for rule in RULES if int(flags) & int(RULE_BITS[rule.id])]
+
+
+@lru_cache(maxsize=8)
+def rule_set(jurisdictions):
+    """The compiled ``RuleSet`` for ``jurisdictions`` (a tuple), built once per process."""
+    return RuleSet(jurisdictions)
+
+
+# -- Batch evaluation ---------------------------------------------------------
+
+def category_codes(values, vocabulary):
+    """Integer codes of ``values`` in ``vocabulary``; len(vocabulary) for anything else."""
+    import pandas as pd
+
+    values = pd.Series(values, copy=False)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.array([vocabulary.index(c) if c in vocabulary else len(vocabulary)
+                           for c in values.cat.categories] + [len(vocabulary)])
+        return lookup[values.cat.codes.to_numpy()]  # code -1 (missing) -> last entry
+    codes = pd.Categorical(values, categories=list(vocabulary)).codes.astype(np.int64)
+    codes[codes < 0] = len(vocabulary)
+    return codes
+
+
+def window_totals(group, days, amount, windows):
+    """Per-row total of the row's group within each rolling window.
+
+    ``group`` is an integer donor/committee key and ``days`` an integer day
+    number. Returns one float array per window length in ``windows``: the sum
+    of the group's amounts dated in ``(day - window, day]``, so every
+    contribution counts everything given on or before its own day. One sort
+    and one cumulative sum serve all window lengths.
+    """
+    first = days.min()
+    span = int(days.max() - first) + max(windows) + 2
+    # Offset by the longest window so a window start never reaches the
+    # previous group's key range.
+    composite = group * span + (days - first + max(windows))
+    order = np.argsort(composite)
+    keys = composite[order]
+    cumulative = np.concatenate(([0.0], np.cumsum(np.nan_to_num(amount[order]))))
+    # Right edge: include same-day contributions, whatever their batch order.
+    right = np.searchsorted(keys, keys, side="right")
+    totals = []
+    for window in windows:
+        left = np.searchsorted(keys, keys - window + 1, side="left")
+        total = np.empty(len(keys))
+        total[order] = cumulative[right] - cumulative[left]
+        totals.append(total)
+    return totals
+
+
+def check_batch(batch, rules):
+    """Check every contribution in ``batch`` against its jurisdiction's rules.
+
+    ``batch`` is a DataFrame with ``BATCH_COLUMNS``. Returns a DataFrame with
+    ``status`` (categorical pass/review/fail), ``flags`` (bit per hit rule, see
+    ``RULES`` and ``RuleSet.explain``) and ``window_total`` (the donor's total
+    with this committee over its jurisdiction's window).
+    """
+    import pandas as pd
+
+    n = len(batch)
+    if n == 0:
+        return pd.DataFrame({"status": pd.Categorical([], categories=STATUSES),
+                             "flags": np.zeros(0, np.uint16), "window_total": np.zeros(0)}, index=batch.index)
+    amount = batch["amount"].to_numpy(dtype=float, na_value=np.nan)
+    jurisdiction = category_codes(batch["jurisdiction"], rules.codes)
+    source = category_codes(batch["source"], SOURCE_TYPES)
+    cash = category_codes(batch["method"], METHODS) == METHODS.index("cash")
+    disclosed = batch["disclosed"].to_numpy(dtype=bool)
+    dates = batch["date"].to_numpy(dtype="datetime64[D]")
+    dated = ~np.isnat(dates)
+    days = dates.astype(np.int64)
+    days[~dated] = days[dated].min() if dated.any() else 0
+
+    # Donor x committee (x jurisdiction) groups, shared by every windowed rule.
+    donor = pd.factorize(batch["donor"])[0].astype(np.int64)
+    committee = pd.factorize(batch["committee"])[0].astype(np.int64)
+    group = (donor * (int(committee.max()) + 1) + committee) * (len(rules.codes) + 1) + jurisdiction
+    by_window = window_totals(group, days, amount, rules.windows)
+    window_total = np.choose(rules.window_index[jurisdiction], by_window)
+
+    flags = _flags(rules, jurisdiction, source, cash, amount, dated, disclosed, window_total)
+    return pd.DataFrame({
+        "status": pd.Categorical.from_codes(_status(flags), categories=STATUSES),
+        "flags": flags,
+        "window_total": window_total,
+    }, index=batch.index)
+
+
+def _flags(rules, jurisdiction, source, cash, amount, dated, disclosed, window_total):
+    """Rule bits per row; every argument is an array (or scalar) of row values, ``jurisdiction`` and ``source`` coded."""
+    known_source = source < len(SOURCE_TYPES)
+    individual = source == SOURCE_TYPES.index("individual")
+    readable = ~np.isnan(amount) & known_source & dated
+    hits = {
+        "unknown_jurisdiction": jurisdiction == len(rules.codes),
+        "unreadable": ~readable,
+        "prohibited_source": known_source & rules.prohibited[jurisdiction, np.minimum(source, len(SOURCE_TYPES) - 1)],
+        "anonymous_limit": (source == SOURCE_TYPES.index("anonymous")) & (amount > rules.anonymous_limit[jurisdiction]),
+        "individual_limit": individual & (amount > rules.individual_limit[jurisdiction]),
+        "aggregate_limit": individual & (window_total > rules.aggregate_limit[jurisdiction]),
+        "cash_limit": cash & (amount > rules.cash_limit[jurisdiction]),
+        "itemization": individual & ~disclosed & (window_total > rules.itemize_over[jurisdiction]),
+        "refund": amount < 0,
+    }
+    flags = np.zeros(len(jurisdiction), dtype=np.uint16)
+    for rule_id, hit in hits.items():
+        flags |= np.where(hit, RULE_BITS[rule_id], np.uint16(0))
+    return flags
+
+
+def _status(flags):
+    return np.where(flags & _FAIL_MASK, 2, np.where(flags & _REVIEW_MASK, 1, 0)).astype(np.int8)
+
+
+def check_everywhere(record, rules):
+    """``[(status, reasons)]`` for one record dict under each jurisdiction of ``rules``, in ``rules.codes`` order.
+
+    The same verdicts as ``check_records`` over one copy of the record per
+    jurisdiction, without building a batch: a lone contribution is its own
+    window total.
+    """
+    jurisdiction = np.arange(len(rules.codes))
+    source = record.get("source")
+    source = SOURCE_TYPES.index(source) if source in SOURCE_TYPES else len(SOURCE_TYPES)
+    amount = np.nan if record.get("amount") is None else float(record["amount"])
+    disclosed = np.bool_(record.get("employer") and record.get("occupation"))
+    flags = _flags(rules, jurisdiction, source, record.get("method") == "cash", amount,
+                   np.bool_(record.get("date") is not None), disclosed, amount)
+    return [(STATUSES[status], rules.explain(f, code, record.get("source") or ""))
+            for status, f, code in zip(_status(flags), flags, rules.codes)]
+
+
+def check_records(records, rules):
+    """Convenience wrapper: ``[(status, reasons)]`` for a list of record dicts."""
+    import pandas as pd
+
+    batch = pd.DataFrame({
+        "donor": [r.get("contributor") or "" for r in records],
+        "committee": [r.get("committee") or "" for r in records],
+        "jurisdiction": [r.get("jurisdiction") for r in records],
+        "source": [r.get("source") for r in records],
+        "method": [r.get("method") for r in records],
+        "amount": [np.nan if r.get("amount") is None else r["amount"] for r in records],
+        "date": pd.to_datetime([r.get("date") for r in records]),
+        "disclosed": [bool(r.get("employer") and r.get("occupation")) for r in records],
+    })
+    result = check_batch(batch, rules)
+    return [
+        (status, rules.explain(flags, record.get("jurisdiction"), record.get("source") or ""))
+        for status, flags, record in zip(result["status"], result["flags"], records)
+    ]
+
+
+def synthetic_batch(n, codes, seed=0, donor_offset=0, start="2025-01-01", days=730):
+    """A synthetic batch of ``n`` contributions in ``BATCH_COLUMNS`` form.
+
+    Repeat donors (a minority gives most contributions, ids from
+    ``donor_offset`` so separately generated batches don't share donors),
+    200 committees, jurisdictions ``codes`` and categorical source/method
+    columns, dated over ``days`` from ``start``. Used by benchmarks and demos.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    donors = max(1, n // 8)
+    return pd.DataFrame({
+        "donor": donor_offset + (donors * rng.power(0.3, n)).astype(np.int64),
+        "committee": rng.integers(0, 200, n, dtype=np.int32),
+        "jurisdiction": pd.Categorical.from_codes(rng.integers(0, len(codes), n, dtype=np.int8), codes),
+        "source": pd.Categorical.from_codes(
+            rng.choice(len(SOURCE_TYPES), n, p=[0.9, 0.03, 0.02, 0.04, 0.01]).astype(np.int8), SOURCE_TYPES),
+        "method": pd.Categorical.from_codes(
+            rng.choice(len(METHODS), n, p=[0.5, 0.4, 0.08, 0.02]).astype(np.int8), METHODS),
+        "amount": np.round(rng.lognormal(4.6, 1.1, n), 2),
+        "date": np.datetime64(start) + rng.integers(0, days, n).astype("timedelta64[D]"),
+        "disclosed": rng.random(n) < 0.9,
+    })
@@ -0,0 +1,213 @@
+"""Static HTML export of the whole deck.
+
+Renders every section of the deck spec -- text blocks, metrics, tables and
+charts -- into one self-contained ``index.html`` that can be served from any
+static file server. plotly.js is embedded once and shared by all charts, and
+each chart is drawn from the same cached JSON spec the live app sends.
+
+    python -m compdeck.export_html --out site
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+
+from compdeck.figures import get_figure
+from compdeck.spec import DEFAULT_PATH, load_deck
+from compdeck.widgets import WIDGETS
+
+CSS = """
+body { font-family: "Source Sans Pro", -apple-system, "Segoe UI", sans-serif; color: #31333f;
+       margin: 0; padding: 0 3rem 3rem; line-height: 1.6; }
+h1 { font-size: 2.75rem; margin: 1.5rem 0 0.5rem; }
+nav { position: sticky; top: 0; background: white; padding: 0.75rem 0; display: flex;
+      flex-wrap: wrap; gap: 8px; z-index: 10; border-bottom: 1px solid #e6e6e6; }
+nav a { padding: 12px 20px; background-color: #f0f2f6; border-radius: 5px;
+        text-decoration: none; color: inherit; }
+nav a:hover { background-color: #1f77b4; color: white; }
+section { padding-top: 1rem; scroll-margin-top: 70px; }
+.columns { display: flex; gap: 1.5rem; }
+.columns > .column { flex: 1 1 0; min-width: 0; }
+.alert { padding: 1rem; border-radius: 0.5rem; margin: 1rem 0; }
+.alert p:first-child { margin-top: 0; } .alert p:last-child { margin-bottom: 0; }
+.info { background: rgba(28, 131, 225, 0.1); color: #004280; }
+.success { background: rgba(33, 195, 84, 0.1); color: #177233; }
+.warning { background: rgba(255, 193, 7, 0.15); color: #926c05; }
+.error { background: rgba(255, 43, 43, 0.09); color: #7d353b; }
+.metric { margin: 0.5rem 0 1rem; }
+.metric .label { font-size: 0.875rem; }
+.metric .value { font-size: 2.25rem; line-height: 1.2; }
+.metric .delta { display: inline-block; font-size: 0.875rem; padding: 0 0.4rem; border-radius: 1rem;
+                 color: #09ab3b; background: rgba(9, 171, 59, 0.1); }
+.metric .delta.down { color: #ff2b2b; background: rgba(255, 43, 43, 0.1); }
+table.dataframe { border-collapse: collapse; width: 100%; font-size: 0.875rem; margin: 0.5rem 0 1rem; }
+table.dataframe th, table.dataframe td { border: 1px solid #e6e6e6; padding: 0.25rem 0.5rem; text-align: left; }
+table.dataframe thead th { background: #f0f2f6; }
+pre { background: #f0f2f6; padding: 1rem; border-radius: 0.5rem; }
+.highlight-box { background-color: #e8f4f8; padding: 15px; border-radius: 8px;
+                 border-left: 4px solid #1f77b4; margin: 15px 0; }
+footer { margin-top: 2rem; }
+"""
+
+CHART_CONFIG = {"displaylogo": False, "responsive": True}
+
+
+class HtmlExporter:
+    """Turns deck blocks into HTML fragments, collecting chart specs as it goes."""
+
+    def __init__(self, deck):
+        import markdown_it
+
+        self.deck = deck
+        self.md = markdown_it.MarkdownIt("commonmark", {"html": True}).enable("table")
+        self.charts = []
+
+    def markdown(self, text):
+        return self.md.render(text)
+
+    def blocks(self, blocks):
+        return "\n".join(getattr(self, f"block_{block['type']}")(block) for block in blocks)
+
+    def block_header(self, block):
+        return f"<h2>{html.escape(block['text'])}</h2>"
+
+    def block_subheader(self, block):
+        return f"<h3>{html.escape(block['text'])}</h3>"
+
+    def block_markdown(self, block):
+        return self.markdown(block["text"])
+
+    def _alert(self, kind, block):
+        return f'<div class="alert {kind}">{self.markdown(block["text"])}</div>'
+
+    def block_info(self, block):
+        return self._alert("info", block)
+
+    def block_success(self, block):
+        return self._alert("success", block)
+
+    def block_warning(self, block):
+        return self._alert("warning", block)
+
+    def block_error(self, block):
+        return self._alert("error", block)
+
+    def block_metric(self, block):
+        delta = block.get("delta")
+        delta_html = ""
+        if delta:
+            direction = "down" if str(delta).startswith("-") else "up"
+            arrow = "↓" if direction == "down" else "↑"
+            delta_html = f'<div class="delta {direction}">{arrow} {html.escape(str(delta))}</div>'
+        return (
+            '<div class="metric">'
+            f'<div class="label">{html.escape(block["label"])}</div>'
+            f'<div class="value">{html.escape(str(block["value"]))}</div>'
+            f"{delta_html}</div>"
+        )
+
+    def block_columns(self, block):
+        columns = "".join(f'<div class="column">{self.blocks(c)}</div>' for c in block["columns"])
+        return f'<div class="columns">{columns}</div>'
+
+    def block_table(self, block):
+        return self.deck.table(block).to_html(border=0, classes="dataframe")
+
+    def block_chart(self, block):
+        figure = self.deck.chart(block)
+        spec = get_figure(figure["type"], figure["data"]).spec
+        div_id = f"chart-{len(self.charts)}"
+        self.charts.append((div_id, spec))
+        return f'<div id="{div_id}" class="chart"></div>'
+
+    def block_widget(self, block):
+        return self.blocks(WIDGETS[block["name"]].static(self.deck, block))
+
+    def section(self, section):
+        return (
+            f'<section id="{section["id"]}">\n{self.blocks(section["blocks"])}\n</section>'
+        )
+
+    def chart_script(self):
+        """One script that draws every chart from its spec with the shared plotly.js."""
+        specs = ",\n".join(f"[{json.dumps(div_id)}, {spec}]" for div_id, spec in self.charts)
+        return (
+            f"<script>\nconst CHARTS = [\n{specs}\n];\n"
+            f"for (const [id, fig] of CHARTS) {{ Plotly.newPlot(id, fig.data, fig.layout, "
+            f"{json.dumps(CHART_CONFIG)}); }}\n</script>"
+        )
+
+
+def render_html(deck, plotlyjs="inline"):
+    """Render the whole deck as one HTML document.
+
+    ``plotlyjs="inline"`` embeds plotly.js once in the page; ``"cdn"`` links it
+    from the plotly CDN instead for a much smaller file.
+    """
+    exporter = HtmlExporter(deck)
+    page = deck.page
+    nav = "".join(
+        f'<a href="#{s["id"]}">{html.escape(s["label"])}</a>' for s in deck.sections
+    )
+    body = "\n<hr>\n".join(exporter.section(s) for s in deck.sections)
+
+    if plotlyjs == "cdn":
+        from plotly.offline import get_plotlyjs_version
+
+        plotly_tag = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+    else:
+        from plotly.offline import get_plotlyjs
+
+        plotly_tag = f"<script>{get_plotlyjs()}</script>"
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(page["title"])}</title>
+<style>{CSS}</style>
+{plotly_tag}
+</head>
+<body>
+<h1>{html.escape(page["heading"])}</h1>
+<h3>{html.escape(page.get("subheading", ""))}</h3>
+<nav>{nav}</nav>
+{body}
+<hr>
+<footer>{exporter.markdown(page.get("footer", ""))}</footer>
+{exporter.chart_script()}
+</body>
+</html>
+"""
+
+
+def export(out_dir, spec_path=DEFAULT_PATH, plotlyjs="inline"):
+    """Write ``index.html`` for the deck into ``out_dir``; returns its path."""
+    deck = load_deck(spec_path)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_html(deck, plotlyjs))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the deck as a static HTML site.")
+    parser.add_argument("--out", default="site", help="output directory (default: site)")
+    parser.add_argument("--spec", default=DEFAULT_PATH, help="deck spec to export")
+    parser.add_argument("--plotlyjs", choices=["inline", "cdn"], default="inline")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = export(args.out, args.spec, args.plotlyjs)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB) in {elapsed:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""Batch PDF / image export of the deck for emailing to partners.
+
+Every chart is rendered locally with kaleido in a process pool, and each image
+is cached on disk under a hash of its Plotly JSON spec and render settings.
+Re-exporting after a text edit -- or exporting several partner-customized
+specs that share most charts -- only renders the images that changed. Each
+deck then gets one PDF (every section starts a new page, charts embedded as
+PNG) plus the individual chart images.
+
+    python -m compdeck.export_pdf --spec deck.yaml --spec partner_acme.yaml --out exports
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from compdeck.figures import get_figure
+from compdeck.spec import DEFAULT_PATH, load_deck
+from compdeck.widgets import WIDGETS
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(DEFAULT_PATH), ".export_cache", "images")
+
+# Size the charts render at; PNGs use SCALE x for crisp PDF embedding.
+WIDTH = 900
+HEIGHT = 450
+SCALE = 2
+
+
+def image_key(spec, fmt, width=WIDTH, height=HEIGHT, scale=SCALE):
+    """Content hash identifying one rendered image."""
+    payload = f"{fmt}:{width}x{height}@{scale}\n{spec}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render_image(spec, fmt, width, height, scale, dest):
+    # Runs in a worker process.
+    import plotly.io as pio
+
+    fig = pio.from_json(spec)
+    data = pio.to_image(fig, format=fmt, width=width, height=height, scale=scale)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dest)
+    return dest
+
+
+class ImageCache:
+    """Content-addressed store of rendered chart images."""
+
+    def __init__(self, root=DEFAULT_CACHE):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, spec, fmt):
+        return os.path.join(self.root, f"{image_key(spec, fmt)}.{fmt}")
+
+    def render_missing(self, jobs, workers=None):
+        """Render every ``(spec, fmt)`` in ``jobs`` that is not cached yet.
+
+        Returns the number of images rendered.
+        """
+        todo = {}
+        for spec, fmt in jobs:
+            dest = self.path(spec, fmt)
+            if not os.path.exists(dest):
+                todo[dest] = (spec, fmt)
+        if not todo:
+            return 0
+        workers = min(len(todo), workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_render_image, spec, fmt, WIDTH, HEIGHT, SCALE, dest)
+                for dest, (spec, fmt) in todo.items()
+            ]
+            for future in futures:
+                future.result()
+        return len(todo)
+
+
+def _pdf_text(text):
+    """Escape for reportlab markup and drop glyphs the built-in fonts lack (emoji)."""
+    text = text.replace("\ufe0f", "").replace("\u20e3", "")
+    text = "".join(ch for ch in text if ch.encode("cp1252", "ignore"))
+    return html.escape(text, quote=False)
+
+
+class PdfBuilder:
+    """Turns deck blocks into reportlab flowables."""
+
+    def __init__(self, deck, cache):
+        from markdown_it import MarkdownIt
+        from reportlab.lib.styles import getSampleStyleSheet
+
+        self.deck = deck
+        self.cache = cache
+        self.md = MarkdownIt("commonmark", {"html": True})
+        self.styles = getSampleStyleSheet()
+
+    # -- markdown ---------------------------------------------------------
+
+    def _inline(self, token):
+        out = []
+        for child in token.children or []:
+            if child.type == "text":
+                out.append(_pdf_text(child.content))
+            elif child.type in ("softbreak", "hardbreak"):
+                out.append("<br/>")
+            elif child.type == "code_inline":
+                out.append(f'<font face="Courier">{_pdf_text(child.content)}</font>')
+            elif child.type.endswith("_open") and child.tag in ("strong", "em"):
+                out.append("<b>" if child.tag == "strong" else "<i>")
+            elif child.type.endswith("_close") and child.tag in ("strong", "em"):
+                out.append("</b>" if child.tag == "strong" else "</i>")
+        return "".join(out).strip()
+
+    def markdown(self, text, style="BodyText"):
+        from reportlab.platypus import Paragraph, Preformatted
+
+        flowables = []
+        lists = []  # stack of [kind, counter]
+        heading = None
+        for token in self.md.parse(text):
+            if token.type in ("bullet_list_open", "ordered_list_open"):
+                lists.append(["ol" if token.tag == "ol" else "ul", 0])
+            elif token.type in ("bullet_list_close", "ordered_list_close"):
+                lists.pop()
+            elif token.type == "list_item_open":
+                lists[-1][1] += 1
+            elif token.type == "heading_open":
+                heading = {"h1": "Heading1", "h2": "Heading2"}.get(token.tag, "Heading3")
+            elif token.type == "heading_close":
+                heading = None
+            elif token.type == "inline":
+                content = self._inline(token)
+                if not content:
+                    continue
+                if heading:
+                    flowables.append(Paragraph(content, self.styles[heading]))
+                elif lists:
+                    kind, n = lists[-1]
+                    bullet = f"{n}." if kind == "ol" else "•"
+                    flowables.append(Paragraph(
+                        content, self._indented(style, len(lists)), bulletText=bullet,
+                    ))
+                else:
+                    flowables.append(Paragraph(content, self.styles[style]))
+            elif token.type in ("fence", "code_block"):
+                flowables.append(Preformatted(token.content.rstrip(), self.styles["Code"]))
+            elif token.type == "html_block":
+                flowables += self._html_block(token.content, style)
+        return flowables
+
+    def _indented(self, style, depth):
+        from reportlab.lib.styles import ParagraphStyle
+
+        return ParagraphStyle(
+            f"{style}-list{depth}", parent=self.styles[style],
+            leftIndent=14 * depth, bulletIndent=14 * depth - 10,
+        )
+
+    def _html_block(self, content, style):
+        # Only the simple highlight boxes used in the deck: headings + bullet lists.
+        from reportlab.platypus import Paragraph
+
+        flowables = []
+        for match in re.finditer(r"<(h\d|li)>(.*?)</\1>", content, re.S):
+            tag, inner = match.groups()
+            text = "".join(
+                part if part in ("<b>", "</b>") else _pdf_text(re.sub(r"<[^>]+>", "", part))
+                for part in re.split(r"(</?b>)", inner)
+            ).strip()
+            if tag == "li":
+                flowables.append(Paragraph(text, self._indented(style, 1), bulletText="•"))
+            else:
+                flowables.append(Paragraph(text, self.styles["Heading4"]))
+        return flowables
+
+    # -- blocks -----------------------------------------------------------
+
+    def blocks(self, blocks, width):
+        flowables = []
+        for block in blocks:
+            flowables += getattr(self, f"block_{block['type']}")(block, width)
+        return flowables
+
+    def block_header(self, block, width):
+        from reportlab.platypus import Paragraph
+
+        return [Paragraph(_pdf_text(block["text"]), self.styles["Heading1"])]
+
+    def block_subheader(self, block, width):
+        from reportlab.platypus import Paragraph
+
+        return [Paragraph(_pdf_text(block["text"]), self.styles["Heading2"])]
+
+    def block_markdown(self, block, width):
+        return self.markdown(block["text"])
+
+    def _alert(self, block, width, color):
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        table = Table([[self.markdown(block["text"])]], colWidths=[width])
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor(color)),
+            ("LEFTPADDING", (0, 0), (-1, -1), 8),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ]))
+        return [table]
+
+    def block_info(self, block, width):
+        return self._alert(block, width, "#e3eefb")
+
+    def block_success(self, block, width):
+        return self._alert(block, width, "#def5e5")
+
+    def block_warning(self, block, width):
+        return self._alert(block, width, "#fff4d6")
+
+    def block_error(self, block, width):
+        return self._alert(block, width, "#fde4e4")
+
+    def block_metric(self, block, width):
+        from reportlab.platypus import Paragraph
+
+        from reportlab.lib.styles import ParagraphStyle
+
+        body = self.styles["BodyText"]
+        flowables = [
+            Paragraph(_pdf_text(block["label"]), ParagraphStyle("metric-label", parent=body, fontSize=8)),
+            Paragraph(_pdf_text(str(block["value"])),
+                      ParagraphStyle("metric-value", parent=body, fontSize=18, leading=22)),
+        ]
+        delta = block.get("delta")
+        if delta:
+            color = "#ff2b2b" if str(delta).startswith("-") else "#09ab3b"
+            flowables.append(Paragraph(
+                _pdf_text(str(delta)), ParagraphStyle("metric-delta", parent=body, fontSize=8, textColor=color),
+            ))
+        return flowables
+
+    def block_columns(self, block, width):
+        from reportlab.platypus import Table, TableStyle
+
+        n = len(block["columns"])
+        col_width = width / n
+        cells = [self.blocks(column, col_width - 8) for column in block["columns"]]
+        table = Table([cells], colWidths=[col_width] * n)
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 4),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+        ]))
+        return [table]
+
+    def block_table(self, block, width):
+        from reportlab.lib import colors
+        from reportlab.platypus import Paragraph, Table, TableStyle
+
+        frame = self.deck.table(block)
+        style = self.styles["BodyText"]
+        rows = [[Paragraph(f"<b>{_pdf_text(str(c))}</b>", style) for c in frame.columns]]
+        rows += [[Paragraph(_pdf_text(str(v)), style) for v in row] for row in frame.itertuples(index=False)]
+        table = Table(rows, colWidths=[width / len(frame.columns)] * len(frame.columns), repeatRows=1)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f2f6")),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#d6d6d6")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        return [table]
+
+    def block_chart(self, block, width):
+        from reportlab.platypus import Image
+
+        path = self.cache.path(chart_spec(self.deck.chart(block)), "png")
+        return [Image(path, width=width, height=width * HEIGHT / WIDTH)]
+
+    def block_widget(self, block, width):
+        return self.blocks(WIDGETS[block["name"]].static(self.deck, block), width)
+
+    def build(self, path):
+        from reportlab.lib.pagesizes import landscape, letter
+        from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+        doc = SimpleDocTemplate(
+            path, pagesize=landscape(letter), title=self.deck.page["title"],
+            leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36,
+        )
+        story = [
+            Paragraph(_pdf_text(self.deck.page["heading"]), self.styles["Title"]),
+            Paragraph(_pdf_text(self.deck.page.get("subheading", "")), self.styles["Heading2"]),
+        ]
+        for section in self.deck.sections:
+            story.append(PageBreak())
+            story.append(Paragraph(_pdf_text(section["label"]), self.styles["Heading3"]))
+            story += self.blocks(section["blocks"], doc.width)
+        doc.build(story)
+
+
+def chart_spec(figure):
+    return get_figure(figure["type"], figure["data"]).spec
+
+
+def _charts(deck, blocks):
+    """Every figure a list of blocks draws, including widgets' static views."""
+    for block in blocks:
+        if block["type"] == "chart":
+            yield deck.chart(block)
+        elif block["type"] == "columns":
+            for column in block["columns"]:
+                yield from _charts(deck, column)
+        elif block["type"] == "widget":
+            yield from _charts(deck, WIDGETS[block["name"]].static(deck, block))
+
+
+def export_decks(spec_paths, out_dir, formats=("png", "svg"), cache=None, workers=None):
+    """Export each spec to ``out_dir/<spec name>/``.
+
+    Returns ``(written, rendered)``: the per-deck output directories and the
+    number of images that actually had to be rendered.
+    """
+    cache = cache or ImageCache()
+    decks = [load_deck(path) for path in spec_paths]
+
+    jobs = set()
+    for deck in decks:
+        # PDFs embed PNGs of every chart; named figures are also exported as files.
+        for section in deck.sections:
+            jobs.update((chart_spec(f), "png") for f in _charts(deck, section["blocks"]))
+        jobs.update((chart_spec(f), fmt) for f in deck.figures.values() for fmt in formats)
+    rendered = cache.render_missing(jobs, workers)
+
+    written = []
+    for path, deck in zip(spec_paths, decks):
+        target = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+        os.makedirs(target, exist_ok=True)
+        for name, figure in deck.figures.items():
+            for fmt in formats:
+                shutil.copyfile(cache.path(chart_spec(figure), fmt), os.path.join(target, f"{name}.{fmt}"))
+        PdfBuilder(deck, cache).build(os.path.join(target, "deck.pdf"))
+        written.append(target)
+    return written, rendered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export decks to PDF and chart images.")
+    parser.add_argument("--spec", action="append", help="deck spec (repeatable; default: deck.yaml)")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--format", action="append", choices=["png", "svg", "pdf"],
+                        help="chart image formats (repeatable; default: png and svg)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE)
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written, rendered = export_decks(
+        args.spec or [DEFAULT_PATH], args.out, args.format or ("png", "svg"),
+        ImageCache(args.cache), args.workers,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"exported {len(written)} deck(s) to {args.out} in {elapsed:.1f} s "
+          f"({rendered} image(s) rendered, rest from cache)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Cached Plotly figure factory for the deck.
+
+Each chart is described by a plain ``dict`` of its input data. The figure's
+serialized JSON spec is built once per distinct input (keyed by a hash of the
+data) and cached across all sessions with ``st.cache_resource``, so later
+renders only ship the precomputed payload.
+"""
+
+import hashlib
+import json
+from typing import TYPE_CHECKING, NamedTuple
+
+import streamlit as st
+from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# plotly.graph_objects / plotly.io are imported inside the builders so that
+# sections without charts never pay for them.
+
+# Same defaults st.plotly_chart sends when no config is given
+_CHART_CONFIG = json.dumps({"showLink": False, "linkText": False})
+
+
+class CachedFigure(NamedTuple):
+    spec: str
+
+    @property
+    def figure(self) -> "go.Figure":
+        """A new Plotly figure from ``spec``; only the spec is cached."""
+        import plotly.io
+
+        return plotly.io.from_json(self.spec)
+
+
+def build_bar(data):
+    """Single-series bar chart with per-bar colors and value labels."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=data["x"],
+            y=data["y"],
+            text=data["text"],
+            textposition='outside',
+            marker_color=data["colors"]
+        )
+    ])
+
+    fig.update_layout(
+        yaxis_title=data["yaxis_title"],
+        height=data.get("height", 400),
+        showlegend=False,
+        template="plotly_white"
+    )
+    if "yaxis_range" in data:
+        fig.update_layout(yaxis=dict(range=data["yaxis_range"]))
+    if "yaxis_type" in data:
+        fig.update_yaxes(type=data["yaxis_type"])
+    return fig
+
+
+def build_grouped_bar(data):
+    """Grouped bar chart, one trace per entry in ``data["series"]``."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Bar(name=s["name"], x=data["x"], y=s["y"], marker_color=s["color"])
+        for s in data["series"]
+    ])
+
+    fig.update_layout(
+        barmode='group',
+        height=data.get("height", 350),
+        template="plotly_white",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def build_distribution(data):
+    """Histogram from precomputed bins, with labelled vertical markers."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Bar(x=data["x"], y=data["y"], marker_color="#9ecae1", hoverinfo="x+y")
+    ])
+    for marker in data.get("markers", []):
+        fig.add_vline(
+            x=marker["x"],
+            line_dash="dash",
+            line_color=marker["color"],
+            annotation_text=marker["label"],
+            annotation_position="top"
+        )
+
+    fig.update_layout(
+        xaxis_title=data["xaxis_title"],
+        yaxis_title=data["yaxis_title"],
+        bargap=0,
+        height=data.get("height", 350),
+        showlegend=False,
+        template="plotly_white"
+    )
+    return fig
+
+
+def build_tornado(data):
+    """Horizontal low/high bars around a base value, one row per input."""
+    import plotly.graph_objects as go
+
+    base = data["base"]
+    fig = go.Figure(data=[
+        go.Bar(
+            name=name,
+            y=data["labels"],
+            x=[v - base for v in values],
+            base=base,
+            orientation="h",
+            text=texts,
+            textposition="outside",
+            marker_color=color
+        )
+        for name, values, texts, color in (
+            ("Low", data["low"], data["low_text"], "#4ecdc4"),
+            ("High", data["high"], data["high_text"], "#ff6b6b"),
+        )
+    ])
+
+    fig.add_vline(x=base, line_color="#31333f", annotation_text=f"Base: {base:g}")
+    fig.update_layout(
+        barmode="overlay",
+        xaxis_title=data["xaxis_title"],
+        yaxis=dict(autorange="reversed"),
+        height=data.get("height", 320),
+        template="plotly_white",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def build_heatmap(data):
+    """Heatmap of ``z[y][x]``; ``None`` cells render as gaps."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Heatmap(
+            x=data["x"],
+            y=data["y"],
+            z=data["z"],
+            colorscale=data.get("colorscale", "RdYlGn_r"),
+            colorbar=dict(title=data.get("colorbar_title", "")),
+            hoverongaps=False
+        )
+    ])
+
+    fig.update_layout(
+        xaxis_title=data["xaxis_title"],
+        yaxis_title=data["yaxis_title"],
+        height=data.get("height", 400),
+        template="plotly_white"
+    )
+    return fig
+
+
+def build_gantt(data):
+    """Horizontal week bars per task; critical-path tasks drawn in red."""
+    import plotly.graph_objects as go
+
+    colors = ["#d62728" if c else "#1f77b4" for c in data["critical"]]
+    fig = go.Figure(data=[
+        go.Bar(
+            y=data["tasks"],
+            x=data["duration"],
+            base=[s - 0.5 for s in data["start"]],
+            orientation="h",
+            marker_color=colors,
+            text=[f"W{s}–{s + d - 1}" for s, d in zip(data["start"], data["duration"])],
+            textposition="inside",
+            hovertemplate="%{y}: %{text}<extra></extra>"
+        )
+    ])
+
+    fig.update_layout(
+        xaxis_title=data["xaxis_title"],
+        yaxis=dict(autorange="reversed"),
+        height=data.get("height", 400),
+        showlegend=False,
+        template="plotly_white"
+    )
+    return fig
+
+
+def build_trend(data):
+    """Line per entry in ``data["series"]``; series with ``"axis": "y2"`` use a right axis."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Scatter(name=s["name"], x=data["x"], y=s["y"], mode="lines", line=dict(color=s["color"]),
+                   yaxis=s.get("axis", "y"))
+        for s in data["series"]
+    ])
+
+    fig.update_layout(
+        xaxis_title=data["xaxis_title"],
+        yaxis_title=data["yaxis_title"],
+        height=data.get("height", 350),
+        template="plotly_white",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    if "yaxis2_title" in data:
+        fig.update_layout(yaxis2=dict(title=data["yaxis2_title"], overlaying="y", side="right", showgrid=False))
+    return fig
+
+
+BUILDERS = {
+    "bar": build_bar,
+    "grouped_bar": build_grouped_bar,
+    "distribution": build_distribution,
+    "tornado": build_tornado,
+    "heatmap": build_heatmap,
+    "gantt": build_gantt,
+    "trend": build_trend,
+}
+
+
+def data_key(kind, data):
+    """Stable hash of a chart's type and input data."""
+    payload = json.dumps([kind, data], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _build_spec(kind, data):
+    import plotly.io
+
+    return plotly.io.to_json(BUILDERS[kind](data), validate=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _build_cached(kind, key, _data):
+    # ``_data`` is excluded from Streamlit's argument hashing; ``key`` already
+    # identifies it.
+    return CachedFigure(_build_spec(kind, _data))
+
+
+def get_figure(kind, data):
+    """Return the shared ``CachedFigure`` for ``data``, building it on first use."""
+    return _build_cached(kind, data_key(kind, data), data)
+
+
+def show_figure(kind, data, use_container_width=True):
+    """Render a cached chart without rebuilding or re-encoding it.
+
+    Equivalent to ``st.plotly_chart(fig, use_container_width=...)`` but the
+    element is filled from the cached JSON spec.
+    """
+    cached = get_figure(kind, data)
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.figure.spec = cached.spec
+    proto.figure.config = _CHART_CONFIG
+    proto.theme = "streamlit"
+    # _enqueue targets the active container, so this honours `with col:` blocks
+    return st._main._enqueue("plotly_chart", proto)
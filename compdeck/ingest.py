@@ -0,0 +1,517 @@
+"""Chunked ingestion of partner data dumps into a partitioned Parquet dataset.
+
+Partners send anonymized contributions -- with their own manual
+determination in ``expected_status`` for side-by-side accuracy testing -- as
+CSV or Excel files of any size. ``PartnerDataset.ingest`` streams a file
+``chunk_rows`` rows at a time (pyarrow's incremental CSV reader, openpyxl's
+read-only mode for .xlsx), validates each chunk with vectorized checks, and
+appends the valid rows to one Parquet file per partition::
+
+    .partner_data/
+        jurisdiction=CA/month=2025-03/part-<file hash>.parquet
+        _ingested.json      one entry per ingested file, keyed by SHA-256
+
+Memory is bounded by the chunk, whatever the file size. Part files are
+written under hidden temporary names and renamed once the whole file is in,
+so a failed ingest leaves nothing behind. A file whose SHA-256 is already in
+the manifest is skipped; a new version of a file with the same name replaces
+the old version's parts. Readers prune by jurisdiction and month from the
+directory names, so a view opens only the partitions it shows.
+
+    python -m compdeck.ingest dumps/partner_a.csv dumps/partner_b.xlsx
+    python -m compdeck.ingest --write-sample dumps/sample.csv --rows 5000000
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from compdeck.compliance import METHODS, SOURCE_TYPES, STATUSES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST = "_ingested.json"
+READ_BLOCK = 2**20  # bytes per pyarrow CSV block; the reader buffers a few dozen ahead
+
+# Columns of a partner file (header names are matched case-insensitively,
+# spaces as underscores). employer/occupation/expected_status are optional.
+REQUIRED = ("contribution_id", "donor", "committee", "jurisdiction", "source", "method", "amount", "date")
+OPTIONAL = ("employer", "occupation", "expected_status")
+# Value rules; a row failing any of them is rejected
+CHECKS = ("missing_field", "bad_amount", "bad_date", "unknown_jurisdiction", "unknown_source",
+          "unknown_method", "bad_expected_status")
+
+
+class SampleSpec(NamedTuple):
+    rows: int
+    seed: int
+    start: str
+    days: int
+
+
+class IngestSpec(NamedTuple):
+    root: str  # dataset directory
+    chunk_rows: int
+    sample: SampleSpec  # synthetic partner file an empty demo dataset is seeded with
+
+
+def parse_ingest(raw):
+    root = raw.get("root", ".partner_data")
+    sample = raw.get("sample", {})
+    spec = IngestSpec(
+        root if os.path.isabs(root) else os.path.join(ROOT, root),
+        int(raw.get("chunk_rows", 100_000)),
+        SampleSpec(int(sample.get("rows", 0)), int(sample.get("seed", 0)), str(sample.get("start", "2025-01-01")),
+                   int(sample.get("days", 365))),
+    )
+    if spec.chunk_rows < 1:
+        raise ValueError("ingest.chunk_rows: must be positive")
+    return spec
+
+
+def _schema():
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ("contribution_id", pa.string()), ("donor", pa.string()), ("committee", pa.string()),
+        ("source", category), ("method", category), ("amount", pa.float64()), ("date", pa.date32()),
+        ("disclosed", pa.bool_()), ("expected_status", category),
+    ])
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_name(header):
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+# -- Reading files in chunks --------------------------------------------------
+
+def _csv_chunks(path, names, chunk_rows):
+    import pandas as pd
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    strings = {pa.string(): pd.StringDtype("pyarrow")}.get  # string ops stay in Arrow
+
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(column_names=names, skip_rows=1, block_size=READ_BLOCK,
+                                       use_threads=False),  # threads read ahead without bound
+        convert_options=pacsv.ConvertOptions(column_types={n: pa.string() for n in names},
+                                             strings_can_be_null=False),
+    )
+    pending, rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows).to_pandas(types_mapper=strings)
+            rest = table.slice(chunk_rows)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending).to_pandas(types_mapper=strings)
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _excel_chunks(workbook, rows, names, chunk_rows):
+    import pandas as pd
+
+    width = len(names)
+    try:
+        pending = []
+        for row in rows:
+            pending.append([_cell(v) for v in row[:width]] + [""] * (width - len(row)))
+            if len(pending) == chunk_rows:
+                yield pd.DataFrame(pending, columns=names)
+                pending = []
+        if pending:
+            yield pd.DataFrame(pending, columns=names)
+    finally:
+        workbook.close()
+
+
+def _open(path, chunk_rows):
+    """Column names and an iterator of DataFrames of at most ``chunk_rows`` rows of strings."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        names = [_column_name(h) for h in next(rows, ())]
+        return names, _excel_chunks(workbook, rows, names, chunk_rows)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        names = [_column_name(h) for h in next(csv.reader(f), [])]
+    return names, _csv_chunks(path, names, chunk_rows)
+
+
+# -- Validation ---------------------------------------------------------------
+
+def validate(raw, codes):
+    """Check one chunk of partner rows.
+
+    ``raw`` holds the file's columns as strings. Returns the valid rows,
+    typed as the dataset stores them plus ``jurisdiction`` and ``month``
+    partition columns, and a boolean array of ``CHECKS`` hits per input row.
+    """
+    import pandas as pd
+
+    blank = pd.Series("", index=raw.index, dtype="string[pyarrow]")
+    text = {c: raw[c].astype("string[pyarrow]").str.strip() if c in raw else blank for c in REQUIRED + OPTIONAL}
+    empty = {c: (text[c] == "").to_numpy(dtype=bool) for c in text}
+    amount = pd.to_numeric(text["amount"].str.replace(r"[$,\s]", "", regex=True), errors="coerce")
+    dates = pd.to_datetime(text["date"], format="%Y-%m-%d", errors="coerce")
+    us = dates.isna().to_numpy() & ~empty["date"]
+    if us.any():
+        dates[us] = pd.to_datetime(text["date"][us], format="%m/%d/%Y", errors="coerce")
+    jurisdiction = text["jurisdiction"].str.upper()
+    source = text["source"].str.lower()
+    method = text["method"].str.lower()
+    expected = text["expected_status"].str.lower()
+
+    hits = np.column_stack([
+        np.any([empty[c] for c in REQUIRED], axis=0),
+        amount.isna().to_numpy() & ~empty["amount"],
+        dates.isna().to_numpy() & ~empty["date"],
+        ~jurisdiction.isin(codes).to_numpy() & ~empty["jurisdiction"],
+        ~source.isin(SOURCE_TYPES).to_numpy() & ~empty["source"],
+        ~method.isin(METHODS).to_numpy() & ~empty["method"],
+        ~expected.isin(STATUSES).to_numpy() & ~empty["expected_status"],
+    ])
+    keep = ~hits.any(axis=1)
+    day = dates[keep].to_numpy(dtype="datetime64[D]")
+    clean = pd.DataFrame({
+        "contribution_id": text["contribution_id"][keep],
+        "donor": text["donor"][keep],
+        "committee": text["committee"][keep],
+        "source": pd.Categorical(source[keep], categories=SOURCE_TYPES),
+        "method": pd.Categorical(method[keep], categories=METHODS),
+        "amount": amount[keep].to_numpy(dtype=float),
+        "date": day,
+        "disclosed": ~empty["employer"][keep] & ~empty["occupation"][keep],
+        "expected_status": pd.Categorical(expected[keep], categories=STATUSES),
+        "jurisdiction": jurisdiction[keep],
+        "month": day.astype("datetime64[M]").astype(str),
+    })
+    return clean, hits
+
+
+# -- Dataset ------------------------------------------------------------------
+
+class _PartWriter:
+    """One partition's part file, written under a temporary name until ``publish``.
+
+    Each chunk's rows for the partition become one row group.
+    """
+
+    def __init__(self, directory, name, schema):
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, name)
+        self.tmp = os.path.join(directory, f".{name}.tmp")
+        self.writer = pq.ParquetWriter(self.tmp, schema)
+        self.rows = 0
+
+    def add(self, table):
+        self.writer.write_table(table)
+        self.rows += len(table)
+
+    def close(self):
+        self.writer.close()
+
+    def discard(self):
+        self.writer.close()
+        os.remove(self.tmp)
+
+    def publish(self):
+        os.replace(self.tmp, self.path)
+
+
+class PartnerDataset:
+    """Ingested partner rows under ``root``, partitioned by jurisdiction and month."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, manifest):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+
+    def ingest(self, path, codes, chunk_rows=100_000, force=False):
+        """Ingest one CSV or Excel file; returns its manifest entry.
+
+        ``codes`` are the jurisdictions accepted. An already ingested file
+        (same SHA-256) is skipped unless ``force``: the returned entry then
+        has ``skipped`` set. A file missing a required column raises
+        ``ValueError`` before anything is written.
+        """
+        import pyarrow as pa
+
+        digest = file_hash(path)
+        if digest in self.manifest and not force:
+            return dict(self.manifest[digest], skipped=True)
+        names, chunks = _open(path, chunk_rows)
+        missing = [c for c in REQUIRED if c not in names]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+
+        start = time.perf_counter()
+        schema, part = _schema(), f"part-{digest[:16]}.parquet"
+        writers = {}  # (jurisdiction, month) -> _PartWriter
+        counts, rows, rejected_lines = np.zeros(len(CHECKS), np.int64), 0, []
+        try:
+            for chunk in chunks:
+                clean, hits = validate(chunk, codes)
+                bad = np.flatnonzero(hits.any(axis=1))
+                # Line numbers in the file (line 1 is the header)
+                rejected_lines += (rows + 2 + bad[:10 - len(rejected_lines)]).tolist()
+                counts += hits.sum(axis=0)
+                rows += len(chunk)
+                for (jurisdiction, month), group in clean.groupby(["jurisdiction", "month"], sort=False):
+                    writer = writers.get((jurisdiction, month))
+                    if writer is None:
+                        directory = os.path.join(self.root, f"jurisdiction={jurisdiction}", f"month={month}")
+                        writer = writers[jurisdiction, month] = _PartWriter(directory, part, schema)
+                    writer.add(pa.Table.from_pandas(group.drop(columns=["jurisdiction", "month"]), schema=schema,
+                                                    preserve_index=False))
+            for writer in writers.values():
+                writer.close()
+        except BaseException:
+            for writer in writers.values():
+                writer.discard()
+            raise
+        parts = {}
+        for (jurisdiction, month), writer in sorted(writers.items()):
+            writer.publish()
+            parts[f"jurisdiction={jurisdiction}/month={month}/{part}"] = writer.rows
+
+        name = os.path.basename(path)
+        manifest = self.manifest
+        for old in [h for h, e in manifest.items() if e["name"] == name and h != digest]:
+            for relative in manifest.pop(old)["parts"]:
+                if relative not in parts:
+                    os.remove(os.path.join(self.root, relative))
+        manifest[digest] = entry = {
+            "name": name,
+            "bytes": os.path.getsize(path),
+            "rows": rows,
+            "ingested": sum(parts.values()),
+            "rejected": {check: int(n) for check, n in zip(CHECKS, counts) if n},
+            "rejected_lines": rejected_lines,
+            "parts": parts,
+            "seconds": round(time.perf_counter() - start, 3),
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._save(manifest)
+        return dict(entry, skipped=False)
+
+    def partitions(self):
+        """``{(jurisdiction, month): rows}`` over every ingested file."""
+        totals = {}
+        for entry in self.manifest.values():
+            for relative, n in entry["parts"].items():
+                jurisdiction, month, _ = relative.split("/")
+                key = (jurisdiction.split("=")[1], month.split("=")[1])
+                totals[key] = totals.get(key, 0) + n
+        return dict(sorted(totals.items()))
+
+    def read(self, jurisdictions=None, months=None, columns=None):
+        """Rows of the given jurisdictions and ``(first, last)`` month range.
+
+        Only the matching partitions' files are opened. Returns a pyarrow
+        Table with the stored columns (or ``columns``) plus ``jurisdiction``
+        and ``month``.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        files = [os.path.join(self.root, relative) for entry in self.manifest.values() for relative in entry["parts"]]
+        partitioning = ds.partitioning(pa.schema([("jurisdiction", pa.string()), ("month", pa.string())]),
+                                       flavor="hive")
+        schema = pa.unify_schemas([_schema(), partitioning.schema])
+        dataset = ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning,
+                             partition_base_dir=self.root)
+        condition = None
+        if jurisdictions is not None:
+            condition = ds.field("jurisdiction").isin(list(jurisdictions))
+        if months is not None:
+            in_range = (ds.field("month") >= months[0]) & (ds.field("month") <= months[1])
+            condition = in_range if condition is None else condition & in_range
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def files(self):
+        """Ingested files as table columns."""
+        entries = sorted(self.manifest.values(), key=lambda e: e["at"])
+        return {
+            "File": [e["name"] for e in entries],
+            "Size": [f"{e['bytes'] / 2**20:,.1f} MiB" for e in entries],
+            "Rows": [f"{e['rows']:,}" for e in entries],
+            "Ingested": [f"{e['ingested']:,}" for e in entries],
+            "Rejected": [", ".join(f"{check} {n:,}" for check, n in e["rejected"].items()) or "—"
+                         for e in entries],
+            "Partitions": [len(e["parts"]) for e in entries],
+            "Time": [f"{e['seconds']:.1f} s" for e in entries],
+        }
+
+
+def accuracy(table, rules):
+    """Side-by-side agreement of the rule engine with the partner's manual status.
+
+    ``table`` is what ``PartnerDataset.read`` returns. Rows without an
+    ``expected_status`` are not compared. Donor window totals only see the
+    rows read, so a narrow month range can miss earlier contributions.
+    """
+    from compdeck.compliance import check_batch
+
+    frame = table.to_pandas(date_as_object=False)
+    frame = frame[frame["expected_status"].notna()]
+    checked = check_batch(frame, rules)
+    platform = checked["status"].cat.codes.to_numpy()
+    manual = frame["expected_status"].cat.codes.to_numpy()
+    jurisdiction = frame["jurisdiction"].to_numpy()
+    columns = {"Jurisdiction": [], "Compared": [], "Agreement": [], "Platform stricter": [],
+               "Platform more lenient": []}
+    for code in sorted(set(jurisdiction)) + ["All"]:
+        mask = np.ones(len(frame), bool) if code == "All" else jurisdiction == code
+        n = int(mask.sum())
+        columns["Jurisdiction"].append(code)
+        columns["Compared"].append(f"{n:,}")
+        columns["Agreement"].append(f"{np.mean(platform[mask] == manual[mask]):.1%}" if n else "—")
+        columns["Platform stricter"].append(f"{int((platform[mask] > manual[mask]).sum()):,}")
+        columns["Platform more lenient"].append(f"{int((platform[mask] < manual[mask]).sum()):,}")
+    return columns
+
+
+# -- Sample partner files -----------------------------------------------------
+
+def write_sample(path, rows, rules, seed=0, start="2025-01-01", days=365, chunk_rows=500_000):
+    """Write a synthetic partner file of ``rows`` contributions (.csv or .xlsx).
+
+    ``expected_status`` is the rule engine's verdict with about 2% manual
+    disagreements, and about 0.5% of rows carry an invalid value. Amounts and
+    dates use a mix of the formats partners send.
+    """
+    import pandas as pd
+
+    from compdeck.compliance import check_batch, synthetic_batch
+
+    rng = np.random.default_rng(seed)
+    excel = path.lower().endswith(".xlsx")
+    if excel:
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+    for i, offset in enumerate(range(0, rows, chunk_rows)):
+        n = min(chunk_rows, rows - offset)
+        batch = synthetic_batch(n, rules.codes, seed=seed + i, donor_offset=offset, start=start, days=days)
+        status = check_batch(batch, rules)["status"].cat.codes.to_numpy().copy()
+        flip = rng.random(n) < 0.02
+        status[flip] = (status[flip] + rng.integers(1, len(STATUSES), int(flip.sum()))) % len(STATUSES)
+        amount = batch["amount"].to_numpy()
+        dates = batch["date"].to_numpy(dtype="datetime64[D]")
+        us = rng.random(n) < 0.2
+        frame = pd.DataFrame({
+            "Contribution ID": [f"P{offset + k:09d}" for k in range(n)],
+            "Donor": "D" + pd.Series(batch["donor"].to_numpy()).astype(str).str.zfill(8),
+            "Committee": "CMTE-" + pd.Series(batch["committee"].to_numpy()).astype(str).str.zfill(3),
+            "Jurisdiction": batch["jurisdiction"].astype(str).to_numpy(),
+            "Source": batch["source"].astype(str).to_numpy(),
+            "Method": batch["method"].astype(str).to_numpy(),
+            "Amount": np.where(rng.random(n) < 0.3, [f"${a:,.2f}" for a in amount], amount.astype(str)),
+            "Date": np.where(us, pd.DatetimeIndex(dates).strftime("%m/%d/%Y"), dates.astype(str)),
+            "Employer": np.where(batch["disclosed"], "Acme Logistics", ""),
+            "Occupation": np.where(batch["disclosed"], "Analyst", ""),
+            "Expected Status": np.array(STATUSES)[status],
+        })
+        bad = np.flatnonzero(rng.random(n) < 0.005)
+        for column, value in (("Amount", "N/A"), ("Jurisdiction", "ZZ"), ("Date", "")):
+            rows_bad = bad[rng.random(len(bad)) < 1 / 3]
+            frame.loc[rows_bad, column] = value
+        if excel:
+            if offset == 0:
+                sheet.append(list(frame.columns))
+            for record in frame.itertuples(index=False):
+                sheet.append(list(record))
+        else:
+            frame.to_csv(path, mode="w" if offset == 0 else "a", header=offset == 0, index=False)
+    if excel:
+        workbook.save(path)
+
+
+def main(argv=None):
+    from compdeck.compliance import RuleSet
+    from compdeck.spec import DEFAULT_PATH, load_deck
+
+    parser = argparse.ArgumentParser(description="Ingest partner CSV/Excel files into the partitioned dataset.")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--spec", default=DEFAULT_PATH)
+    parser.add_argument("--root", help="dataset directory (default: the deck's ingest.root)")
+    parser.add_argument("--chunk-rows", type=int, help="rows per chunk (default: the deck's ingest.chunk_rows)")
+    parser.add_argument("--force", action="store_true", help="re-ingest files that are already in")
+    parser.add_argument("--write-sample", metavar="PATH", help="write a synthetic partner file (.csv or .xlsx)")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows in the sample file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    deck = load_deck(args.spec)
+    spec = deck.models["ingest"]
+    codes = [j.code for j in deck.models["demo"].jurisdictions]
+    if args.write_sample:
+        start = time.perf_counter()
+        write_sample(args.write_sample, args.rows, RuleSet(deck.models["demo"].jurisdictions), seed=args.seed)
+        print(f"wrote {args.rows:,} rows to {args.write_sample} ({os.path.getsize(args.write_sample) / 2**20:,.1f} MiB, "
+              f"{time.perf_counter() - start:.1f} s)")
+    dataset = PartnerDataset(args.root or spec.root)
+    for path in args.files:
+        entry = dataset.ingest(path, codes, args.chunk_rows or spec.chunk_rows, force=args.force)
+        if entry["skipped"]:
+            print(f"{path}: unchanged since {entry['at']}, skipped")
+            continue
+        rejected = ", ".join(f"{check} {n:,}" for check, n in entry["rejected"].items()) or "none"
+        print(f"{path}: {entry['ingested']:,} of {entry['rows']:,} rows into {len(entry['parts'])} partitions "
+              f"in {entry['seconds']:.1f} s; rejected: {rejected}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Fixed-bucket latency histograms for the contribution-processing pipeline.
+
+The pipeline (``compdeck.demo.process``) reads a monotonic clock at its start
+and end, and at each stage boundary on a sample of runs, and returns the
+durations with its result; folding them into histograms happens afterwards,
+outside the timed code.
+``LatencyRecorder.add`` only queues a run's durations; queued runs are
+binned together with numpy once ``FOLD_EVERY`` have piled up or when a
+histogram is read. Histograms share one set of log-spaced bucket bounds (8
+per decade, 1 µs to 100 s), so they are a fixed 66 counters each, merge by
+addition and report percentiles to within a bucket's width (about ±6% after
+interpolation).
+"""
+
+import bisect
+import math
+import threading
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+PER_DECADE = 8
+# Upper bounds in nanoseconds: 1 µs * 10**(i / PER_DECADE) up to 100 s.
+BOUNDS = [round(1_000 * 10 ** (i / PER_DECADE)) for i in range(8 * PER_DECADE + 1)]
+_BOUNDS = np.array(BOUNDS, dtype=np.int64)
+QUANTILES = (0.50, 0.95, 0.99)
+FOLD_EVERY = 1024  # queued runs binned at once
+
+
+class LatencySpec(NamedTuple):
+    manual_minutes: float  # baseline: time to process one contribution by hand
+    target_seconds: float  # the pilot's processing-speed target
+
+
+def parse_latency(raw):
+    spec = LatencySpec(float(raw["manual_minutes"]), float(raw["target_seconds"]))
+    if spec.manual_minutes <= 0 or spec.target_seconds <= 0:
+        raise ValueError("latency: manual_minutes and target_seconds must be positive")
+    return spec
+
+
+def format_ns(ns):
+    if ns < 1e6:
+        return f"{ns / 1e3:.0f} µs"
+    if ns < 1e9:
+        return f"{ns / 1e6:.1f} ms" if ns < 1e8 else f"{ns / 1e6:.0f} ms"
+    return f"{ns / 1e9:.2f} s"
+
+
+class Histogram:
+    """Counts of durations (ns) per fixed bucket, plus count/sum/max."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)  # last bucket: over 100 s
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        self.counts[bisect.bisect_left(BOUNDS, ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def add_many(self, values):
+        """Add an integer array of durations (ns)."""
+        if not len(values):
+            return
+        counts = np.bincount(np.searchsorted(_BOUNDS, values, side="left"), minlength=len(self.counts))
+        self.counts = [a + b for a, b in zip(self.counts, counts.tolist())]
+        self.count += len(values)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Duration (ns) at quantile ``q``, interpolated within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BOUNDS[i - 1] if i else BOUNDS[0] / 10 ** (1 / PER_DECADE)
+                high = BOUNDS[i] if i < len(BOUNDS) else self.max
+                fraction = (rank - seen) / n
+                # Log-linear interpolation: buckets are geometric.
+                return min(low * math.exp(fraction * math.log(high / low)), self.max)
+            seen += n
+        return float(self.max)
+
+    def percentiles(self):
+        return {f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES}
+
+
+class LatencyRecorder:
+    """One histogram per pipeline stage plus one for the whole pipeline.
+
+    Shared by every session of a process. ``add`` appends to a deque, which
+    is safe without a lock; binning the queued runs takes the lock, so
+    concurrent reruns don't lose counts.
+    """
+
+    def __init__(self, stages):
+        self.stages = tuple(stages)
+        self._histograms = {stage: Histogram() for stage in self.stages}
+        self._total = Histogram()
+        self._pending = deque()  # queued runs' end-to-end durations
+        self._pending_stages = deque()  # queued runs' stage durations
+        self._lock = threading.Lock()
+
+    def add(self, total, durations=None):
+        """Record one pipeline run: its ``total`` duration (ns) and, for runs
+        timed per stage, ``durations`` (ns) in stage order."""
+        self._pending.append(total)
+        if durations is not None:
+            self._pending_stages.append(durations)
+        if len(self._pending) >= FOLD_EVERY:
+            with self._lock:
+                self._fold()
+
+    def _fold(self):
+        pending, staged = self._pending, self._pending_stages
+        if pending:
+            self._total.add_many(np.array([pending.popleft() for _ in range(len(pending))], dtype=np.int64))
+        if staged:
+            runs = np.array([staged.popleft() for _ in range(len(staged))], dtype=np.int64)
+            for stage, column in zip(self.stages, runs.T):
+                self._histograms[stage].add_many(column)
+
+    @property
+    def histograms(self):
+        """``{stage: Histogram}``, including every run added so far."""
+        with self._lock:
+            self._fold()
+            return self._histograms
+
+    @property
+    def total(self):
+        """End-to-end ``Histogram``, including every run added so far."""
+        with self._lock:
+            self._fold()
+            return self._total
+
+    def table(self):
+        """Per-stage and end-to-end percentiles as table columns."""
+        histograms = self.histograms
+        rows = [(stage.capitalize(), histograms[stage]) for stage in self.stages]
+        rows.append(("End to end", self.total))
+        return {
+            "Stage": [name for name, _ in rows],
+            "Runs": [f"{h.count:,}" for _, h in rows],
+            **{f"p{round(q * 100)}": [format_ns(h.quantile(q)) for _, h in rows] for q in QUANTILES},
+        }
@@ -0,0 +1,278 @@
+"""Presenter-driven live mode: many viewers follow one presenter's section.
+
+Open the app with ``?live=present`` to present and ``?live=follow`` to
+follow (with ``COMPDECK_PRESENTER_KEY`` set, presenting also needs
+``&key=<value>``). The presenter's session renders the selected section as
+usual while the messages it sends to the browser are recorded; the recording
+is published on a process-wide ``Channel`` whenever the section or its
+content changes. A follower's run replays the current recording into the
+section slot, then waits on the channel and replays each new publish in
+place, so followers never re-run ``app.py`` or render a section themselves,
+and the presenter's widgets show up disabled. Replaying is a yield point, so
+a stop or rerun the session asked for takes effect there. While nothing is
+published the follower wakes every ``HEARTBEAT`` seconds and ends its run
+once its browser has disconnected (``Runtime.is_active_session``); after
+``FOLLOW_WAIT`` idle seconds it calls ``st.rerun()``, so no run waits
+unboundedly for a stop it cannot see.
+
+Recording and replaying use Streamlit internals -- the script context's
+``_enqueue`` hook, a container's delta path and the forward-message hashing
+-- that have no public equivalent. They are written against
+``STREAMLIT_VERSION`` (pinned in requirements.txt). ``runtime_problems()``
+checks that the running Streamlit still has them; live mode refuses to start
+otherwise, and ``python -m compdeck.live`` (which also records and replays a
+section under ``streamlit.testing``) exits non-zero, so an upgrade that
+changes them fails loudly instead of mirroring nothing.
+
+    python -m compdeck.live
+"""
+
+import argparse
+import hmac
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.scriptrunner import ScriptRunContext, get_script_run_ctx
+
+try:
+    from streamlit.cursor import Cursor
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.runtime.forward_msg_cache import populate_hash_if_needed
+except ImportError as error:  # reported by runtime_problems()
+    _import_error = error
+else:
+    _import_error = None
+
+STREAMLIT_VERSION = "1.31.0"  # the release the internals below are checked against
+FOLLOW_WAIT = 300.0  # seconds without a publish after which a follower's run reruns
+HEARTBEAT = 5.0  # seconds between a waiting follower's checks that its browser is still connected
+KEY_ENV = "COMPDECK_PRESENTER_KEY"
+
+
+def runtime_problems():
+    """What live mode needs from Streamlit's internals and the running version lacks (empty if nothing)."""
+    problems = []
+    if st.__version__ != STREAMLIT_VERSION:
+        problems.append(f"Streamlit {st.__version__} is running; live mode is written against {STREAMLIT_VERSION}")
+    if _import_error is not None:
+        return problems + [f"missing import: {_import_error}"]
+    if "_enqueue" not in getattr(ScriptRunContext, "__dataclass_fields__", {}):
+        problems.append("ScriptRunContext has no _enqueue field")
+    if not callable(getattr(ScriptRunContext, "enqueue", None)):
+        problems.append("ScriptRunContext has no enqueue()")
+    if not hasattr(st.sidebar, "_root_container") or not hasattr(DeltaGenerator, "_cursor"):
+        problems.append("DeltaGenerator has no _root_container/_cursor")
+    if not callable(getattr(runtime.Runtime, "is_active_session", None)):
+        problems.append("Runtime has no is_active_session()")
+    if not hasattr(Cursor, "parent_path"):
+        problems.append("Cursor has no parent_path")
+    if "delta_path" not in ForwardMsg().metadata.DESCRIPTOR.fields_by_name:
+        problems.append("ForwardMsg metadata has no delta_path")
+    return problems
+
+
+class Channel:
+    """The presenter's latest section output, and followers waiting for the next one.
+
+    ``frames`` are ``(relative delta path, serialized ForwardMsg)`` pairs;
+    ``seq`` counts publishes (0: nothing published yet).
+    """
+
+    def __init__(self):
+        self._changed = threading.Condition()
+        self.seq = 0
+        self.label = None
+        self.frames = ()
+        self.followers = 0
+        self._messages = {}  # base delta path -> ForwardMsg templates for the current seq
+
+    def publish(self, label, frames):
+        """Make ``frames`` the current output; returns False if nothing changed."""
+        with self._changed:
+            if (label, frames) == (self.label, self.frames):
+                return False
+            self.seq += 1
+            self.label, self.frames, self._messages = label, frames, {}
+            self._changed.notify_all()
+        return True
+
+    def current(self):
+        """``(seq, label)`` of the latest publish."""
+        with self._changed:
+            return self.seq, self.label
+
+    def wait(self, seq, timeout):
+        """``(seq, label)`` once the channel is past ``seq``, or the current ones after ``timeout``."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.seq != seq, timeout)
+            return self.seq, self.label
+
+    def messages(self, seq, base):
+        """The ForwardMsgs that draw publish ``seq`` under delta path ``base``.
+
+        Built and hashed once per publish and slot position (every follower
+        has the same layout); callers get private copies, since the server
+        thread annotates messages as it sends them.
+        """
+        with self._changed:
+            if seq != self.seq:
+                return None
+            templates = self._messages.get(base)
+            if templates is None:
+                templates = self._messages[base] = []
+                for path, data in self.frames:
+                    msg = ForwardMsg()
+                    msg.ParseFromString(data)
+                    msg.metadata.delta_path[:] = base + path
+                    populate_hash_if_needed(msg)
+                    templates.append(msg)
+        copies = []
+        for template in templates:
+            msg = ForwardMsg()
+            msg.CopyFrom(template)
+            copies.append(msg)
+        return copies
+
+    @contextmanager
+    def following(self):
+        with self._changed:
+            self.followers += 1
+        try:
+            yield self
+        finally:
+            with self._changed:
+                self.followers -= 1
+
+
+@st.cache_resource(show_spinner=False)
+def live_channel():
+    """The process-wide channel every presenter and follower session shares."""
+    return Channel()
+
+
+def live_mode():
+    """``"present"``, ``"follow"`` or None, from the page's query string."""
+    mode = st.query_params.get("live")
+    if mode not in ("present", "follow"):
+        return None
+    if mode == "present" and os.environ.get(KEY_ENV):
+        if not hmac.compare_digest(st.query_params.get("key", ""), os.environ[KEY_ENV]):
+            st.error("Presenting needs the presenter key: add `&key=...` to the URL.")
+            st.stop()
+    problems = runtime_problems()
+    if problems:
+        st.warning("📡 Live mode is unavailable with this Streamlit install: " + "; ".join(problems))
+        return None
+    return mode
+
+
+def _block_path(container):
+    return (container._root_container, *container._cursor.parent_path)
+
+
+def _disable_widgets(msg):
+    element = msg.delta.new_element
+    kind = msg.delta.WhichOneof("type") == "new_element" and element.WhichOneof("type")
+    if kind and "disabled" in getattr(element, kind).DESCRIPTOR.fields_by_name:
+        getattr(element, kind).disabled = True
+
+
+def record(container, render):
+    """Run ``render()`` inside ``container`` and return the frames it drew there."""
+    ctx = get_script_run_ctx()
+    base, frames, send = _block_path(container), [], ctx._enqueue
+
+    def enqueue(msg):
+        path = tuple(msg.metadata.delta_path)
+        if msg.HasField("delta") and path[:len(base)] == base:
+            copy = ForwardMsg()
+            copy.delta.CopyFrom(msg.delta)
+            _disable_widgets(copy)
+            frames.append((path[len(base):], copy.SerializeToString()))
+        send(msg)
+
+    ctx._enqueue = enqueue
+    try:
+        with container:
+            render()
+    finally:
+        ctx._enqueue = send
+    return tuple(frames)
+
+
+def present(label, render):
+    """Render the presenter's section and publish what it drew."""
+    channel = live_channel()
+    st.caption(f"📡 Presenting live to {channel.followers} follower{'s' if channel.followers != 1 else ''}")
+    channel.publish(label, record(st.container(), render))
+
+
+def follow(slot, wait=FOLLOW_WAIT, heartbeat=HEARTBEAT):
+    """Mirror the presenter into ``slot`` (an ``st.empty``) until the session closes or ``wait`` s pass idle."""
+    channel, ctx = live_channel(), get_script_run_ctx()
+    active = runtime.get_instance().is_active_session if runtime.exists() else (lambda session_id: True)
+    shown, deadline = None, time.monotonic() + wait
+    with channel.following():
+        while time.monotonic() < deadline:
+            seq, label = channel.wait(shown, heartbeat)
+            if seq == shown:
+                if not active(ctx.session_id):
+                    return  # the browser went away: end the run and free its thread
+                continue
+            if label is None:
+                slot.info("📡 Waiting for the presenter to start…")
+            else:
+                # Each enqueue is a yield point: a requested stop or rerun ends the run here.
+                box = slot.container()
+                for msg in channel.messages(seq, _block_path(box)) or ():
+                    ctx.enqueue(msg)
+            shown, deadline = seq, time.monotonic() + wait
+    st.rerun()
+
+
+def main(argv=None):
+    from streamlit.testing.v1 import AppTest
+
+    from compdeck import live  # the module app.py imports, not __main__
+
+    parser = argparse.ArgumentParser(description="Check that live mode works with the installed Streamlit.")
+    parser.parse_args(argv)
+
+    problems = runtime_problems()
+    if not problems:
+        # Present the first section under the test runner and replay what was recorded.
+        published = []
+        publish = live.Channel.publish
+        live.Channel.publish = lambda self, label, frames: published.append(frames) or publish(self, label, frames)
+        try:
+            at = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py"),
+                                   default_timeout=300)
+            at.query_params["live"] = "present"
+            at.run()
+        finally:
+            live.Channel.publish = publish
+        if at.exception:
+            problems.append(f"presenting raised: {at.exception[0].value}")
+        elif not published or not published[-1]:
+            problems.append("presenting recorded no messages")
+        else:
+            channel = Channel()
+            channel.publish("check", published[-1])
+            replayed = channel.messages(channel.seq, (0,))
+            if len(replayed) != len(published[-1]) or not all(msg.HasField("delta") for msg in replayed):
+                problems.append("the recording did not replay")
+            else:
+                print(f"live mode OK with Streamlit {st.__version__}: recorded and replayed {len(replayed)} messages")
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
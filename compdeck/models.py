@@ -0,0 +1,163 @@
+"""Numbers the deck derives from its models instead of typing them by hand.
+
+``derive()`` runs once per spec load. It returns the parsed model objects,
+the tables and figures they generate (merged into the spec's ``tables`` and
+``figures``) and a flat mapping of formatted values that text blocks
+reference as ``{{ name }}``.
+"""
+
+import re
+
+PLACEHOLDER = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+
+def derive(raw):
+    models, tables, figures, values = {}, {}, {}, {}
+
+    if "budget" in raw:
+        from compdeck.budget import cost_table, money, parse_budget
+
+        budget = parse_budget(raw["budget"])
+        models["budget"] = budget
+        tables["costs"] = cost_table(budget)
+        values.update({
+            "budget.planned": money(budget.planned),
+            "budget.buffer": money(budget.buffer),
+            "budget.total": money(budget.total),
+            "budget.buffer_pct": f"{budget.buffer_pct:g}",
+            "budget.months": str(budget.months),
+        })
+
+    if "roi" in raw:
+        if "budget" not in models:
+            raise ValueError("roi requires a budget model")
+        from compdeck.budget import money_short
+        from compdeck.roi import base_case, parse_roi
+
+        roi = parse_roi(raw["roi"], models["budget"])
+        models["roi"] = roi
+        breakeven, payback = base_case(roi)
+        current = roi.partner_ftes * roi.fte_cost
+        values.update({
+            "roi.partner_ftes": f"{roi.partner_ftes:g}",
+            "roi.fte_cost": money_short(roi.fte_cost),
+            "roi.current_cost": money_short(current),
+            "roi.price": money_short(roi.price),
+            "roi.savings": money_short(current - roi.price),
+            "roi.partners": str(roi.partners),
+            "roi.partner_free_months": str(roi.partner_free_months),
+            "roi.customers": f"{roi.customers:g}",
+            "roi.year1_revenue": money_short(roi.customers * roi.price),
+            "roi.year2_customers": f"{roi.year2_customers:g}",
+            "roi.year2_revenue": money_short(roi.year2_customers * roi.price),
+            "roi.breakeven": f"Month {breakeven:.0f}" if breakeven == breakeven
+                             else f"beyond month {roi.horizon_months}",
+            "roi.payback": f"{payback:.0f} months" if payback == payback
+                           else f"over {roi.horizon_months - roi.launch_month} months",
+        })
+
+    if "schedule" in raw:
+        from compdeck.schedule import Scheduler, milestone_week, parse_phases
+
+        spec = raw["schedule"]
+        schedule = Scheduler(parse_phases(spec["phases"]))
+        models["schedule"] = schedule
+        tables["timeline_data"] = schedule.table()
+        milestones = spec.get("milestones", [])
+        tables["milestones"] = {
+            "Week": [milestone_week(schedule, m["at"]) for m in milestones],
+            "Milestone": [m["name"] for m in milestones],
+            "Success Criteria": [m.get("criteria", "") for m in milestones],
+        }
+        figures["timeline_gantt"] = schedule.gantt()
+        bars = spec.get("overview_chart", [])
+        weeks = [schedule.phases[b["phase"]].duration for b in bars]
+        figures["phase_durations"] = {
+            "type": "bar",
+            "data": {
+                "x": [b.get("label", schedule.phases[b["phase"]].name) for b in bars],
+                "y": weeks,
+                "text": [f"{w} weeks" for w in weeks],
+                "colors": [b.get("color", "#6c757d") for b in bars],
+                "yaxis_title": "Duration (Weeks)",
+                "height": 400,
+            },
+        }
+        values["schedule.total_weeks"] = str(schedule.finish)
+        for pid in schedule.order:
+            start, end = schedule.start[pid], schedule.end[pid]
+            values.update({
+                f"schedule.{pid}.start": str(start),
+                f"schedule.{pid}.end": str(end),
+                f"schedule.{pid}.duration": str(schedule.phases[pid].duration),
+                f"schedule.{pid}.weeks": f"Week {start}" if start == end else f"Weeks {start}-{end}",
+            })
+
+    if "demo" in raw:
+        from compdeck.demo import parse_demo
+
+        demo = parse_demo(raw["demo"])
+        models["demo"] = demo
+        tables["demo_data"] = {
+            "Data Type": ["Sample contributions", "Jurisdiction rules", "Test scenarios",
+                          "Error cases", "Edge cases"],
+            "Quantity": [f"{demo.samples} samples", f"{len(demo.jurisdictions)} states",
+                         f"{demo.scenarios} scenarios", f"{demo.errors} common errors",
+                         f"{demo.edge_cases} edge cases"],
+            "Purpose": ["Show variety", "Prove flexibility", "Validate accuracy", "Error handling", "Robustness"],
+        }
+        values["demo.inputs"] = str(demo.samples + demo.scenarios + demo.errors + demo.edge_cases)
+        values["demo.states"] = ", ".join(j.code for j in demo.jurisdictions)
+
+    if "latency" in raw:
+        from compdeck.latency import parse_latency
+
+        models["latency"] = parse_latency(raw["latency"])
+
+    if "riskmap" in raw:
+        from compdeck.riskmap import parse_riskmap
+
+        models["riskmap"] = parse_riskmap(raw["riskmap"])
+
+    if "anomaly" in raw:
+        from compdeck.anomaly import parse_anomaly
+
+        models["anomaly"] = parse_anomaly(raw["anomaly"])
+
+    if "rag" in raw:
+        from compdeck.rag import parse_rag
+
+        models["rag"] = parse_rag(raw["rag"])
+
+    if "audit" in raw:
+        from compdeck.audit import parse_audit
+
+        models["audit"] = parse_audit(raw["audit"])
+
+    if "ingest" in raw:
+        from compdeck.ingest import parse_ingest
+
+        models["ingest"] = parse_ingest(raw["ingest"])
+
+    if "classifier" in raw:
+        from compdeck.classify import parse_classifier
+
+        models["classifier"] = parse_classifier(raw["classifier"])
+
+    if "trends" in raw:
+        from compdeck.trends import parse_trends
+
+        models["trends"] = parse_trends(raw["trends"])
+
+    return models, tables, figures, values
+
+
+def substitute(text, values, where):
+    """Replace ``{{ name }}`` placeholders in ``text`` with derived values."""
+    def replace(match):
+        name = match.group(1)
+        if name not in values:
+            raise ValueError(f"{where}: unknown value '{{{{ {name} }}}}'")
+        return values[name]
+
+    return PLACEHOLDER.sub(replace, text)
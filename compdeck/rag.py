@@ -0,0 +1,522 @@
+"""Offline regulation Q&A: an on-disk BM25 + dense-vector passage index.
+
+Regulation documents (``.md``/``.txt`` under the deck's ``rag.docs``
+directory) are split into overlapping passages. Each passage gets a dense
+vector from signed feature hashing of its words and word pairs, so no model
+download or network call is needed. The index lives in one directory:
+
+* ``manifest.json`` -- documents (content hash, passage range), segments,
+  deleted passage ranges and corpus statistics; replaced atomically.
+* ``seg-NNNN/`` -- one immutable segment per build: sorted term hashes with
+  CSR postings for BM25, the passage vectors as an ``.npy`` matrix, and the
+  passage texts with an offsets array.
+
+Every array is opened with ``mmap_mode="r"``: a query reads only the postings
+of its own terms, the vector matrix pages it scans and the texts of the
+passages it returns, and worker processes share those pages through the OS
+page cache instead of each holding the index in RAM.
+
+Adding or editing a document writes a new segment with just that document's
+passages and marks its old passages deleted; ``compact()`` merges segments.
+Several processes may share an index: writers hold an ``flock`` on ``.lock``
+and re-read the manifest under it before writing segments or the manifest,
+and queries pick up a replaced manifest before they run.
+Queries are answered in batches: dense scores are one matrix product per
+segment, and a query whose best dense match is weak falls back to BM25.
+
+    python -m compdeck.rag build
+    python -m compdeck.rag query "cash limit in Florida" "corporate contributions in Texas"
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCS = os.path.join(ROOT, "regulations")
+DEFAULT_INDEX = os.path.join(ROOT, ".rag_index")
+
+INDEX_VERSION = 1
+DIM = 256
+PASSAGE_WORDS = 90
+OVERLAP_WORDS = 25
+K1, B = 1.5, 0.75
+MIN_SIMILARITY = 0.25  # best dense score below this -> answer with BM25
+MAX_SEGMENTS = 8
+DOC_SUFFIXES = (".md", ".txt")
+
+TOKEN = re.compile(r"[a-z0-9$]+(?:[.,][0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its may must "
+    "no not of on or per than that the their there this to was what when which who will with "
+    "would you your".split()
+)
+
+
+class RagSpec(NamedTuple):
+    docs: str  # directory of regulation documents
+    index: str  # index directory
+    k: int  # passages shown per question
+    examples: tuple  # example questions for the deck and static exports
+
+
+def _resolve(path):
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def parse_rag(raw):
+    spec = RagSpec(
+        docs=_resolve(raw.get("docs", "regulations")),
+        index=_resolve(raw.get("index", ".rag_index")),
+        k=int(raw.get("k", 3)),
+        examples=tuple(str(q) for q in raw.get("examples", ())),
+    )
+    if spec.k < 1:
+        raise ValueError("rag.k: must be at least 1")
+    return spec
+
+
+class Passage(NamedTuple):
+    doc: str
+    heading: str
+    text: str
+
+
+class Hit(NamedTuple):
+    score: float
+    passage: int
+    doc: str
+    heading: str
+    text: str
+    via: str  # "dense" or "bm25"
+
+
+# -- Text processing ----------------------------------------------------------
+
+@lru_cache(maxsize=200_000)
+def _stem(token):
+    """Crude suffix stripping so "records"/"recorded"/"recording" share a term."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3 and not token[-len(suffix) - 1].isdigit():
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    return [_stem(t) for t in TOKEN.findall(text.lower().replace(",", "")) if t not in STOPWORDS]
+
+
+@lru_cache(maxsize=200_000)
+def term_hash(term):
+    """Stable 63-bit hash of a term (Python's own hash is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little") >> 1
+
+
+def split_passages(doc, text, words=PASSAGE_WORDS, overlap=OVERLAP_WORDS):
+    """Overlapping passages of about ``words`` words, never crossing a heading."""
+    passages = []
+    heading = ""
+    title = ""
+    for block in re.split(r"\n(?=#)", text):
+        lines = block.strip().splitlines()
+        if not lines:
+            continue
+        if lines[0].startswith("#"):
+            heading = lines[0].lstrip("#").strip()
+            title = title or heading
+            lines = lines[1:]
+        body = " ".join(line.strip() for line in lines).split()
+        label = heading if heading == title else f"{title} › {heading}"
+        for start in range(0, max(len(body) - overlap, 1), words - overlap):
+            chunk = " ".join(body[start:start + words])
+            if chunk:
+                passages.append(Passage(doc, label, chunk))
+    return passages
+
+
+@lru_cache(maxsize=200_000)
+def _word_features(token):
+    """Hashes of a word and of its character trigrams."""
+    grams = [f"#{token[i:i + 3]}" for i in range(len(token) - 2)] if len(token) > 3 else []
+    return [term_hash(token)] + [term_hash(g) for g in grams]
+
+
+def embed(texts, dim=DIM, tokens=None):
+    """Signed feature-hashed vectors, L2-normalized, float32.
+
+    Features are words, adjacent word pairs and character trigrams of each
+    word, so related word forms ("kept"/"keep") still overlap. ``tokens``
+    may pass already tokenized texts.
+    """
+    counts, hashes = [], []
+    for words in tokens if tokens is not None else map(tokenize, texts):
+        before = len(hashes)
+        for word in words:
+            hashes += _word_features(word)
+        hashes += [term_hash(f"{a} {b}") for a, b in zip(words, words[1:])]
+        counts.append(len(hashes) - before)
+    hashes = np.array(hashes, dtype=np.uint64)
+    cells = np.repeat(np.arange(len(counts)), counts) * dim + (hashes % np.uint64(dim)).astype(np.intp)
+    sign = np.where((hashes >> np.uint64(62)) & np.uint64(1), -1.0, 1.0)
+    matrix = np.bincount(cells, weights=sign, minlength=len(counts) * dim).reshape(len(counts), dim)
+    # Sublinear term weighting, then unit length so a dot product is a cosine.
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+# -- Segments -----------------------------------------------------------------
+
+def _write_segment(path, passages, base):
+    """Write one immutable segment for ``passages`` (global ids from ``base``)."""
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=".seg-")
+    postings = {}
+    lengths = np.zeros(len(passages), dtype=np.int32)
+    tokenized = [tokenize(f"{p.heading} {p.text}") for p in passages]
+    for i, tokens in enumerate(tokenized):
+        lengths[i] = len(tokens)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            postings.setdefault(term_hash(token), []).append((base + i, tf))
+
+    terms = np.array(sorted(postings), dtype=np.uint64)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[t]) for t in terms.tolist()])
+    flat = [p for t in terms.tolist() for p in postings[t]]
+    np.save(os.path.join(tmp, "terms.npy"), terms)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp, "postings.npy"), np.array([p for p, _ in flat], dtype=np.int64))
+    np.save(os.path.join(tmp, "tf.npy"), np.array([tf for _, tf in flat], dtype=np.uint16))
+    np.save(os.path.join(tmp, "lengths.npy"), lengths)
+    np.save(os.path.join(tmp, "vectors.npy"), embed(None, tokens=tokenized))
+
+    encoded = [json.dumps(p._asdict()).encode("utf-8") for p in passages]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    text_offsets[1:] = np.cumsum([len(e) for e in encoded])
+    with open(os.path.join(tmp, "passages.jsonb"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(tmp, "text_offsets.npy"), text_offsets)
+    os.replace(tmp, path)
+    return {"name": os.path.basename(path), "base": base, "count": len(passages), "tokens": int(lengths.sum())}
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment directory."""
+
+    def __init__(self, root, meta):
+        self.name = meta["name"]
+        self.base = meta["base"]
+        self.count = meta["count"]
+        path = os.path.join(root, self.name)
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")  # noqa: E731
+        self.terms = load("terms.npy")
+        self.offsets = load("offsets.npy")
+        self.postings = load("postings.npy")
+        self.tf = load("tf.npy")
+        self.lengths = load("lengths.npy")
+        self.vectors = load("vectors.npy")
+        self.text_offsets = load("text_offsets.npy")
+        self._texts = os.path.join(path, "passages.jsonb")
+
+    def lookup(self, term):
+        """``(passage ids, term frequencies)`` for one term hash (empty if absent)."""
+        i = int(np.searchsorted(self.terms, np.uint64(term)))
+        if i == len(self.terms) or int(self.terms[i]) != term:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.postings[start:end], self.tf[start:end]
+
+    def passage(self, pid):
+        i = pid - self.base
+        start, end = int(self.text_offsets[i]), int(self.text_offsets[i + 1])
+        with open(self._texts, "rb") as f:
+            f.seek(start)
+            return Passage(**json.loads(f.read(end - start)))
+
+
+# -- Index --------------------------------------------------------------------
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class RegulationIndex:
+    """Incrementally built on-disk passage index, shared by the host's processes.
+
+    Updates and compactions are serialized by an ``flock`` on ``.lock``.
+    """
+
+    def __init__(self, root=DEFAULT_INDEX):
+        self.root = root
+        self._version = None  # (inode, mtime) of the manifest last read
+        self._lock = threading.Lock()
+        self.manifest = None
+        self.segments = []
+        self.reload()
+
+    # -- manifest ----------------------------------------------------------
+
+    def _empty_manifest(self):
+        return {"version": INDEX_VERSION, "dim": DIM, "docs": {}, "segments": [], "deleted": [],
+                "next_id": 0, "live": 0, "tokens": 0}
+
+    def reload(self):
+        """Pick up a manifest written by another process, if it changed."""
+        path = os.path.join(self.root, "manifest.json")
+        try:
+            f = open(path, encoding="utf-8")
+        except FileNotFoundError:
+            self.manifest, self.segments, self._version = self._empty_manifest(), [], None
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            version = (stat.st_ino, stat.st_mtime_ns)
+            if version == self._version:
+                return
+            manifest = json.load(f)
+        if manifest.get("version") != INDEX_VERSION or manifest.get("dim") != DIM:
+            manifest = self._empty_manifest()  # stale format: next update() rebuilds
+        self.manifest = manifest
+        self.segments = [Segment(self.root, meta) for meta in manifest["segments"]]
+        self._deleted = self._deleted_mask()
+        self._version = version
+
+    @contextmanager
+    def _writing(self):
+        """Hold the index's write lock (thread lock, then ``flock``) with a freshly read manifest."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, ".lock"), "a+b") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.reload()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _deleted_mask(self):
+        mask = np.zeros(self.manifest["next_id"], dtype=bool)
+        for start, end in self.manifest["deleted"]:
+            mask[start:end] = True
+        return mask
+
+    def _save(self, manifest):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.root, "manifest.json"))
+        # Only writers holding the lock create segments, so directories the
+        # new manifest does not list are left over from earlier writers.
+        live = {s["name"] for s in manifest["segments"]}
+        for name in os.listdir(self.root):
+            if (name.startswith("seg-") and name not in live) or name.startswith(".seg-"):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        self.reload()
+
+    def _next_name(self):
+        # Directories left by a writer that died before saving the manifest count too.
+        taken = [name for name in os.listdir(self.root) if name.startswith("seg-")]
+        return f"seg-{max([int(name[4:]) for name in taken] + [0]) + 1:04d}"
+
+    # -- building ----------------------------------------------------------
+
+    def update(self, docs_dir=DEFAULT_DOCS):
+        """Index new or changed documents and drop removed ones.
+
+        Returns ``(added, removed, unchanged)`` document counts. Unchanged
+        documents are not read past their hash.
+        """
+        current = {}
+        for name in sorted(os.listdir(docs_dir)):
+            if name.endswith(DOC_SUFFIXES) and not name.upper().startswith("README"):
+                current[name] = _hash_file(os.path.join(docs_dir, name))
+        with self._writing():
+            return self._update(docs_dir, current)
+
+    def _update(self, docs_dir, current):
+        manifest = json.loads(json.dumps(self.manifest))
+        added = [n for n, h in current.items() if manifest["docs"].get(n, {}).get("sha256") != h]
+        removed = [n for n in manifest["docs"] if n not in current or n in added]
+        unchanged = len(current) - len(added)
+        if not added and not removed:
+            return 0, 0, unchanged
+
+        for name in removed:
+            doc = manifest["docs"].pop(name)
+            manifest["deleted"].append(doc["passages"])
+            manifest["live"] -= doc["passages"][1] - doc["passages"][0]
+            manifest["tokens"] -= doc["tokens"]
+
+        passages = []
+        base = manifest["next_id"]
+        for name in added:
+            with open(os.path.join(docs_dir, name), encoding="utf-8") as f:
+                doc_passages = split_passages(name, f.read())
+            start = base + len(passages)
+            passages += doc_passages
+            manifest["docs"][name] = {"sha256": current[name], "passages": [start, start + len(doc_passages)],
+                                      "tokens": 0}
+        if passages:
+            meta = _write_segment(os.path.join(self.root, self._next_name()), passages, base)
+            manifest["segments"].append(meta)
+            manifest["next_id"] = base + len(passages)
+            manifest["live"] += len(passages)
+            manifest["tokens"] += meta["tokens"]
+            lengths = np.load(os.path.join(self.root, meta["name"], "lengths.npy"))
+            for name in added:
+                start, end = manifest["docs"][name]["passages"]
+                manifest["docs"][name]["tokens"] = int(lengths[start - base:end - base].sum())
+
+        self._save(manifest)
+        if len(self.segments) > MAX_SEGMENTS:
+            self._compact()
+        return len(added), len(removed) - len([n for n in removed if n in added]), unchanged
+
+    def compact(self):
+        """Rewrite all live passages into one segment (ids are renumbered)."""
+        with self._writing():
+            self._compact()
+
+    def _compact(self):
+        manifest = self._empty_manifest()
+        passages = []
+        for name, doc in sorted(self.manifest["docs"].items(), key=lambda item: item[1]["passages"][0]):
+            start, end = doc["passages"]
+            doc_passages = [self._passage(pid) for pid in range(start, end)]
+            manifest["docs"][name] = dict(doc, passages=[len(passages), len(passages) + len(doc_passages)])
+            passages += doc_passages
+        meta = _write_segment(os.path.join(self.root, self._next_name()), passages, 0)
+        manifest.update(segments=[meta], next_id=len(passages), live=len(passages), tokens=meta["tokens"])
+        self._save(manifest)
+
+    # -- querying ----------------------------------------------------------
+
+    def _segment_of(self, pid):
+        for segment in self.segments:
+            if segment.base <= pid < segment.base + segment.count:
+                return segment
+        raise KeyError(pid)
+
+    def _passage(self, pid):
+        return self._segment_of(pid).passage(pid)
+
+    def _hit(self, pid, score, via):
+        passage = self._passage(pid)
+        return Hit(float(score), int(pid), passage.doc, passage.heading, passage.text, via)
+
+    def dense(self, queries, k):
+        """Top-k ``(ids, scores)`` per query by cosine, one matmul per segment."""
+        q = embed(queries)
+        best_ids = np.full((len(queries), 0), -1, dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        for segment in self.segments:
+            scores = q @ np.asarray(segment.vectors).T
+            scores[:, self._deleted[segment.base:segment.base + segment.count]] = -np.inf
+            top = min(k, scores.shape[1])
+            idx = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            best_ids = np.hstack([best_ids, idx + segment.base])
+            best_scores = np.hstack([best_scores, np.take_along_axis(scores, idx, axis=1)])
+        order = np.argsort(-best_scores, axis=1)[:, :k]
+        return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def bm25(self, query, k):
+        """Top-k ``(ids, scores)`` for one query; reads only its terms' postings."""
+        live = max(self.manifest["live"], 1)
+        avgdl = self.manifest["tokens"] / live
+        ids, scores = [], []
+        for term in set(tokenize(query)):
+            h = term_hash(term)
+            found = [(s, hit) for s in self.segments if (hit := s.lookup(h)) is not None]
+            df = sum(len(postings) for _, (postings, _) in found)
+            if not df:
+                continue
+            idf = np.log1p((live - df + 0.5) / (df + 0.5))
+            for segment, (postings, tf) in found:
+                tf = np.asarray(tf, dtype=np.float32)
+                length = segment.lengths[np.asarray(postings) - segment.base]
+                ids.append(np.asarray(postings))
+                scores.append(idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl)))
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        totals[self._deleted[unique]] = -np.inf
+        order = np.argsort(-totals)[:k]
+        order = order[np.isfinite(totals[order])]
+        return unique[order], totals[order]
+
+    def search(self, queries, k=3, mode="auto"):
+        """Top-``k`` hits for each query in ``queries``.
+
+        ``mode`` is ``dense``, ``bm25`` or ``auto`` (dense, with BM25 for a
+        query whose best dense score is below ``MIN_SIMILARITY``).
+        """
+        self.reload()
+        try:
+            return self._search(queries, k, mode)
+        except FileNotFoundError:  # another process compacted the segments away: read its manifest
+            self._version = None
+            self.reload()
+            return self._search(queries, k, mode)
+
+    def _search(self, queries, k, mode):
+        if not self.segments:
+            return [[] for _ in queries]
+        results = []
+        dense_ids, dense_scores = self.dense(queries, k) if mode != "bm25" else (None, None)
+        for i, query in enumerate(queries):
+            weak = dense_ids is None or not len(dense_scores[i]) or dense_scores[i][0] < MIN_SIMILARITY
+            if mode == "bm25" or (mode == "auto" and weak):
+                ids, scores = self.bm25(query, k)
+                results.append([self._hit(p, s, "bm25") for p, s in zip(ids, scores)])
+            else:
+                results.append([self._hit(p, s, "dense") for p, s in zip(dense_ids[i], dense_scores[i])
+                                if np.isfinite(s)])
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the regulation Q&A index.")
+    parser.add_argument("command", choices=["build", "compact", "query"])
+    parser.add_argument("queries", nargs="*")
+    parser.add_argument("--docs", default=DEFAULT_DOCS)
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--mode", choices=["auto", "dense", "bm25"], default="auto")
+    args = parser.parse_intermixed_args(argv)
+
+    index = RegulationIndex(args.index)
+    start = time.perf_counter()
+    if args.command == "build":
+        added, removed, unchanged = index.update(args.docs)
+        print(f"indexed {added} document(s), removed {removed}, {unchanged} unchanged; "
+              f"{index.manifest['live']} passages in {len(index.segments)} segment(s) "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    elif args.command == "compact":
+        index.compact()
+        print(f"compacted to {index.manifest['live']} passages in 1 segment")
+    else:
+        for query, hits in zip(args.queries, index.search(args.queries, args.k, args.mode)):
+            print(f"\n? {query}")
+            for hit in hits:
+                print(f"  {hit.score:6.3f} [{hit.via}] {hit.doc} — {hit.heading}\n         {hit.text[:140]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Streamlit renderer for deck sections."""
+
+import streamlit as st
+from streamlit.elements.lib.column_config_utils import marshall_column_config
+from streamlit.proto.Arrow_pb2 import Arrow as ArrowProto
+
+from compdeck.figures import show_figure
+from compdeck.store import table_payload
+from compdeck.widgets import WIDGETS
+
+
+def render_blocks(deck, blocks):
+    for block in blocks:
+        BLOCK_RENDERERS[block["type"]](deck, block)
+
+
+def _render_columns(deck, block):
+    for col, blocks in zip(st.columns(len(block["columns"])), block["columns"]):
+        with col:
+            render_blocks(deck, blocks)
+
+
+def _render_markdown(deck, block):
+    st.markdown(block["text"], unsafe_allow_html=block.get("html", False))
+
+
+def _render_table(deck, block):
+    # Same element as st.dataframe(frame, use_container_width=True), filled
+    # from the deck's pre-encoded Arrow payload instead of converting per rerun.
+    # Inline tables are built per view, so they are encoded as they render.
+    proto = ArrowProto()
+    proto.use_container_width = True
+    proto.editing_mode = ArrowProto.EditingMode.READ_ONLY
+    proto.data = table_payload(block["data"]) if "data" in block else deck.arrow(block["name"])
+    marshall_column_config(proto, {})
+    st._main._enqueue("arrow_data_frame", proto)
+
+
+def _render_chart(deck, block):
+    figure = deck.chart(block)
+    show_figure(figure["type"], figure["data"])
+
+
+def _render_widget(deck, block):
+    WIDGETS[block["name"]].render(deck, block)
+
+
+BLOCK_RENDERERS = {
+    "header": lambda deck, block: st.header(block["text"]),
+    "subheader": lambda deck, block: st.subheader(block["text"]),
+    "markdown": _render_markdown,
+    "info": lambda deck, block: st.info(block["text"]),
+    "success": lambda deck, block: st.success(block["text"]),
+    "warning": lambda deck, block: st.warning(block["text"]),
+    "error": lambda deck, block: st.error(block["text"]),
+    "metric": lambda deck, block: st.metric(block["label"], block["value"], block.get("delta")),
+    "columns": _render_columns,
+    "table": _render_table,
+    "chart": _render_chart,
+    "widget": _render_widget,
+}
+
+
+def render_section(deck, section):
+    render_blocks(deck, section["blocks"])
+
+
+def section_registry(deck):
+    """Map each section label to a callable that renders only that section."""
+    return {
+        section["label"]: (lambda section=section: render_section(deck, section))
+        for section in deck.sections
+    }
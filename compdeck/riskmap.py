@@ -0,0 +1,180 @@
+"""Server-side binning for the multi-state risk heatmap.
+
+Checked contributions are reduced to a ``RiskCube``: counts and amounts per
+state x day x risk bucket (plus per-state pass/review/fail counts), built
+with one ``bincount`` per batch and filled batch by batch, so its size
+depends on the number of states and days, never on the number of rows.
+A heatmap view -- a date range, a time granularity, a set of states and a
+metric -- sums slices of the cube with ``np.add.reduceat`` into at most
+``MAX_COLUMNS`` time bins, so the browser always gets a small fixed-size
+matrix whether the cube was filled from 10k or 50M contributions.
+"""
+
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+
+from compdeck.compliance import STATUSES, category_codes, check_batch, synthetic_batch
+
+RISK_BUCKETS = ("low", "medium", "high", "critical")
+GRANULARITIES = ("auto", "day", "week", "month")
+METRICS = ("High-risk share", "Mean risk score", "Contributions", "Amount")
+MAX_COLUMNS = 60
+
+
+class RiskMapSpec(NamedTuple):
+    rows: int  # synthetic contributions behind the demo heatmap
+    start: str  # first day (ISO date)
+    days: int
+    seed: int
+
+
+def parse_riskmap(raw):
+    spec = RiskMapSpec(int(raw.get("rows", 200_000)), str(raw.get("start", "2025-01-01")),
+                       int(raw.get("days", 365)), int(raw.get("seed", 0)))
+    if spec.rows < 1 or spec.days < 1:
+        raise ValueError("riskmap: rows and days must be positive")
+    return spec
+
+
+def risk_scores(batch, checked, rules):
+    """Risk score in [0, 1] per contribution.
+
+    Half comes from how close the donor's window total is to the
+    jurisdiction's aggregate (or, without one, itemization) limit; a review
+    finding adds 0.3 and a failed rule 0.5.
+    """
+    jurisdiction = category_codes(batch["jurisdiction"], rules.codes)
+    limit = np.where(np.isfinite(rules.aggregate_limit), rules.aggregate_limit, rules.itemize_over * 10)
+    closeness = np.clip(checked["window_total"].to_numpy() / limit[jurisdiction], 0, 1)
+    status = checked["status"].cat.codes.to_numpy()
+    return np.minimum(0.5 * closeness + np.array([0.0, 0.3, 0.5])[status], 1.0).astype(np.float32)
+
+
+def risk_bucket(scores):
+    return np.minimum((scores * len(RISK_BUCKETS)).astype(np.int8), len(RISK_BUCKETS) - 1)
+
+
+class RiskCube:
+    """State x day x risk-bucket aggregates of checked contributions."""
+
+    def __init__(self, codes, start, days):
+        self.codes = tuple(codes)
+        self.start = np.datetime64(start, "D")
+        self.days = days
+        shape = (len(self.codes), days, len(RISK_BUCKETS))
+        self.counts = np.zeros(shape, np.int64)
+        self.amounts = np.zeros(shape, np.float64)
+        self.score_sums = np.zeros(shape[:2], np.float64)
+        self.status = np.zeros((len(self.codes), len(STATUSES)), np.int64)
+        self.rows = 0
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes + self.amounts.nbytes + self.score_sums.nbytes + self.status.nbytes
+
+    def add(self, batch, rules):
+        """Check ``batch`` and fold it in; rows outside the cube's states or days are skipped."""
+        checked = check_batch(batch, rules)
+        scores = risk_scores(batch, checked, rules)
+        state = category_codes(batch["jurisdiction"], list(self.codes))
+        day = (batch["date"].to_numpy(dtype="datetime64[D]") - self.start).astype(np.int64)
+        keep = (state < len(self.codes)) & (day >= 0) & (day < self.days)
+        state, day, scores = state[keep], day[keep], scores[keep]
+        bucket = risk_bucket(scores)
+        amount = np.nan_to_num(batch["amount"].to_numpy(dtype=float, na_value=np.nan)[keep])
+
+        cell = (state * self.days + day) * len(RISK_BUCKETS) + bucket
+        size = self.counts.size
+        self.counts += np.bincount(cell, minlength=size).reshape(self.counts.shape)
+        self.amounts += np.bincount(cell, weights=amount, minlength=size).reshape(self.amounts.shape)
+        self.score_sums += np.bincount(state * self.days + day, weights=scores,
+                                       minlength=self.score_sums.size).reshape(self.score_sums.shape)
+        status = checked["status"].cat.codes.to_numpy()[keep]
+        self.status += np.bincount(state * len(STATUSES) + status,
+                                   minlength=self.status.size).reshape(self.status.shape)
+        self.rows += int(keep.sum())
+
+    def edges(self, first, last, granularity):
+        """Start offsets of the time bins covering days ``[first, last]``.
+
+        ``granularity`` is the finest one to use: a range too long for it to
+        fit in ``MAX_COLUMNS`` bins gets the next coarser one ("auto" is the
+        finest that fits).
+        """
+        span = last - first + 1
+        allowed = GRANULARITIES[max(GRANULARITIES.index(granularity), 1):]
+        fits = [g for g, width in (("day", 1), ("week", 7)) if g in allowed and span / width <= MAX_COLUMNS]
+        granularity = fits[0] if fits else "month"
+        if granularity == "month":
+            months = np.arange((self.start + first).astype("datetime64[M]"),
+                               (self.start + last).astype("datetime64[M]") + 1)
+            starts = (months.astype("datetime64[D]") - self.start).astype(np.int64)
+            starts[0] = first
+            return starts, granularity
+        width = 7 if granularity == "week" else 1
+        return np.arange(first, last + 1, width), granularity
+
+    def view(self, first=0, last=None, granularity="auto", states=None, metric=METRICS[0]):
+        """Heatmap data (states x time bins) for one zoom/filter level.
+
+        ``first``/``last`` are day offsets (inclusive), ``states`` a subset of
+        codes (default all). The result is a plain dict for the ``heatmap``
+        figure type, at most ``MAX_COLUMNS`` wide (months beyond that).
+        """
+        last = self.days - 1 if last is None else min(last, self.days - 1)
+        rows = [self.codes.index(c) for c in (states or self.codes)]
+        starts, granularity = self.edges(first, last, granularity)
+        counts = np.add.reduceat(self.counts[rows, first:last + 1], starts - first, axis=1)
+        total = counts.sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if metric == "High-risk share":
+                z = counts[:, :, 2:].sum(axis=2) / total
+            elif metric == "Mean risk score":
+                z = np.add.reduceat(self.score_sums[rows, first:last + 1], starts - first, axis=1) / total
+            elif metric == "Contributions":
+                z = total.astype(np.float64)
+            elif metric == "Amount":
+                z = np.add.reduceat(self.amounts[rows, first:last + 1], starts - first, axis=1).sum(axis=2)
+            else:
+                raise ValueError(f"unknown metric '{metric}'")
+        labels = self.start + starts
+        fmt = {"day": "%b %d", "week": "wk of %b %d", "month": "%b %Y"}[granularity]
+        return {
+            "x": [date.fromisoformat(str(d)).strftime(fmt) for d in labels],
+            "y": [self.codes[r] for r in rows],
+            "z": [[None if not np.isfinite(v) else round(float(v), 4) for v in row] for row in z],
+            "xaxis_title": granularity.capitalize(),
+            "yaxis_title": "State",
+            "colorbar_title": metric,
+            "colorscale": "RdYlGn_r" if metric in METRICS[:2] else "Blues",
+            "height": 120 + 40 * len(rows),
+        }
+
+    def dashboard(self):
+        """Per-state totals for the multi-state compliance table."""
+        counts = self.counts.sum(axis=1)
+        total = counts.sum(axis=1)
+        share = counts[:, 2:].sum(axis=1) / np.maximum(total, 1)
+        return {
+            "State": list(self.codes),
+            "Contributions": [f"{n:,}" for n in total.tolist()],
+            **{status.capitalize(): [f"{n:,}" for n in self.status[:, i].tolist()]
+               for i, status in enumerate(STATUSES)},
+            "High risk": [f"{s:.1%}" for s in share.tolist()],
+            "Amount": [f"${a:,.0f}" for a in self.amounts.sum(axis=(1, 2)).tolist()],
+        }
+
+
+def synthetic_cube(rules, rows, start, days, seed=0, chunk=2_000_000):
+    """A ``RiskCube`` filled from ``rows`` synthetic contributions, ``chunk`` at a time.
+
+    Chunks draw disjoint donors, so per-donor window totals stay exact.
+    """
+    cube = RiskCube(rules.codes, start, days)
+    for i, offset in enumerate(range(0, rows, chunk)):
+        n = min(chunk, rows - offset)
+        cube.add(synthetic_batch(n, rules.codes, seed=seed + i, donor_offset=offset, start=start, days=days),
+                 rules)
+    return cube
@@ -0,0 +1,134 @@
+"""Cash-flow, break-even and ROI sensitivity engine for the Budget tab.
+
+Spending follows the budget model (``compdeck.budget``) until launch, then a
+flat ``monthly_burn``. Revenue ramps linearly from launch to ``customers``
+paying customers over ``ramp_months``; innovation partners start paying
+their discounted price once their free period ends. The break-even month is
+the first month cumulative cash flow turns non-negative.
+
+``sweep()`` evaluates every combination of price x customers x ramp x burn in
+one broadcast NumPy pass over a ``(P, C, R, B, months)`` array.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+SWEEP_AXES = ("price", "customers", "ramp_months", "monthly_burn")
+
+
+class RoiModel(NamedTuple):
+    price: float            # annual subscription per customer
+    customers: float        # paying customers once the ramp completes
+    ramp_months: float
+    monthly_burn: float     # operating cost per month after the build budget
+    launch_month: int
+    partners: int
+    partner_free_months: int
+    partner_discount: float
+    horizon_months: int
+    year2_customers: float
+    partner_ftes: float
+    fte_cost: float
+    build_spend: tuple      # planned spend for months 1..len(build_spend)
+    sweep: tuple            # ((start, stop, num), ...) in SWEEP_AXES order
+
+
+def build_spend(budget):
+    """Planned spend per month (including buffer) from a ``BudgetModel``."""
+    spend = np.zeros(budget.months)
+    for c in budget.categories:
+        spend[:c.months] += c.monthly
+        spend[0] += c.one_time
+    return tuple(spend * (1 + budget.buffer_pct / 100))
+
+
+def parse_roi(raw, budget):
+    sweep = raw.get("sweep", {})
+    return RoiModel(
+        price=float(raw["price"]),
+        customers=float(raw["customers"]),
+        ramp_months=float(raw["ramp_months"]),
+        monthly_burn=float(raw["monthly_burn"]),
+        launch_month=int(raw.get("launch_month", budget.months)),
+        partners=int(raw.get("partners", 0)),
+        partner_free_months=int(raw.get("partner_free_months", 0)),
+        partner_discount=float(raw.get("partner_discount", 0)),
+        horizon_months=int(raw.get("horizon_months", 36)),
+        year2_customers=float(raw.get("year2_customers", raw["customers"])),
+        partner_ftes=float(raw.get("partner_ftes", 0)),
+        fte_cost=float(raw.get("fte_cost", 0)),
+        build_spend=build_spend(budget),
+        sweep=tuple(tuple(sweep.get(axis, (0, 0, 0))) for axis in SWEEP_AXES),
+    )
+
+
+def grid_axes(model):
+    """The sweep's value axes; an axis declared with ``num: 0`` stays at the base value."""
+    axes = []
+    for axis, (start, stop, num) in zip(SWEEP_AXES, model.sweep):
+        axes.append(np.linspace(start, stop, int(num)) if num else np.array([getattr(model, axis)]))
+    return axes
+
+
+def _first_true(mask):
+    """Index of the first True along the last axis, NaN where there is none."""
+    first = mask.argmax(axis=-1).astype(np.float32)
+    first[~mask.any(axis=-1)] = np.nan
+    return first
+
+
+def sweep(model, price, customers, ramp_months, monthly_burn):
+    """Break-even month (1-based, NaN if beyond the horizon) for every combination.
+
+    Each argument is a 1-D array; the result has shape
+    ``(len(price), len(customers), len(ramp_months), len(monthly_burn))``.
+    """
+    months = np.arange(1, model.horizon_months + 1, dtype=np.float32)
+    live = months - model.launch_month  # months since launch
+
+    p = np.asarray(price, dtype=np.float32)[:, None, None, None, None] / 12
+    c = np.asarray(customers, dtype=np.float32)[None, :, None, None, None]
+    r = np.maximum(np.asarray(ramp_months, dtype=np.float32), 1)[None, None, :, None, None]
+    b = np.asarray(monthly_burn, dtype=np.float32)[None, None, None, :, None]
+
+    adoption = np.clip(live / r, 0, 1)                                   # (1, 1, R, 1, T)
+    paying_partners = model.partners * (live > model.partner_free_months)
+    revenue = p * (c * adoption + paying_partners * (1 - model.partner_discount))  # (P, C, R, 1, T)
+
+    build = np.zeros(model.horizon_months, dtype=np.float32)
+    n = min(len(model.build_spend), model.horizon_months)
+    build[:n] = model.build_spend[:n]
+    cost = np.where(months <= len(model.build_spend), build, b)          # (1, 1, 1, B, T)
+
+    cumulative = np.cumsum(revenue - cost, axis=-1)                      # (P, C, R, B, T)
+    return _first_true(cumulative >= 0) + 1
+
+
+def base_case(model):
+    """Break-even month and payback (months after launch) at the model's base values."""
+    month = float(sweep(model, [model.price], [model.customers],
+                        [model.ramp_months], [model.monthly_burn]).ravel()[0])
+    return month, month - model.launch_month
+
+
+def nearest_index(axes, model):
+    """Grid position closest to the model's base values."""
+    return tuple(int(np.abs(ax - getattr(model, axis)).argmin()) for axis, ax in zip(SWEEP_AXES, axes))
+
+
+def tornado(cube, axes, index):
+    """Break-even month at each axis' low/high end, others held at ``index``.
+
+    Reads straight from a precomputed ``sweep()`` cube. Returns
+    ``[(axis, low_value, low_month, high_value, high_month)]`` sorted by
+    swing, widest first (NaN = no break-even within the horizon).
+    """
+    rows = []
+    for i, axis in enumerate(SWEEP_AXES):
+        low, high = list(index), list(index)
+        low[i], high[i] = 0, len(axes[i]) - 1
+        rows.append((axis, float(axes[i][0]), float(cube[tuple(low)]),
+                     float(axes[i][-1]), float(cube[tuple(high)])))
+    never = np.nanmax(cube) + 1 if np.isfinite(cube).any() else 0
+    return sorted(rows, key=lambda r: -abs(np.nan_to_num(r[4], nan=never) - np.nan_to_num(r[2], nan=never)))
@@ -0,0 +1,224 @@
+"""Critical-path scheduler for the deck's timeline.
+
+Phases form a dependency DAG. Each phase starts the week after its latest
+dependency ends, shifted by its ``lag`` (negative lag = overlap), or at a
+fixed ``start`` week when it has no dependencies. Weeks are 1-based and
+inclusive: a phase of ``duration`` d starting in week s ends in s + d - 1.
+
+``Scheduler`` keeps the computed start/end weeks and, when a duration or a
+dependency changes, only re-evaluates the downstream phases whose start
+actually moves. Slack and the critical path come from a backward pass that
+is computed lazily and cached until the next change.
+"""
+
+import heapq
+from typing import NamedTuple
+
+
+class Phase(NamedTuple):
+    id: str
+    name: str
+    duration: int
+    after: tuple = ()
+    lag: int = 0
+    start: int = 1
+    owner: str = ""
+
+
+class CycleError(ValueError):
+    """Raised when dependencies would form a cycle."""
+
+
+def parse_phases(raw):
+    phases = []
+    for item in raw:
+        phases.append(Phase(
+            id=item["id"],
+            name=item.get("name", item["id"]),
+            duration=int(item["duration"]),
+            after=tuple(item.get("after", ())),
+            lag=int(item.get("lag", 0)),
+            start=int(item.get("start", 1)),
+            owner=item.get("owner", ""),
+        ))
+    return phases
+
+
+class Scheduler:
+    def __init__(self, phases):
+        self.phases = {}
+        self.order = []
+        self.succ = {}
+        for phase in phases:
+            if phase.id in self.phases:
+                raise ValueError(f"duplicate phase id '{phase.id}'")
+            self.phases[phase.id] = phase
+            self.order.append(phase.id)
+            self.succ[phase.id] = []
+        for phase in phases:
+            for dep in phase.after:
+                if dep not in self.phases:
+                    raise ValueError(f"phase '{phase.id}' depends on unknown phase '{dep}'")
+                self.succ[dep].append(phase.id)
+        self._sort()
+        self.start = {}
+        self.end = {}
+        self._slack = None
+        self._propagate(self.topo)
+
+    def copy(self):
+        """Independent scheduler with the same phases and computed weeks."""
+        other = Scheduler.__new__(Scheduler)
+        other.phases = dict(self.phases)
+        other.order = list(self.order)
+        other.succ = {k: list(v) for k, v in self.succ.items()}
+        other.topo = list(self.topo)
+        other.position = dict(self.position)
+        other.start = dict(self.start)
+        other.end = dict(self.end)
+        other._slack = self._slack
+        return other
+
+    # -- forward pass -------------------------------------------------------
+
+    def _sort(self):
+        """Kahn's algorithm; raises CycleError if the graph is not a DAG."""
+        indegree = {pid: len(p.after) for pid, p in self.phases.items()}
+        ready = [pid for pid in self.order if indegree[pid] == 0]
+        topo = []
+        while ready:
+            pid = ready.pop()
+            topo.append(pid)
+            for nxt in self.succ[pid]:
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    ready.append(nxt)
+        if len(topo) != len(self.phases):
+            raise CycleError("phase dependencies contain a cycle")
+        self.topo = topo
+        self.position = {pid: i for i, pid in enumerate(topo)}
+
+    def _earliest(self, phase):
+        if not phase.after:
+            return phase.start
+        return max(self.end[dep] for dep in phase.after) + 1 + phase.lag
+
+    def _propagate(self, seeds):
+        """Recompute ``seeds`` and whatever downstream of them actually moves.
+
+        Phases are visited in topological order (a heap on topo position), so
+        every phase is evaluated at most once, after all its dependencies.
+        Returns the ids whose start or end changed.
+        """
+        heap = [(self.position[pid], pid) for pid in set(seeds)]
+        heapq.heapify(heap)
+        queued = {pid for _, pid in heap}
+        changed = []
+        while heap:
+            _, pid = heapq.heappop(heap)
+            phase = self.phases[pid]
+            start = self._earliest(phase)
+            end = start + phase.duration - 1
+            if self.start.get(pid) == start and self.end.get(pid) == end:
+                continue
+            self.start[pid] = start
+            self.end[pid] = end
+            changed.append(pid)
+            for nxt in self.succ[pid]:
+                if nxt not in queued:
+                    queued.add(nxt)
+                    heapq.heappush(heap, (self.position[nxt], nxt))
+        if changed:
+            self._slack = None
+        return changed
+
+    def set_duration(self, pid, duration):
+        """Change one phase's duration; returns the ids whose weeks moved."""
+        self.phases[pid] = self.phases[pid]._replace(duration=int(duration))
+        return self._propagate([pid])
+
+    def set_dependencies(self, pid, after, lag=None):
+        """Replace one phase's dependencies (and optionally its lag)."""
+        phase = self.phases[pid]
+        after = tuple(after)
+        for dep in after:
+            if dep not in self.phases:
+                raise ValueError(f"unknown phase '{dep}'")
+        for dep in phase.after:
+            self.succ[dep].remove(pid)
+        for dep in after:
+            self.succ[dep].append(pid)
+        self.phases[pid] = phase._replace(after=after, lag=phase.lag if lag is None else int(lag))
+        try:
+            self._sort()
+        except CycleError:
+            # Restore the previous edges before reporting.
+            for dep in after:
+                self.succ[dep].remove(pid)
+            for dep in phase.after:
+                self.succ[dep].append(pid)
+            self.phases[pid] = phase
+            raise
+        return self._propagate([pid])
+
+    # -- backward pass ------------------------------------------------------
+
+    @property
+    def finish(self):
+        return max(self.end.values()) if self.end else 0
+
+    def slack(self):
+        """Weeks each phase could slip without delaying the final finish."""
+        if self._slack is None:
+            finish = self.finish
+            latest_end = {}
+            for pid in reversed(self.topo):
+                phase = self.phases[pid]
+                limit = finish
+                for nxt in self.succ[pid]:
+                    # nxt must start no later than latest_end[nxt] - duration + 1,
+                    # and starts end[pid] + 1 + lag after this phase.
+                    nxt_phase = self.phases[nxt]
+                    limit = min(limit, latest_end[nxt] - nxt_phase.duration - nxt_phase.lag)
+                latest_end[pid] = limit
+            self._slack = {pid: latest_end[pid] - self.end[pid] for pid in self.topo}
+        return self._slack
+
+    def critical(self):
+        slack = self.slack()
+        return {pid for pid, s in slack.items() if s == 0}
+
+    # -- views --------------------------------------------------------------
+
+    def table(self):
+        """Columns for the Timeline tab's phase table, in declaration order."""
+        return {
+            "Phase": [self.phases[pid].name for pid in self.order],
+            "Start Week": [self.start[pid] for pid in self.order],
+            "End Week": [self.end[pid] for pid in self.order],
+            "Duration": [self.phases[pid].duration for pid in self.order],
+            "Owner": [self.phases[pid].owner for pid in self.order],
+        }
+
+    def gantt(self, height=None):
+        """Figure definition (``gantt`` builder) with the critical path highlighted."""
+        critical = self.critical()
+        return {
+            "type": "gantt",
+            "data": {
+                "tasks": [self.phases[pid].name for pid in self.order],
+                "start": [self.start[pid] for pid in self.order],
+                "duration": [self.phases[pid].duration for pid in self.order],
+                "critical": [pid in critical for pid in self.order],
+                "xaxis_title": "Week",
+                "height": height or max(300, 40 * len(self.order) + 120),
+            },
+        }
+
+
+def milestone_week(scheduler, ref):
+    """Week for a milestone reference like ``full_build.start`` or ``pilot.end``."""
+    pid, _, edge = ref.rpartition(".")
+    if edge not in ("start", "end") or pid not in scheduler.phases:
+        raise ValueError(f"bad milestone reference '{ref}'")
+    return (scheduler.start if edge == "start" else scheduler.end)[pid]
@@ -0,0 +1,275 @@
+"""Full-text search over every section of the deck.
+
+``DeckIndex`` is an in-memory inverted index over the deck's text. Each line
+of a text block, each metric, each table row (plus one entry for the header
+row) and each chart's labels become one entry, tokenized like the regulation
+index (``compdeck.rag.tokenize``). Terms are kept sorted with their postings
+in CSR arrays, so all the terms sharing a prefix are one contiguous slice: a
+query word matches every term it is a prefix of ("refer" finds "referrals")
+with a single ``bincount``. Exact term matches score above prefix-only ones
+(numbers only match exactly), entries are ranked by BM25 weighted by block kind (headings count double),
+and entries matching only some of the query's words are scaled down.
+
+Widgets are not indexed, since their content is computed when they render.
+
+The index is built once per distinct deck content and shared by every
+session. Reloading a deck whose text did not change reuses it.
+
+    python -m compdeck.search "SOC 2" GDPR referrals
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from math import log
+from typing import NamedTuple
+
+import numpy as np
+import streamlit as st
+
+from compdeck.rag import B, K1, tokenize
+from compdeck.spec import TEXT_BLOCKS, load_deck
+
+RESULTS = 8
+SNIPPET_CHARS = 160
+BOOST = {"header": 2.0, "subheader": 2.0, "metric": 1.5}
+EXACT_WEIGHT, PREFIX_WEIGHT = 1.0, 0.6
+CHART_TEXT = ("x", "tasks", "labels", "name", "title", "xaxis_title", "yaxis_title")
+
+MARKUP = re.compile(r"\*\*|`|<br\s*/?>|^\s*(?:#+|[-*]|\d+\.)\s+", re.M)
+# Backslash-escaped before text goes into markdown: "$" would start LaTeX,
+# ":" an emoji or color directive, the rest emphasis, links and lists.
+MARKDOWN_CHARS = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~$:])")
+
+
+class Entry(NamedTuple):
+    section: int  # index into deck.sections
+    kind: str  # block type the text came from
+    text: str  # as displayed, markdown markup stripped
+
+
+class Result(NamedTuple):
+    score: float
+    section: str  # section label, as used by the navigation radio
+    kind: str
+    snippet: str  # markdown (text escaped), matched words in bold
+
+
+# -- Entries --------------------------------------------------------------------
+
+def _plain(text):
+    return " ".join(MARKUP.sub(" ", str(text)).split())
+
+
+def _chart_text(data, found):
+    for key, value in data.items():
+        if key == "series":
+            for series in value:
+                _chart_text(series, found)
+        elif key in CHART_TEXT:
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, str) and _plain(item) not in found:
+                    found.append(_plain(item))
+    return found
+
+
+def _block_entries(deck, section, blocks, entries):
+    for block in blocks:
+        kind = block["type"]
+        if kind in TEXT_BLOCKS:
+            entries.extend(Entry(section, kind, line) for line in map(_plain, block["text"].splitlines()) if line)
+        elif kind == "metric":
+            text = " · ".join(_plain(block[key]) for key in ("label", "value", "delta") if block.get(key))
+            entries.append(Entry(section, kind, text))
+        elif kind == "columns":
+            for column in block["columns"]:
+                _block_entries(deck, section, column, entries)
+        elif kind == "table":
+            columns = block["data"] if "data" in block else deck.tables[block["name"]]
+            entries.append(Entry(section, kind, " · ".join(map(_plain, columns))))
+            for row in zip(*columns.values()):
+                entries.append(Entry(section, kind, " · ".join(_plain(v) for v in row if v not in (None, ""))))
+        elif kind == "chart":
+            labels = _chart_text(deck.chart(block)["data"], [])
+            if labels:
+                entries.append(Entry(section, kind, " · ".join(labels)))
+
+
+def deck_entries(deck):
+    """Every searchable piece of text in ``deck``, in reading order."""
+    entries = []
+    for i, section in enumerate(deck.sections):
+        _block_entries(deck, i, section["blocks"], entries)
+    return entries
+
+
+# -- Index ----------------------------------------------------------------------
+
+class DeckIndex:
+    """Sorted terms with CSR postings of BM25 weights over ``deck_entries``."""
+
+    def __init__(self, deck):
+        self.labels = [section["label"] for section in deck.sections]
+        self.entries = deck_entries(deck)
+        postings = {}
+        lengths = np.ones(max(len(self.entries), 1))
+        for i, entry in enumerate(self.entries):
+            tokens = tokenize(entry.text)
+            lengths[i] = max(len(tokens), 1)
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((i, tf))
+
+        self.terms = sorted(postings)
+        boost = np.array([BOOST.get(entry.kind, 1.0) for entry in self.entries])
+        norm = K1 * (1 - B + B * lengths / lengths.mean())
+        n, docs, weights = len(self.entries), [], []
+        self.indptr = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        for t, term in enumerate(self.terms):
+            ids, tfs = (np.array(column) for column in zip(*postings[term]))
+            idf = log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            docs.append(ids)
+            weights.append(idf * tfs * (K1 + 1) / (tfs + norm[ids]) * boost[ids])
+            self.indptr[t + 1] = self.indptr[t] + len(ids)
+        self.docs = np.concatenate(docs).astype(np.int32) if docs else np.zeros(0, np.int32)
+        self.weights = np.concatenate(weights).astype(np.float32) if weights else np.zeros(0, np.float32)
+
+    def _span(self, term):
+        """Postings range of every term starting with ``term``, and how many of them are ``term`` itself.
+
+        The exact term sorts first, so its postings lead the range. Numbers
+        only match exactly: "2" should not find "20" and "24".
+        """
+        lo = bisect.bisect_left(self.terms, term)
+        exact = lo < len(self.terms) and self.terms[lo] == term
+        hi = lo + exact if term.isdigit() else bisect.bisect_left(self.terms, term + "\uffff", lo)
+        return self.indptr[lo], self.indptr[hi], self.indptr[lo + exact] - self.indptr[lo]
+
+    def search(self, query, k=RESULTS):
+        """The ``k`` best entries for ``query``, each word matched as a prefix."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self.entries:
+            return []
+        docs, weights, distinct = [], [], []
+        for word in words:
+            start, stop, exact = self._span(word)
+            weight = self.weights[start:stop] * PREFIX_WEIGHT
+            weight[:exact] *= EXACT_WEIGHT / PREFIX_WEIGHT
+            docs.append(self.docs[start:stop])
+            weights.append(weight)
+            # an entry can hold several terms with this prefix; count the word once
+            distinct.append(docs[-1] if stop - start == exact else np.unique(docs[-1]))
+        scores = np.bincount(np.concatenate(docs), np.concatenate(weights), len(self.entries))
+        found = np.flatnonzero(scores)
+        scores = scores[found]
+        if len(words) > 1:
+            matched = np.bincount(np.concatenate(distinct), minlength=len(self.entries))[found]
+            scores *= (matched / len(words)) ** 2
+        if len(found) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            found, scores = found[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [self._result(i, score, words) for i, score in zip(found[order], scores[order])]
+
+    def _result(self, i, score, words):
+        entry = self.entries[i]
+        return Result(float(score), self.labels[entry.section], entry.kind, snippet(entry.text, words))
+
+
+@lru_cache(maxsize=256)
+def _highlighter(words):
+    """Regex finding the words in a text that query terms ``words`` match (numbers match whole words only)."""
+    alternatives = (re.escape(word) + (r"(?![A-Za-z0-9$])" if word.isdigit() else r"[A-Za-z0-9$]*")
+                    for word in words)
+    return re.compile(r"(?<![A-Za-z0-9$])(?:" + "|".join(alternatives) + ")", re.I)
+
+
+def escape_markdown(text):
+    """``text`` with every character markdown (or Streamlit) would interpret backslash-escaped."""
+    return MARKDOWN_CHARS.sub(r"\\\1", text)
+
+
+def snippet(text, words, width=SNIPPET_CHARS):
+    """``text`` cut to about ``width`` characters around the first match, as markdown with matches in bold."""
+    spans = [m.span() for m in _highlighter(tuple(words)).finditer(text)]
+    start = 0
+    if spans and len(text) > width:
+        start = max(0, min(spans[0][0] - width // 4, len(text) - width))
+    end = min(len(text), start + width)
+    out, at = ["…" if start else ""], start
+    for lo, hi in spans:
+        if lo >= start and hi <= end:
+            out += [escape_markdown(text[at:lo]), "**", escape_markdown(text[lo:hi]), "**"]
+            at = hi
+    out += [escape_markdown(text[at:end]), "…" if end < len(text) else ""]
+    return "".join(out)
+
+
+# -- Shared index and sidebar ---------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _content_key(path, mtime, _deck):
+    text = json.dumps([_deck.sections, _deck.tables, _deck.figures], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _deck_index(key, _deck):
+    return DeckIndex(_deck)
+
+
+def deck_index(deck):
+    """The shared index for ``deck``, rebuilt only when the deck's content changes."""
+    return _deck_index(_content_key(deck.path, deck.mtime, deck), deck)
+
+
+def _jump(label):
+    st.session_state.section = label
+
+
+def search_box(deck):
+    """Sidebar search; clicking a result switches the section radio to it."""
+    with st.sidebar:
+        query = st.text_input("🔍 Search the deck", key="search", placeholder="GDPR, SOC 2, referrals…")
+        if not query.strip():
+            return
+        index = deck_index(deck)
+        start = time.perf_counter()
+        results = index.search(query)
+        ms = (time.perf_counter() - start) * 1000
+        if not results:
+            st.caption(f"No matches for “{escape_markdown(query)}” ({ms:.2f} ms)")
+            return
+        st.caption(f"Top {len(results)} of {len(index.entries):,} entries in {ms:.2f} ms")
+        for i, result in enumerate(results):
+            st.button(f"→ {result.section}", key=f"search_hit_{i}", on_click=_jump, args=(result.section,),
+                      use_container_width=True)
+            st.caption(result.snippet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("-k", type=int, default=RESULTS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = DeckIndex(load_deck())
+    print(f"indexed {len(index.entries):,} entries, {len(index.terms):,} terms in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    for query in args.queries:
+        start = time.perf_counter()
+        results = index.search(query, args.k)
+        print(f"\n{query!r}: {len(results)} results in {(time.perf_counter() - start) * 1000:.3f} ms")
+        for result in results:
+            print(f"  {result.score:6.2f}  {result.section} [{result.kind}]  {result.snippet}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Loading and validation of the declarative deck spec (``deck.yaml``).
+
+The spec is parsed once per process and shared by every session; it is only
+re-parsed when the file's mtime changes, so content edits show up on the next
+rerun without restarting the server.
+"""
+
+import os
+from typing import NamedTuple
+
+import streamlit as st
+import yaml
+
+from compdeck.figures import BUILDERS
+from compdeck.models import derive, substitute
+from compdeck.store import arrow_payload, shared_frame
+from compdeck.widgets import WIDGETS
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deck.yaml")
+
+TEXT_BLOCKS = {"header", "subheader", "markdown", "info", "success", "warning", "error"}
+BLOCK_TYPES = TEXT_BLOCKS | {"metric", "columns", "table", "chart", "widget"}
+# Block fields that may reference derived values as {{ name }}
+TEMPLATED_FIELDS = ("text", "label", "value", "delta")
+
+
+class DeckSpecError(ValueError):
+    """Raised when the deck spec is malformed."""
+
+
+class Deck(NamedTuple):
+    page: dict
+    sections: list
+    tables: dict  # name -> {column: [values]}, as declared in the spec
+    figures: dict
+    path: str
+    mtime: int
+    models: dict  # parsed numeric models (see compdeck.models)
+    frames: dict  # name -> shared DataFrame, filled on first use by frame()
+    payloads: dict  # name -> Arrow IPC bytes, filled on first use by arrow()
+
+    def frame(self, name):
+        """Read-only DataFrame for table ``name`` from the shared content store.
+
+        pandas is only imported here, when a table section first renders.
+        """
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self.frames[name] = shared_frame(self.tables[name])
+        return frame
+
+    def arrow(self, name):
+        """Pre-encoded Arrow payload for table ``name``, shared like ``frame``."""
+        payload = self.payloads.get(name)
+        if payload is None:
+            payload = self.payloads[name] = arrow_payload(self.tables[name])
+        return payload
+
+    def section(self, section_id):
+        for section in self.sections:
+            if section["id"] == section_id:
+                return section
+        raise KeyError(section_id)
+
+    def table(self, block):
+        """DataFrame for a table block: inline ``data`` or a named table."""
+        if "data" in block:
+            return shared_frame(block["data"])
+        return self.frame(block["name"])
+
+    def chart(self, block):
+        """Figure definition for a chart block: inline ``figure`` or named."""
+        return block.get("figure") or self.figures[block["name"]]
+
+
+def _require(mapping, key, where):
+    if not isinstance(mapping, dict) or key not in mapping:
+        raise DeckSpecError(f"{where}: missing '{key}'")
+    return mapping[key]
+
+
+def _validate_blocks(blocks, where, tables, figures, values):
+    if not isinstance(blocks, list):
+        raise DeckSpecError(f"{where}: blocks must be a list")
+    for i, block in enumerate(blocks):
+        at = f"{where}[{i}]"
+        kind = _require(block, "type", at)
+        if kind not in BLOCK_TYPES:
+            raise DeckSpecError(f"{at}: unknown block type '{kind}'")
+        for field in TEMPLATED_FIELDS:
+            if isinstance(block.get(field), str):
+                try:
+                    block[field] = substitute(block[field], values, at)
+                except ValueError as e:
+                    raise DeckSpecError(str(e)) from e
+        if kind in TEXT_BLOCKS:
+            _require(block, "text", at)
+        elif kind == "metric":
+            for key in ("label", "value"):
+                _require(block, key, at)
+        elif kind == "columns":
+            columns = _require(block, "columns", at)
+            if not isinstance(columns, list) or not columns:
+                raise DeckSpecError(f"{at}: columns must be a non-empty list")
+            for j, column in enumerate(columns):
+                _validate_blocks(column, f"{at}.columns[{j}]", tables, figures, values)
+        elif kind == "table":
+            if "data" in block:
+                _validate_tables({f"{at}.data": block["data"]})
+            elif _require(block, "name", at) not in tables:
+                raise DeckSpecError(f"{at}: unknown table '{block['name']}'")
+        elif kind == "chart":
+            if "figure" in block:
+                if _require(block["figure"], "type", f"{at}.figure") not in BUILDERS:
+                    raise DeckSpecError(f"{at}: unknown figure type '{block['figure']['type']}'")
+            elif _require(block, "name", at) not in figures:
+                raise DeckSpecError(f"{at}: unknown figure '{block['name']}'")
+        elif kind == "widget":
+            if _require(block, "name", at) not in WIDGETS:
+                raise DeckSpecError(f"{at}: unknown widget '{block['name']}'")
+            for j, demo in enumerate(block.get("demos", [])):
+                where = f"{at}.demos[{j}]"
+                _require(demo, "label", where)
+                if _require(demo, "name", where) not in WIDGETS:
+                    raise DeckSpecError(f"{where}: unknown widget '{demo['name']}'")
+
+
+def _validate_tables(raw):
+    for name, columns in raw.items():
+        if not isinstance(columns, dict) or not columns:
+            raise DeckSpecError(f"{name}: expected a mapping of column -> values")
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise DeckSpecError(f"{name}: columns have different lengths")
+
+
+def parse_deck(raw, path="<memory>", mtime=0):
+    """Validate a decoded spec."""
+    page = _require(raw, "page", "deck")
+    for key in ("title", "heading"):
+        _require(page, key, "page")
+
+    try:
+        models, derived_tables, derived_figures, values = derive(raw)
+    except (KeyError, TypeError, ValueError) as e:
+        raise DeckSpecError(f"models: {e}") from e
+
+    figures = dict(raw.get("figures", {}), **derived_figures)
+    for name, figure in figures.items():
+        kind = _require(figure, "type", f"figures.{name}")
+        if kind not in BUILDERS:
+            raise DeckSpecError(f"figures.{name}: unknown figure type '{kind}'")
+        _require(figure, "data", f"figures.{name}")
+
+    tables = dict(raw.get("tables", {}), **derived_tables)
+    _validate_tables({f"tables.{name}": columns for name, columns in tables.items()})
+
+    sections = _require(raw, "sections", "deck")
+    seen = set()
+    for i, section in enumerate(sections):
+        where = f"sections[{i}]"
+        section_id = _require(section, "id", where)
+        _require(section, "label", where)
+        if section_id in seen:
+            raise DeckSpecError(f"{where}: duplicate section id '{section_id}'")
+        seen.add(section_id)
+        _validate_blocks(_require(section, "blocks", where), f"{where}.blocks", tables, figures, values)
+
+    return Deck(page, sections, tables, figures, path, mtime, models, {}, {})
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        try:
+            raw = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise DeckSpecError(f"{path}: {e}") from e
+    return parse_deck(raw, path, mtime)
+
+
+def load_deck(path=DEFAULT_PATH):
+    """Return the shared ``Deck`` for ``path``, re-parsing only if its mtime changed."""
+    return _load(path, os.stat(path).st_mtime_ns)
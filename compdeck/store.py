@@ -0,0 +1,150 @@
+"""Process-wide, read-only store for the deck's tables.
+
+Every session of the app renders the same tables, so each one is built into a
+DataFrame once per process and handed out by reference. Frames are keyed by a
+hash of their content: a deck reload that leaves a table unchanged reuses the
+existing frame, and frames no longer referenced by any loaded ``Deck`` are
+dropped with it.
+
+Shared frames are frozen — their column arrays are read-only, so an accidental
+in-place edit raises instead of leaking into other viewers' sessions — and
+string columns with repeated values (``Priority``, ``Owner``, ...) are stored
+as categoricals and integer columns as int8/int16. Call ``.copy()`` for a
+private, writable frame.
+
+``arrow_payload`` keeps each named table's Arrow IPC encoding next to its
+frame, so rendering it sends pre-encoded bytes instead of converting the
+frame on every rerun.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import weakref
+
+_frames = weakref.WeakValueDictionary()  # content key -> DataFrame
+_payloads = {}  # content key -> Arrow IPC bytes, dropped with the frame
+_lock = threading.Lock()
+
+
+def content_key(columns):
+    """Stable hash of a table's ``{column: [values]}`` content."""
+    payload = json.dumps(list(columns.items()), default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _is_categorical(values):
+    return all(isinstance(v, str) for v in values) and len(set(values)) < len(values)
+
+
+def _frozen_column(values):
+    import numpy as np
+    import pandas as pd
+
+    if _is_categorical(values):
+        codes, categories = pd.factorize(pd.Series(values, dtype=object))
+        codes = codes.astype(np.int8 if len(categories) < 128 else np.int32)
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, categories=categories)
+    series = pd.Series(values)
+    if series.dtype.kind in "iu":
+        # Weeks, days and counts fit in int8/int16; smaller on the wire too.
+        series = pd.to_numeric(series, downcast="integer")
+    array = series.to_numpy(copy=True)
+    array.flags.writeable = False
+    return array
+
+
+def build_frame(columns):
+    """Read-only DataFrame for one table; categoricals for repeated strings."""
+    import pandas as pd
+
+    # copy=False keeps one block per column, so the frozen arrays are the
+    # frame's storage rather than being consolidated into a writable copy.
+    return pd.DataFrame({name: _frozen_column(values) for name, values in columns.items()}, copy=False)
+
+
+def _shared(key, columns):
+    with _lock:
+        frame = _frames.get(key)
+        if frame is None:
+            frame = _frames[key] = build_frame(columns)
+    return frame
+
+
+def shared_frame(columns):
+    """The process-wide frame for ``columns``, built on first request."""
+    return _shared(content_key(columns), columns)
+
+
+def _encode(frame):
+    import pandas as pd
+    from streamlit import type_util
+
+    payload = type_util.data_frame_to_bytes(frame)
+    categorical = [name for name, dtype in frame.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        # An Arrow dictionary adds its own schema and batch, which short
+        # tables never earn back; send whichever encoding is smaller.
+        plain = type_util.data_frame_to_bytes(frame.astype({name: object for name in categorical}))
+        payload = min(payload, plain, key=len)
+    return payload
+
+
+def arrow_payload(columns):
+    """Arrow IPC bytes of the shared frame, as ``st.dataframe`` would send them.
+
+    Encoded once per content and kept only while the frame itself is alive,
+    i.e. while a loaded ``Deck`` holds it; use ``table_payload`` for tables
+    nothing keeps.
+    """
+    key = content_key(columns)
+    frame = _shared(key, columns)
+    with _lock:
+        payload = _payloads.get(key)
+    if payload is None:
+        payload = _encode(frame)
+        with _lock:
+            if key not in _payloads:
+                _payloads[key] = payload
+                weakref.finalize(frame, _payloads.pop, key, None)
+    return payload
+
+
+def table_payload(columns):
+    """Arrow IPC bytes of a one-off table, such as a block's inline ``data``.
+
+    Encoded directly on every call: no deck holds the frame, so a weakly
+    held entry would be collected as soon as it was stored.
+    """
+    return _encode(build_frame(columns))
+
+
+def frame_bytes(frame):
+    """Deep memory footprint of a shared frame.
+
+    ``DataFrame.memory_usage(deep=True)`` cannot inspect read-only object
+    arrays, so string columns are measured element by element here.
+    """
+    total = int(frame.index.memory_usage())
+    for name in frame.columns:
+        column = frame[name]
+        if column.dtype == object:
+            total += column.array.nbytes + sum(sys.getsizeof(v) for v in column.array)
+        else:
+            total += int(column.memory_usage(index=False, deep=True))
+    return total
+
+
+def stats():
+    """Number of live shared frames and their deep memory footprint in bytes."""
+    with _lock:
+        frames = list(_frames.values())
+        payloads = list(_payloads.values())
+    return {
+        "frames": len(frames),
+        "bytes": sum(frame_bytes(frame) for frame in frames),
+        "payloads": len(payloads),
+        "payload_bytes": sum(len(payload) for payload in payloads),
+    }
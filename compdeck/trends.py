@@ -0,0 +1,348 @@
+"""Materialized monthly trend aggregates, maintained incrementally.
+
+Checked contributions are folded into buckets of month x jurisdiction x
+committee: contribution count, amount, limit breaches (rows failing a
+per-contribution limit in ``LIMIT_RULES``) and distinct donors. Each month is its own partition
+of jurisdiction x committee arrays, so a batch -- new filings or records
+arriving months late -- is grouped with one ``bincount`` per month it
+touches and only those months change. Distinct donors are exact: a month
+keeps the sorted 64-bit hashes of the (jurisdiction, committee, donor) and
+(jurisdiction, donor) keys it has seen, and a batch counts only keys not
+already there.
+
+``TrendStore`` persists one ``.npz`` file per month under a directory per
+rules version; ``save`` rewrites just the months patched since the last
+save. Dashboard views read the per-month arrays, never the contributions,
+so a view costs the same whatever the size of the history.
+
+Breaches count only the limits a contribution breaks on its own (single,
+cash and anonymous contributions). The aggregate limit is left out: it
+depends on the donor's total over a rolling window, and a late record can
+push that total over the limit for rows filed before or after it, which a
+store that keeps no contributions cannot recheck. Aggregate-limit breaches
+are reported by the compliance check over a donor's full history instead.
+
+    python -m compdeck.trends --late 5000
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from compdeck.compliance import RULE_BITS, category_codes, check_batch, synthetic_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIMIT_RULES = ("individual_limit", "cash_limit", "anonymous_limit")  # judged per row: exact in any batch
+_LIMIT_MASK = np.uint16(sum(int(RULE_BITS[rule]) for rule in LIMIT_RULES))
+METRICS = ("Contributions", "Amount", "Distinct donors", "Limit breaches")
+COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f")
+STORE_VERSION = 2  # bumped when what the stored aggregates count changes
+# Odd multipliers that spread bucket ids over the 64-bit donor hashes.
+_CELL_MIX = np.uint64(0x9E3779B97F4A7C15)
+_STATE_MIX = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+class TrendSpec(NamedTuple):
+    root: str  # on-disk store (one directory per rules version)
+    rows: int  # synthetic history an empty store is seeded with
+    start: str  # first day of the history (ISO date)
+    days: int
+    late: int  # records per simulated late-filing batch in the demo
+    seed: int
+
+
+def parse_trends(raw):
+    root = str(raw.get("root", ".trends"))
+    spec = TrendSpec(root if os.path.isabs(root) else os.path.join(ROOT, root), int(raw.get("rows", 300_000)),
+                     str(raw.get("start", "2024-01-01")), int(raw.get("days", 730)),
+                     int(raw.get("late", 2_000)), int(raw.get("seed", 0)))
+    if spec.rows < 0 or spec.days < 1 or spec.late < 1:
+        raise ValueError("trends: rows must be non-negative, days and late positive")
+    return spec
+
+
+def _added(seen, keys):
+    """``(merged, new)``: ``seen`` (sorted, unique) with ``keys`` inserted, and which of ``keys`` were new.
+
+    ``new`` marks the first occurrence of each key not already in ``seen``.
+    """
+    unique, first = np.unique(keys, return_index=True)
+    at = np.searchsorted(seen, unique)
+    found = seen[np.minimum(at, len(seen) - 1)] == unique if len(seen) else np.zeros(len(unique), bool)
+    new = np.zeros(len(keys), bool)
+    new[first[~found]] = True
+    return np.insert(seen, at[~found], unique[~found]), new
+
+
+class Month:
+    """One month's jurisdiction x committee buckets and the donor keys seen in them."""
+
+    AGGREGATES = ("count", "amount", "breaches", "donors", "state_donors")
+
+    def __init__(self, states, committees, path=None):
+        self.count = np.zeros((states, committees), np.int64)
+        self.amount = np.zeros((states, committees), np.float64)
+        self.breaches = np.zeros((states, committees), np.int64)
+        self.donors = np.zeros((states, committees), np.int64)
+        self.state_donors = np.zeros(states, np.int64)  # distinct across committees
+        self.path = path  # keys still on disk, read on the first patch
+        self._seen = self._state_seen = np.zeros(0, np.uint64) if path is None else None
+
+    @classmethod
+    def load(cls, path, committees):
+        with np.load(path) as stored:
+            month = cls(*stored["count"].shape, path=path)
+            for name in cls.AGGREGATES:
+                setattr(month, name, stored[name])
+        month.grow(committees)
+        return month
+
+    def keys(self):
+        if self._seen is None:
+            with np.load(self.path) as stored:
+                self._seen, self._state_seen = stored["seen"], stored["state_seen"]
+        return self._seen, self._state_seen
+
+    def grow(self, committees):
+        extra = committees - self.count.shape[1]
+        if extra > 0:
+            for name in ("count", "amount", "breaches", "donors"):
+                setattr(self, name, np.pad(getattr(self, name), ((0, 0), (0, extra))))
+
+    def add(self, state, committee, donor, amount, breach):
+        """Fold one month's rows in; returns how many buckets changed."""
+        shape = self.count.shape
+        cell = state * shape[1] + committee
+        self.count += np.bincount(cell, minlength=self.count.size).reshape(shape)
+        self.amount += np.bincount(cell, weights=amount, minlength=self.count.size).reshape(shape)
+        self.breaches += np.bincount(cell, weights=breach, minlength=self.count.size).astype(np.int64).reshape(shape)
+        seen, state_seen = self.keys()
+        self._seen, new = _added(seen, donor ^ (cell.astype(np.uint64) * _CELL_MIX))
+        self.donors += np.bincount(cell[new], minlength=self.count.size).reshape(shape)
+        self._state_seen, new = _added(state_seen, donor ^ (state.astype(np.uint64) * _STATE_MIX))
+        self.state_donors += np.bincount(state[new], minlength=shape[0])
+        return len(np.unique(cell))
+
+    def copy(self):
+        """A copy whose ``add`` leaves this month unchanged (the donor keys are shared until then)."""
+        month = copy.copy(self)
+        month._seen, month._state_seen = self.keys()
+        for name in self.AGGREGATES:
+            setattr(month, name, getattr(self, name).copy())
+        return month
+
+    def save(self, path):
+        seen, state_seen = self.keys()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, seen=seen, state_seen=state_seen, **{name: getattr(self, name) for name in self.AGGREGATES})
+        os.replace(tmp, path)
+        self.path = path
+
+
+class Patch(NamedTuple):
+    rows: int  # rows folded in (undated or unknown-jurisdiction rows are skipped)
+    buckets: dict  # month ("YYYY-MM") -> jurisdiction x committee buckets changed
+    seconds: float
+
+
+class TrendStore:
+    """Monthly aggregates per jurisdiction and committee, on disk under ``root``."""
+
+    def __init__(self, root, jurisdictions):
+        from compdeck.demo import rules_fingerprint
+
+        self.codes = [j.code for j in jurisdictions]
+        self.root = os.path.join(root, f"{rules_fingerprint(jurisdictions)}-{STORE_VERSION}")
+        os.makedirs(self.root, exist_ok=True)
+        self.committees, self.rows = [], 0
+        meta = os.path.join(self.root, "meta.json")
+        if os.path.exists(meta):
+            with open(meta, encoding="utf-8") as f:
+                stored = json.load(f)
+            self.committees, self.rows = stored["committees"], stored["rows"]
+        self._committee_index = {c: i for i, c in enumerate(self.committees)}
+        self.months = {name[:-4]: Month.load(os.path.join(self.root, name), len(self.committees))
+                       for name in sorted(os.listdir(self.root)) if name.endswith(".npz")}
+        self.dirty = set()
+        self.version = 0  # bumped by every add; keys cached views
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.rows
+
+    def _committees(self, values):
+        import pandas as pd
+
+        codes, uniques = pd.factorize(values)
+        lookup = np.empty(len(uniques) + 1, np.int64)
+        for i, value in enumerate(uniques):
+            key = str(value)
+            if key not in self._committee_index:
+                self._committee_index[key] = len(self.committees)
+                self.committees.append(key)
+            lookup[i] = self._committee_index[key]
+        lookup[-1] = -1
+        return lookup[codes]
+
+    def add(self, batch, rules):
+        """Check ``batch`` (``compliance.BATCH_COLUMNS``) and patch the months it falls in.
+
+        Rows may be dated anywhere in the history; only the buckets of
+        their months change.
+        """
+        import pandas as pd
+
+        start = time.perf_counter()
+        flags = check_batch(batch, rules)["flags"].to_numpy()
+        state = category_codes(batch["jurisdiction"], self.codes)
+        dates = batch["date"].to_numpy(dtype="datetime64[D]")
+        keep = (state < len(self.codes)) & ~np.isnat(dates)
+        with self._lock:
+            committee = self._committees(batch["committee"])
+            keep &= committee >= 0
+            state, committee = state[keep], committee[keep]
+            donor = pd.util.hash_array(np.asarray(batch["donor"])[keep])
+            amount = np.nan_to_num(batch["amount"].to_numpy(dtype=float, na_value=np.nan)[keep])
+            breach = ((flags[keep] & _LIMIT_MASK) != 0).astype(np.float64)
+            month = dates[keep].astype("datetime64[M]")
+
+            order = np.argsort(month, kind="stable")
+            bounds = np.flatnonzero(np.diff(month[order].astype(np.int64))) + 1
+            buckets = {}
+            for rows in np.split(order, bounds) if len(order) else ():
+                name = str(month[rows[0]])
+                target = self.months.get(name)
+                if target is None:
+                    target = self.months[name] = Month(len(self.codes), len(self.committees))
+                target.grow(len(self.committees))
+                buckets[name] = target.add(state[rows], committee[rows], donor[rows], amount[rows], breach[rows])
+            self.months = dict(sorted(self.months.items()))
+            self.dirty.update(buckets)
+            self.rows += len(state)
+            self.version += 1
+        return Patch(len(state), buckets, time.perf_counter() - start)
+
+    def detached(self):
+        """An in-memory copy to patch without touching this store or its files; it cannot be saved."""
+        with self._lock:
+            other = copy.copy(self)
+            other.committees, other._committee_index = list(self.committees), dict(self._committee_index)
+            other.months = {name: month.copy() for name, month in self.months.items()}
+        other.root, other.dirty, other._lock = None, set(), threading.Lock()
+        return other
+
+    def save(self):
+        """Write the months patched since the last save, then the metadata; returns how many months."""
+        if self.root is None:
+            raise ValueError("a detached trend store cannot be saved")
+        with self._lock:
+            for name in sorted(self.dirty):
+                self.months[name].save(os.path.join(self.root, f"{name}.npz"))
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"committees": self.committees, "rows": self.rows}, f)
+            os.replace(tmp, os.path.join(self.root, "meta.json"))
+            written, self.dirty = len(self.dirty), set()
+        return written
+
+    def monthly(self, states=None):
+        """``(months, {metric: array of months x states})`` for ``states`` (default all)."""
+        rows = [self.codes.index(c) for c in (states or self.codes)]
+        months = list(self.months)
+
+        def totals(name):  # months x states, summed over committees
+            stacked = np.array([getattr(self.months[m], name)[rows] for m in months])
+            return stacked.reshape(len(months), len(rows), -1).sum(axis=2)
+
+        return months, {"Contributions": totals("count"), "Amount": totals("amount"),
+                        "Distinct donors": totals("state_donors"), "Limit breaches": totals("breaches")}
+
+    def view(self, states=None, metric=METRICS[0]):
+        """Trend chart data: one line per state of ``metric`` by month."""
+        states = list(states or self.codes)
+        months, metrics = self.monthly(states)
+        values = metrics[metric]
+        return {
+            "x": months,
+            "series": [{"name": code, "y": [round(float(v), 2) for v in values[:, i]],
+                        "color": COLORS[self.codes.index(code) % len(COLORS)]}
+                       for i, code in enumerate(states)],
+            "xaxis_title": "Month",
+            "yaxis_title": metric,
+        }
+
+    def table(self, states=None, last=12):
+        """The latest ``last`` months, totalled over ``states``, for the report table."""
+        months, metrics = self.monthly(states)
+        months, metrics = months[-last:], {k: v[-last:].sum(axis=1) for k, v in metrics.items()}
+        return {
+            "Month": months,
+            "Contributions": [f"{n:,}" for n in metrics["Contributions"].tolist()],
+            "Amount": [f"${a:,.0f}" for a in metrics["Amount"].tolist()],
+            "Distinct donors": [f"{n:,}" for n in metrics["Distinct donors"].tolist()],
+            "Limit breaches": [f"{n:,}" for n in metrics["Limit breaches"].tolist()],
+        }
+
+
+def seed_history(store, rules, rows, start, days, seed=0, chunk=1_000_000):
+    """Fold ``rows`` synthetic contributions into ``store``, ``chunk`` at a time, and save it."""
+    for i, offset in enumerate(range(0, rows, chunk)):
+        n = min(chunk, rows - offset)
+        store.add(synthetic_batch(n, rules.codes, seed=seed + i, donor_offset=offset, start=start, days=days), rules)
+    store.save()
+    return store
+
+
+def late_batch(rules, n, start, days, seed=0, span=30):
+    """``n`` late-arriving contributions from existing donors, all dated in one random ``span``-day stretch."""
+    rng = np.random.default_rng(seed)
+    first = np.datetime64(start, "D") + int(rng.integers(0, max(days - span, 1)))
+    return synthetic_batch(n, rules.codes, seed=seed, start=str(first), days=min(span, days))
+
+
+def main(argv=None):
+    from compdeck.compliance import RuleSet
+    from compdeck.spec import load_deck
+
+    parser = argparse.ArgumentParser(description="Patch late filings into the monthly aggregates and print the report.")
+    parser.add_argument("--late", type=int, default=0, help="synthetic late-arriving records to fold in first")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    deck = load_deck()
+    spec, jurisdictions = deck.models["trends"], deck.models["demo"].jurisdictions
+    rules = RuleSet(jurisdictions)
+    store = TrendStore(spec.root, jurisdictions)
+    if not len(store):
+        start = time.perf_counter()
+        seed_history(store, rules, spec.rows, spec.start, spec.days, seed=spec.seed)
+        print(f"seeded {len(store):,} contributions in {time.perf_counter() - start:.1f} s")
+    if args.late:
+        seed = spec.seed + store.rows if args.seed is None else args.seed
+        patch = store.add(late_batch(rules, args.late, spec.start, spec.days, seed=seed), rules)
+        print(f"patched {sum(patch.buckets.values())} buckets in {', '.join(patch.buckets)} "
+              f"with {patch.rows:,} late records in {patch.seconds * 1000:.0f} ms; "
+              f"{store.save()} month file(s) rewritten")
+    start = time.perf_counter()
+    table = store.table()
+    elapsed = (time.perf_counter() - start) * 1000
+    width = {k: max(len(k), *(len(v) for v in values)) for k, values in table.items()}
+    print("  ".join(k.rjust(width[k]) for k in table))
+    for row in zip(*table.values()):
+        print("  ".join(v.rjust(width[k]) for k, v in zip(table, row)))
+    print(f"{len(store):,} contributions in {len(store.months)} months x {len(store.codes)} jurisdictions x "
+          f"{len(store.committees)} committees; report built in {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,983 @@
+"""Interactive blocks (``{type: widget, name: ...}``) for the live app.
+
+Each widget has a Streamlit ``render(deck, block)`` and a ``static(deck, block)``
+that returns plain spec blocks, which the HTML/PDF exporters render instead.
+"""
+
+from typing import Callable, NamedTuple
+
+import streamlit as st
+
+from compdeck.artifacts import shared
+from compdeck.figures import show_figure
+
+
+class Widget(NamedTuple):
+    render: Callable
+    static: Callable
+
+
+WIDGETS = {}
+
+
+def widget(name, static):
+    def register(render):
+        WIDGETS[name] = Widget(render, static)
+        return render
+    return register
+
+
+# -- Budget risk --------------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _budget_totals(model, n, spread, seed):
+    from compdeck.budget import simulate
+
+    totals = shared("budget.simulate", (model, n, spread, seed), lambda: simulate(model, n, spread, seed))
+    totals.flags.writeable = False  # shared by every session
+    return totals
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def budget_risk(model, n=100_000, spread=1.0, seed=0):
+    """Risk summary for one set of inputs; recomputed only when they change."""
+    from compdeck.budget import risk_summary
+
+    # The buffer does not affect the draws, so scenarios are shared across it.
+    totals = _budget_totals(model._replace(buffer_pct=0.0), n, spread, seed)
+    return risk_summary(model, totals)
+
+
+def _risk_figure(risk):
+    return {
+        "type": "distribution",
+        "data": {
+            "x": [round(x) for x in risk["hist_centers"]],
+            "y": risk["hist_counts"],
+            "markers": [
+                {"x": risk["p50"], "label": "P50", "color": "#1f77b4"},
+                {"x": risk["p90"], "label": "P90", "color": "#ff7f0e"},
+                {"x": risk["budget"], "label": "Budget incl. buffer", "color": "#d62728"},
+            ],
+            "xaxis_title": "Simulated total spend ($)",
+            "yaxis_title": "Scenarios",
+            "height": 320,
+        },
+    }
+
+
+def _risk_blocks(risk, n):
+    from compdeck.budget import money
+
+    return [
+        {"type": "subheader", "text": "🎲 Budget Risk (Monte Carlo)"},
+        {"type": "columns", "columns": [
+            [{"type": "metric", "label": "P50 spend", "value": money(risk["p50"])}],
+            [{"type": "metric", "label": "P90 spend", "value": money(risk["p90"])}],
+            [{"type": "metric", "label": "P(exceeds buffer)", "value": f"{risk['p_over_budget']:.1%}"}],
+        ]},
+        {"type": "chart", "figure": _risk_figure(risk)},
+        {"type": "markdown", "text": f"*{n:,} simulated scenarios; "
+                                     f"{risk['p_over_plan']:.0%} exceed the plan before buffer.*"},
+    ]
+
+
+def _budget_risk_static(deck, block):
+    model = deck.models["budget"]
+    return _risk_blocks(budget_risk(model), 100_000)
+
+
+@widget("budget_risk", static=_budget_risk_static)
+def _budget_risk(deck, block):
+    from compdeck.render import render_blocks
+
+    model = deck.models["budget"]
+    col1, col2, col3 = st.columns(3)
+    n = col1.select_slider("Scenarios", [10_000, 50_000, 100_000, 250_000, 500_000], value=100_000)
+    spread = col2.slider("Uncertainty ×", 0.0, 2.0, 1.0, 0.1,
+                         help="Scales every category's cost range around the plan")
+    buffer_pct = col3.slider("Buffer %", 0, 50, int(model.buffer_pct), 5)
+
+    risk = budget_risk(model._replace(buffer_pct=float(buffer_pct)), n, spread)
+    render_blocks(deck, _risk_blocks(risk, n))
+
+
+# -- ROI sensitivity ----------------------------------------------------------
+
+ROI_AXIS_LABELS = {
+    "price": "Annual price ($)",
+    "customers": "Customers",
+    "ramp_months": "Ramp (months)",
+    "monthly_burn": "Monthly burn ($)",
+}
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def roi_sweep(model):
+    """Break-even cube over the model's full sweep grid, computed once per model."""
+    from compdeck.roi import grid_axes, sweep
+
+    axes = grid_axes(model)
+    cube = shared("roi.sweep", model, lambda: sweep(model, *axes))
+    cube.flags.writeable = False  # shared by every session
+    return axes, cube
+
+
+def _month_text(month, horizon):
+    return f"M{month:.0f}" if month == month else f">{horizon}"
+
+
+def _roi_blocks(model, index):
+    """Tornado + price x customers heatmap at one grid position (pure lookups)."""
+    from compdeck.roi import SWEEP_AXES, tornado
+
+    axes, cube = roi_sweep(model)
+    horizon = model.horizon_months
+    never = horizon + 1
+    base = cube[index]
+    base = float(base) if base == base else never
+
+    rows = tornado(cube, axes, index)
+
+    def fill(month):
+        return month if month == month else never
+
+    tornado_figure = {
+        "type": "tornado",
+        "data": {
+            "labels": [f"{ROI_AXIS_LABELS[a]} {lo:,.0f} → {hi:,.0f}" for a, lo, _, hi, _ in rows],
+            "low": [fill(m) for _, _, m, _, _ in rows],
+            "high": [fill(m) for _, _, _, _, m in rows],
+            "low_text": [_month_text(m, horizon) for _, _, m, _, _ in rows],
+            "high_text": [_month_text(m, horizon) for _, _, _, _, m in rows],
+            "base": base,
+            "xaxis_title": "Break-even month",
+        },
+    }
+
+    price, customers = SWEEP_AXES.index("price"), SWEEP_AXES.index("customers")
+    plane = cube[(slice(None), slice(None)) + index[2:]]  # (price, customers)
+    heatmap_figure = {
+        "type": "heatmap",
+        "data": {
+            "x": [f"{v:g}" for v in axes[customers]],
+            "y": [f"${v / 1000:,.0f}k" for v in axes[price]],
+            "z": [[None if m != m else float(m) for m in row] for row in plane.tolist()],
+            "xaxis_title": "Customers",
+            "yaxis_title": "Annual price",
+            "colorbar_title": "Break-even month",
+        },
+    }
+
+    return [
+        {"type": "subheader", "text": "📈 Break-even Sensitivity"},
+        {"type": "columns", "columns": [
+            [{"type": "chart", "figure": tornado_figure}],
+            [{"type": "chart", "figure": heatmap_figure}],
+        ]},
+        {"type": "markdown", "text": f"*{cube.size:,} price × customers × ramp × burn combinations; "
+                                     f"blank cells do not break even within {horizon} months.*"},
+    ]
+
+
+def _roi_static(deck, block):
+    from compdeck.roi import nearest_index
+
+    model = deck.models["roi"]
+    axes, _ = roi_sweep(model)
+    return _roi_blocks(model, nearest_index(axes, model))
+
+
+@widget("roi_sensitivity", static=_roi_static)
+def _roi_sensitivity(deck, block):
+    from compdeck.render import render_blocks
+    from compdeck.roi import SWEEP_AXES, nearest_index
+
+    model = deck.models["roi"]
+    axes, _ = roi_sweep(model)
+    start = nearest_index(axes, model)
+    index = []
+    for col, axis, values, i in zip(st.columns(len(SWEEP_AXES)), SWEEP_AXES, axes, start):
+        # Slide over grid positions so every choice is a lookup into the cube.
+        options = [f"{v:,.0f}" for v in values]
+        picked = col.select_slider(ROI_AXIS_LABELS[axis], options, value=options[i], key=f"roi_{axis}")
+        index.append(options.index(picked))
+    render_blocks(deck, _roi_blocks(model, tuple(index)))
+
+
+# -- Schedule what-if ---------------------------------------------------------
+
+def _schedule_static(deck, block):
+    return []  # the deck's Gantt chart and tables already show the base plan
+
+
+@widget("schedule_whatif", static=_schedule_static)
+def _schedule_whatif(deck, block):
+    from compdeck.render import render_blocks
+    from compdeck.schedule import CycleError
+
+    base = deck.models["schedule"]
+    key = ("schedule_whatif", deck.path, deck.mtime)
+    if st.session_state.get("schedule_whatif_key") != key:
+        st.session_state.schedule_whatif_key = key
+        st.session_state.schedule_whatif = base
+    # Sessions share the deck's scheduler until their first edit.
+    schedule = st.session_state.schedule_whatif
+
+    st.subheader("🔀 What-if: Reschedule a Phase")
+    # Widgets take display names (not ids + format_func) so options stay plain strings.
+    names = [schedule.phases[pid].name for pid in schedule.order]
+    ids = dict(zip(names, schedule.order))
+    col1, col2, col3, col4 = st.columns([2, 1, 3, 1])
+    pid = ids[col1.selectbox("Phase", names, key="whatif_phase")]
+    phase = schedule.phases[pid]
+    duration = col2.number_input("Duration (weeks)", 1, 520, phase.duration, key=f"whatif_duration_{pid}")
+    picked = col3.multiselect(
+        "Starts after", [name for name in names if ids[name] != pid],
+        default=[schedule.phases[dep].name for dep in phase.after], key=f"whatif_after_{pid}",
+    )
+    after = tuple(ids[name] for name in picked)
+    lag = col4.number_input("Lag (weeks)", -52, 52, phase.lag, key=f"whatif_lag_{pid}")
+
+    moved = []
+    edited_deps = set(after) != set(phase.after) or lag != phase.lag
+    if (edited_deps or duration != phase.duration) and schedule is base:
+        schedule = st.session_state.schedule_whatif = base.copy()
+    try:
+        if edited_deps:
+            moved += schedule.set_dependencies(pid, after, lag)
+        if duration != phase.duration:
+            moved += schedule.set_duration(pid, duration)
+    except CycleError:
+        st.error("That dependency would create a cycle; change not applied.")
+
+    shift = schedule.finish - base.finish
+    st.caption(
+        f"Finish: week {schedule.finish} ({shift:+d} vs plan). "
+        + (f"Recomputed only: {', '.join(schedule.phases[m].name for m in dict.fromkeys(moved))}."
+           if moved else "")
+    )
+    render_blocks(deck, [{"type": "chart", "figure": schedule.gantt()}])
+    st.button("Reset to plan", key="whatif_reset", on_click=_reset_whatif, args=(base,))
+
+
+def _reset_whatif(base):
+    st.session_state.schedule_whatif = base
+    for key in [k for k in st.session_state if k.startswith("whatif_") and k != "whatif_reset"]:
+        del st.session_state[key]
+
+
+# -- Demo pipeline ------------------------------------------------------------
+
+STATUS_ICONS = {"pass": "✅ pass", "review": "🟡 review", "fail": "❌ fail"}
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def demo_results(spec):
+    """Every demo input and its stored result, loaded once per process.
+
+    Inputs missing from the on-disk store (the batch job was not run, or the
+    rules changed) are processed here once and stored.
+    """
+    from compdeck.demo import ResultStore, demo_samples
+
+    samples = demo_samples(spec)
+    store = ResultStore(spec.jurisdictions)
+    computed = store.precompute([s.data for s in samples], workers=0)
+    return samples, {s.id: store.get(s.data) for s in samples}, computed
+
+
+def _field_value(field, value):
+    from compdeck.demo import money
+
+    if value is None:
+        return "—"
+    return money(value) if field == "amount" else str(value)
+
+
+def _demo_summary_blocks(samples, results):
+    from compdeck.demo import REQUIRED, money
+
+    rows = [(s, results[s.id]) for s in samples]
+    return [
+        {"type": "table", "data": {
+            "Input": [s.id for s, _ in rows],
+            "Case": [s.title for s, _ in rows],
+            "Amount": [money(r["fields"]["amount"]) if r["fields"]["amount"] is not None else "—"
+                       for _, r in rows],
+            "Min confidence": [f"{min(r['confidence'][f] for f in REQUIRED):.2f}" for _, r in rows],
+            "Result": [STATUS_ICONS[r["status"]] for _, r in rows],
+            "Expected": [STATUS_ICONS.get(s.expected, "") for s, _ in rows],
+        }},
+    ]
+
+
+def _demo_detail_blocks(result):
+    from compdeck.demo import FIELDS
+
+    fields, confidence = result["fields"], result["confidence"]
+    filing = fields["jurisdiction"]
+    return [
+        {"type": "markdown", "text": result["report"]},
+        {"type": "table", "data": {
+            "Field": [label for _, label in FIELDS],
+            "Extracted": [_field_value(field, fields[field]) for field, _ in FIELDS],
+            "Confidence": [f"{confidence[field]:.2f}" for field, _ in FIELDS],
+        }},
+        {"type": "table", "data": {
+            "Check": [name for name, _, _ in result["validation"]],
+            "Result": [STATUS_ICONS[status] for _, status, _ in result["validation"]],
+            "Detail": [detail for _, _, detail in result["validation"]],
+        }},
+        {"type": "table", "data": {
+            "Jurisdiction": [f"{code} (filing)" if code == filing else code for code in result["verdicts"]],
+            "Verdict": [STATUS_ICONS[status] for status, _ in result["verdicts"].values()],
+            "Reasons": ["; ".join(reasons) for _, reasons in result["verdicts"].values()],
+        }},
+    ]
+
+
+def _demo_static(deck, block):
+    samples, results, _ = demo_results(deck.models["demo"])
+    return [
+        {"type": "subheader", "text": "▶️ Live Processing Demo: Precomputed Results"},
+        *_demo_summary_blocks(samples, results),
+    ]
+
+
+@widget("demo_pipeline", static=_demo_static)
+def _demo_pipeline(deck, block):
+    from compdeck.demo import ResultStore
+    from compdeck.render import render_blocks
+
+    spec = deck.models["demo"]
+    samples, results, computed = demo_results(spec)
+
+    st.subheader("▶️ Live Processing Demo")
+    labels = [f"{s.id} · {s.title}" for s in samples]
+    col1, col2 = st.columns([3, 2])
+    picked = col1.selectbox("Contribution", labels, key="demo_input")
+    uploaded = col2.file_uploader("Or process a new scan (.txt)", type=["txt"], key="demo_upload")
+    if uploaded is not None:
+        data = uploaded.getvalue()
+        store = ResultStore(spec.jurisdictions)
+        result = store.get(data)
+        if result is None:
+            result = store.result(data)
+            pipeline_latency(spec).add(result["total_ns"], result["timings_ns"])
+            if "audit" in deck.models:
+                from compdeck.demo import audit_entries
+
+                audit_log(deck.models["audit"]).append(audit_entries(result), clamp=True)
+    else:
+        sample = samples[labels.index(picked)]
+        data, result = sample.data, results[sample.id]
+
+    left, right = st.columns([2, 3])
+    left.code(data.decode("utf-8", "replace"), language=None)
+    with right:
+        render_blocks(deck, _demo_detail_blocks(result))
+    with st.expander(f"All {len(samples)} demo inputs"):
+        render_blocks(deck, _demo_summary_blocks(samples, results))
+    st.caption(f"{len(samples)} inputs served from the precomputed result store"
+               + (f"; {computed} were not precomputed and ran on first view." if computed else "."))
+
+
+# -- Pipeline latency ---------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def pipeline_latency(spec):
+    """Stage latency histograms of this process's pipeline runs.
+
+    Seeded from the timings stored with every demo result (per stage only
+    on the sampled runs); scans processed live (uploads) are added as they
+    run.
+    """
+    from compdeck.demo import STAGES
+    from compdeck.latency import LatencyRecorder
+
+    recorder = LatencyRecorder(STAGES)
+    _, results, _ = demo_results(spec)
+    for result in results.values():
+        recorder.add(result["total_ns"], result["timings_ns"])
+    return recorder
+
+
+def _latency_blocks(deck, view):
+    from compdeck.latency import format_ns
+
+    target = deck.models["latency"]
+    recorder = pipeline_latency(deck.models["demo"])
+    total = recorder.total.percentiles()
+    manual_ns = target.manual_minutes * 60e9
+    if view == "metric":
+        return [{"type": "metric", "label": "Processing Time (p95)", "value": format_ns(total["p95"]),
+                 "delta": f"{manual_ns / max(total['p95'], 1):,.0f}× faster than manual"}]
+    if view == "chart":
+        return [{"type": "chart", "figure": {"type": "bar", "data": {
+            "x": ["Manual Process", "AI Platform (p50)", "AI Platform (p99)"],
+            "y": [manual_ns / 1e9, total["p50"] / 1e9, total["p99"] / 1e9],
+            "text": [f"{target.manual_minutes:g} minutes", format_ns(total["p50"]), format_ns(total["p99"])],
+            "colors": ["#ff6b6b", "#4ecdc4", "#45b7aa"],
+            "yaxis_title": "Time per Contribution (Seconds, log scale)",
+            "yaxis_type": "log",
+            "height": 400,
+        }}}]
+    if view != "criteria":
+        raise ValueError(f"pipeline_latency: unknown view '{view}'")
+    # The pilot success criteria, with processing speed measured
+    criteria = dict(deck.tables["metrics"])
+    measured = ["—"] * len(criteria["Metric"])
+    measured[criteria["Metric"].index("Processing Speed")] = (
+        f"p50 {format_ns(total['p50'])} · p95 {format_ns(total['p95'])} · p99 {format_ns(total['p99'])}"
+        + (" ✅" if total["p99"] < target.target_seconds * 1e9 else " ❌")
+    )
+    criteria["Measured"] = measured
+    return [
+        {"type": "table", "data": criteria},
+        {"type": "markdown", "text": f"**Processing time by stage** ({recorder.total.count:,} pipeline runs)"},
+        {"type": "table", "data": recorder.table()},
+    ]
+
+
+@widget("pipeline_latency", static=lambda deck, block: _latency_blocks(deck, block.get("view", "metric")))
+def _pipeline_latency(deck, block):
+    from compdeck.render import render_blocks
+
+    render_blocks(deck, _latency_blocks(deck, block.get("view", "metric")))
+
+
+# -- Regulation Q&A -----------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def regulation_index(spec):
+    """The on-disk regulation index, brought up to date once per process."""
+    from compdeck.rag import RegulationIndex
+
+    index = RegulationIndex(spec.index)
+    index.update(spec.docs)
+    return index
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def regulation_answers(spec, questions):
+    return [[hit._asdict() for hit in hits] for hits in regulation_index(spec).search(list(questions), spec.k)]
+
+
+def _answer_blocks(question, hits):
+    if not hits:
+        return [{"type": "info", "text": f"No passage in the regulation library matches “{question}”."}]
+    return [
+        {"type": "markdown", "text": f"**{hit['doc']}** · {hit['heading']}  \n> {hit['text']}"}
+        for hit in hits
+    ]
+
+
+def _regulation_static(deck, block):
+    spec = deck.models["rag"]
+    blocks = [{"type": "subheader", "text": "📚 Compliance Q&A: Example Questions"}]
+    for question, hits in zip(spec.examples, regulation_answers(spec, spec.examples)):
+        blocks.append({"type": "markdown", "text": f"**Q: {question}**"})
+        blocks += _answer_blocks(question, hits[:1])
+    return blocks
+
+
+@widget("regulation_qa", static=_regulation_static)
+def _regulation_qa(deck, block):
+    from compdeck.render import render_blocks
+
+    spec = deck.models["rag"]
+    st.subheader("📚 Compliance Q&A")
+    options = list(spec.examples)
+    picked = st.selectbox("Example question", options, key="rag_example") if options else ""
+    question = st.text_input("Ask about the regulations", value="", key="rag_question",
+                             placeholder=picked).strip() or picked
+    if not question:
+        return
+    hits = regulation_answers(spec, (question,))[0]
+    render_blocks(deck, _answer_blocks(question, hits))
+    if hits:
+        st.caption(f"Top {len(hits)} passages from the local regulation index "
+                   f"({'BM25 keyword match' if hits[0]['via'] == 'bm25' else 'vector similarity'}); "
+                   "illustrative summaries, not legal guidance.")
+
+
+# -- Anomaly monitor ----------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def anomaly_feed(feed):
+    """The demo feed as columns, plus the index where each day starts."""
+    import numpy as np
+
+    from compdeck.anomaly import synthetic_feed
+
+    chunks = list(synthetic_feed(feed.events, feed.donors, feed.committees, feed.days,
+                                 seed=feed.seed, anomalies=feed.anomalies))
+    columns = tuple(np.concatenate(parts) for parts in zip(*chunks))
+    return columns, np.searchsorted(columns[3], np.arange(feed.days + 1))
+
+
+def _replay(detector, feed, start, end):
+    """Feed days ``[start, end)`` of the demo feed into ``detector``; return its alerts."""
+    (donor, committee, amount, day), bounds = anomaly_feed(feed)
+    lo, hi = bounds[start], bounds[end]
+    return detector.update(donor[lo:hi], committee[lo:hi], amount[lo:hi], day[lo:hi])
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _replayed(spec):
+    from compdeck.anomaly import AnomalyDetector
+
+    detector = AnomalyDetector(spec.detector)
+    alerts = _replay(detector, spec.feed, 0, spec.feed.days)
+    return detector, alerts
+
+
+def _anomaly_blocks(detector, alerts, through):
+    from compdeck.anomaly import REASONS
+
+    days = sorted(detector.daily)
+    daily = [detector.daily[d] for d in days]
+    recent = sorted(alerts, key=lambda a: (-a.day, -a.score))[:10]
+    return [
+        {"type": "columns", "columns": [
+            [{"type": "metric", "label": "Contributions processed", "value": f"{detector.events:,}"}],
+            [{"type": "metric", "label": "Alerts", "value": f"{detector.alerts:,}"}],
+            [{"type": "metric", "label": "Donors tracked", "value": f"{len(detector.donors):,}"}],
+            [{"type": "metric", "label": "Detector state", "value": f"{detector.nbytes() / 1024:,.0f} KiB"}],
+        ]},
+        {"type": "chart", "figure": {"type": "trend", "data": {
+            "x": [d + 1 for d in days],
+            "series": [
+                {"name": "Contributions ($)", "y": [round(row[1]) for row in daily], "color": "#1f77b4"},
+                {"name": "Alerts", "y": [row[2] for row in daily], "color": "#d62728", "axis": "y2"},
+            ],
+            "xaxis_title": "Day", "yaxis_title": "Amount ($)", "yaxis2_title": "Alerts", "height": 320,
+        }}},
+        {"type": "markdown", "text": f"**Latest alerts (through day {through})**"},
+        {"type": "table", "data": {
+            "Day": [a.day + 1 for a in recent],
+            "Donor": [f"D{a.donor:05d}" for a in recent],
+            "Committee": [f"C{a.committee:03d}" for a in recent],
+            "Amount": [f"${a.amount:,.0f}" for a in recent],
+            "Why": ["; ".join(REASONS[r] for r in a.reasons) for a in recent],
+        }},
+        {"type": "markdown", "text": "**Most active donors**"},
+        {"type": "table", "data": _risk_rows(detector)},
+    ]
+
+
+def _risk_rows(detector):
+    rows = detector.risk_table(limit=10)
+    rows["Donor"] = [f"D{int(d):05d}" for d in rows["Donor"]]
+    return rows
+
+
+def _anomaly_static(deck, block):
+    spec = deck.models["anomaly"]
+    detector, alerts = _replayed(spec)
+    return [
+        {"type": "subheader", "text": "🚨 Anomaly Detection: Streaming Feed Replay"},
+        *_anomaly_blocks(detector, alerts, spec.feed.days),
+    ]
+
+
+@widget("anomaly_monitor", static=_anomaly_static)
+def _anomaly_monitor(deck, block):
+    from compdeck.anomaly import AnomalyDetector
+    from compdeck.render import render_blocks
+
+    spec = deck.models["anomaly"]
+    st.subheader("🚨 Anomaly Detection: Streaming Feed Replay")
+    options = [f"Day {d}" for d in range(1, spec.feed.days + 1)]
+    through = options.index(st.select_slider("Replay the feed through", options, value=options[29],
+                                             key="anomaly_day")) + 1
+
+    # Each session keeps its own detector and only feeds it the days it has
+    # not seen; stepping back starts a fresh one.
+    key = ("anomaly_monitor", deck.path, deck.mtime)
+    state = st.session_state.get("anomaly_state")
+    if state is None or state["key"] != key or state["through"] > through:
+        state = st.session_state.anomaly_state = {
+            "key": key, "detector": AnomalyDetector(spec.detector), "through": 0, "alerts": [],
+        }
+    if through > state["through"]:
+        state["alerts"] += _replay(state["detector"], spec.feed, state["through"], through)
+        state["through"] = through
+    render_blocks(deck, _anomaly_blocks(state["detector"], state["alerts"], through))
+    st.caption(f"Synthetic feed of {spec.feed.events:,} contributions over {spec.feed.days} days; "
+               "each step processes only the new days' events.")
+
+
+# -- Risk heatmap -------------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def risk_cube(spec, jurisdictions):
+    """The binned state x day x risk cube behind the heatmap, built once per process."""
+    from compdeck.compliance import RuleSet
+    from compdeck.riskmap import synthetic_cube
+
+    return shared("riskmap.cube", (spec, jurisdictions),
+                  lambda: synthetic_cube(RuleSet(jurisdictions), spec.rows, spec.start, spec.days, seed=spec.seed))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def risk_view(spec, jurisdictions, first, last, granularity, states, metric):
+    """Heatmap matrix for one zoom/filter level (cached per level)."""
+    return risk_cube(spec, jurisdictions).view(first, last, granularity, list(states), metric)
+
+
+def _riskmap_blocks(spec, jurisdictions, first, last, granularity, states, metric):
+    cube = risk_cube(spec, jurisdictions)
+    data = risk_view(spec, jurisdictions, first, last, granularity, states, metric)
+    return [
+        {"type": "chart", "figure": {"type": "heatmap", "data": data}},
+        {"type": "markdown", "text": "**Multi-state compliance dashboard**"},
+        {"type": "table", "data": cube.dashboard()},
+    ], f"{len(data['y'])}×{len(data['x'])} bins from {cube.rows:,} contributions"
+
+
+def _riskmap_static(deck, block):
+    spec, jurisdictions = deck.models["riskmap"], deck.models["demo"].jurisdictions
+    codes = tuple(j.code for j in jurisdictions)
+    blocks, _ = _riskmap_blocks(spec, jurisdictions, 0, spec.days - 1, "auto", codes, "High-risk share")
+    return [{"type": "subheader", "text": "🗺️ Risk Scoring Heatmap"}, *blocks]
+
+
+@widget("risk_heatmap", static=_riskmap_static)
+def _risk_heatmap(deck, block):
+    import numpy as np
+
+    from compdeck.render import render_blocks
+    from compdeck.riskmap import GRANULARITIES, METRICS
+
+    spec, jurisdictions = deck.models["riskmap"], deck.models["demo"].jurisdictions
+    codes = [j.code for j in jurisdictions]
+    start = np.datetime64(spec.start, "D")
+    days = start + np.arange(spec.days)
+    labels = [str(d) for d in days]
+
+    st.subheader("🗺️ Risk Scoring Heatmap")
+    first, last = st.select_slider("Date range", labels, value=(labels[0], labels[-1]), key="riskmap_range")
+    col1, col2, col3 = st.columns([2, 1, 2])
+    states = col1.multiselect("States", codes, default=codes, key="riskmap_states") or codes
+    granularity = col2.selectbox("Granularity", GRANULARITIES, key="riskmap_granularity")
+    metric = col3.selectbox("Color by", METRICS, key="riskmap_metric")
+    blocks, caption = _riskmap_blocks(spec, jurisdictions, labels.index(first), labels.index(last),
+                                      granularity, tuple(states), metric)
+    render_blocks(deck, blocks)
+    st.caption(f"{caption}, aggregated on the server; each zoom and filter level is binned once and cached.")
+
+
+# -- Monthly trends -----------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def trend_store(spec, jurisdictions):
+    """The materialized monthly aggregates, opened once per process (seeded when empty)."""
+    from compdeck.compliance import RuleSet
+    from compdeck.trends import TrendStore, seed_history
+
+    store = TrendStore(spec.root, jurisdictions)
+    if not len(store) and spec.rows:
+        seed_history(store, RuleSet(jurisdictions), spec.rows, spec.start, spec.days, seed=spec.seed)
+    return store
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def trend_view(spec, jurisdictions, states, metric, version):
+    """Chart and table for one filter; ``version`` (bumped by each patch) invalidates it."""
+    store = trend_store(spec, jurisdictions)
+    return store.view(list(states), metric), store.table(list(states))
+
+
+def _trend_blocks(spec, jurisdictions, states, metric, store=None):
+    if store is None:
+        store = trend_store(spec, jurisdictions)
+        data, table = trend_view(spec, jurisdictions, tuple(states), metric, store.version)
+    else:  # this session's copy, patched with its own late filings
+        data, table = store.view(list(states), metric), store.table(list(states))
+    return [
+        {"type": "chart", "figure": {"type": "trend", "data": data}},
+        {"type": "markdown", "text": "**Monthly report (latest 12 months)**"},
+        {"type": "table", "data": table},
+    ], (f"{len(store):,} contributions materialized as {len(store.months)} months × {len(store.codes)} "
+        f"jurisdictions × {len(store.committees)} committees")
+
+
+def _trends_static(deck, block):
+    spec, jurisdictions = deck.models["trends"], deck.models["demo"].jurisdictions
+    blocks, caption = _trend_blocks(spec, jurisdictions, [j.code for j in jurisdictions], "Contributions")
+    return [{"type": "subheader", "text": "📈 Monthly Trend Analysis"}, *blocks,
+            {"type": "markdown", "text": f"*{caption}.*"}]
+
+
+def _session_trends(spec, jurisdictions):
+    state = st.session_state.get("trends_state")
+    if state is not None and state["key"] == (spec, jurisdictions):
+        return state
+    return None
+
+
+def _receive_late_filings(spec, jurisdictions):
+    from compdeck.compliance import RuleSet
+    from compdeck.trends import late_batch
+
+    # Late filings patch a copy kept in this session; the shared store and
+    # its files stay as every other viewer sees them.
+    state = _session_trends(spec, jurisdictions)
+    if state is None:
+        state = st.session_state.trends_state = {
+            "key": (spec, jurisdictions), "store": trend_store(spec, jurisdictions).detached(), "patch": None,
+        }
+    store, rules = state["store"], RuleSet(jurisdictions)
+    state["patch"] = store.add(late_batch(rules, spec.late, spec.start, spec.days, seed=spec.seed + store.rows), rules)
+
+
+@widget("monthly_trends", static=_trends_static)
+def _monthly_trends(deck, block):
+    from compdeck.render import render_blocks
+    from compdeck.trends import METRICS
+
+    spec, jurisdictions = deck.models["trends"], deck.models["demo"].jurisdictions
+    codes = [j.code for j in jurisdictions]
+    st.subheader("📈 Monthly Trend Analysis")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    states = col1.multiselect("States", codes, default=codes, key="trends_states") or codes
+    metric = col2.selectbox("Metric", METRICS, key="trends_metric")
+    col3.button(f"Receive {spec.late:,} late filings", key="trends_late", on_click=_receive_late_filings,
+                args=(spec, jurisdictions))
+    state = _session_trends(spec, jurisdictions)
+    blocks, caption = _trend_blocks(spec, jurisdictions, states, metric, state and state["store"])
+    render_blocks(deck, blocks)
+    if state:
+        patch = state["patch"]
+        caption += (f". Last late batch (this session only): {patch.rows:,} records patched "
+                    f"{sum(patch.buckets.values())} buckets in {', '.join(patch.buckets)} in "
+                    f"{patch.seconds * 1000:.0f} ms; no other month was regrouped")
+    st.caption(f"{caption}.")
+
+
+# -- Audit trail --------------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def audit_log(spec):
+    """The on-disk audit log, opened once per process (seeded when empty)."""
+    from compdeck.audit import AuditLog, synthetic_history
+
+    log = AuditLog(spec.root)
+    if not len(log) and spec.history:
+        log.append(synthetic_history(spec.history, seed=spec.seed), if_empty=True)  # once across workers
+    return log
+
+
+def _audit_table(entries):
+    return {
+        "Seq": [f"{e['seq']:,}" for e in entries],
+        "Time": [e["ts"].strftime("%Y-%m-%d %H:%M:%S") for e in entries],
+        "User": [e["user"] for e in entries],
+        "Action": [e["action"] for e in entries],
+        "Contribution": [e["contribution"] for e in entries],
+        "Detail": [e["detail"] for e in entries],
+    }
+
+
+def _audit_static(deck, block):
+    log = audit_log(deck.models["audit"])
+    page = log.page(limit=25)
+    blocks = [{"type": "subheader", "text": "🧾 Audit Trail"},
+              {"type": "markdown", "text": f"**Latest entries** ({len(log):,} in the log)"},
+              {"type": "table", "data": _audit_table(page.entries)}]
+    if page.entries:
+        contribution = page.entries[0]["contribution"]
+        blocks += [{"type": "markdown", "text": f"**History of {contribution}**"},
+                   {"type": "table", "data": _audit_table(log.history(contribution))}]
+    return blocks
+
+
+@widget("audit_trail", static=_audit_static)
+def _audit_trail(deck, block):
+    from compdeck.audit import REVIEW, USERS, WORKFLOW
+    from compdeck.render import render_blocks
+
+    log = audit_log(deck.models["audit"])
+    st.subheader("🧾 Audit Trail")
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+    contribution = col1.text_input("Contribution id", key="audit_contribution").strip() or None
+    user = col2.selectbox("User", ("All",) + USERS, key="audit_user")
+    action = col3.selectbox("Action", ("All",) + tuple(a for a, _ in WORKFLOW + REVIEW), key="audit_action")
+    limit = col4.selectbox("Rows", (25, 50, 100), key="audit_limit")
+    filters = {"contribution": contribution, "user": None if user == "All" else user,
+               "action": None if action == "All" else action}
+
+    # Cursors of the pages above this one; a filter change starts over at the newest page.
+    state = st.session_state.setdefault("audit_pages", {"filters": None, "cursors": [None]})
+    if state["filters"] != (filters, limit):
+        state.update(filters=(filters, limit), cursors=[None])
+    page = log.page(before=state["cursors"][-1], limit=limit, **filters)
+
+    newer, older, _ = st.columns([1, 1, 6])
+    newer.button("◀ Newer", key="audit_newer", disabled=len(state["cursors"]) == 1,
+                 on_click=state["cursors"].pop)
+    older.button("Older ▶", key="audit_older", disabled=page.cursor is None,
+                 on_click=state["cursors"].append, args=(page.cursor,))
+    if page.entries:
+        render_blocks(deck, [{"type": "table", "data": _audit_table(page.entries)}])
+    else:
+        st.info("No audit entries match these filters.")
+    st.caption(f"Page {len(state['cursors'])} of entries matching the filters, newest first · "
+               f"{page.segments_scanned} of {page.segments_total} segments read, "
+               f"{page.rows_examined:,} rows examined · {len(log):,} entries in the log")
+
+
+# -- Partner data -------------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def partner_dataset(spec, jurisdictions):
+    """The ingested partner dataset, seeded with a synthetic partner file when empty."""
+    import os
+
+    from compdeck.compliance import RuleSet
+    from compdeck.ingest import PartnerDataset, write_sample
+
+    dataset = PartnerDataset(spec.root)
+    if not dataset.manifest and spec.sample.rows:
+        path = os.path.join(spec.root, "_incoming", "partner_sample.csv")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_sample(path, spec.sample.rows, RuleSet(jurisdictions), seed=spec.sample.seed,
+                     start=spec.sample.start, days=spec.sample.days)
+        dataset.ingest(path, [j.code for j in jurisdictions], spec.chunk_rows)
+    return dataset
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def partner_accuracy(spec, jurisdictions, states, months, version):
+    """Side-by-side accuracy over the partitions of ``states`` x ``months``.
+
+    ``version`` (the ingested files' hashes) invalidates it when data is added.
+    """
+    from compdeck.compliance import RuleSet
+    from compdeck.ingest import accuracy
+
+    table = partner_dataset(spec, jurisdictions).read(list(states), months)
+    return accuracy(table, RuleSet(jurisdictions)), table.num_rows
+
+
+def _partner_blocks(spec, jurisdictions, states, months):
+    dataset = partner_dataset(spec, jurisdictions)
+    partitions = dataset.partitions()
+    read = [k for k in partitions if k[0] in states and months[0] <= k[1] <= months[1]]
+    table, rows = partner_accuracy(spec, jurisdictions, tuple(states), months, tuple(dataset.manifest))
+    return [
+        {"type": "markdown", "text": "**Ingested partner files**"},
+        {"type": "table", "data": dataset.files()},
+        {"type": "markdown", "text": "**Platform vs. manual determination**"},
+        {"type": "table", "data": table},
+    ], f"Read {len(read)} of {len(partitions)} jurisdiction × month partitions ({rows:,} rows)"
+
+
+def _partner_static(deck, block):
+    spec, jurisdictions = deck.models["ingest"], deck.models["demo"].jurisdictions
+    months = sorted({m for _, m in partner_dataset(spec, jurisdictions).partitions()})
+    blocks, caption = _partner_blocks(spec, jurisdictions, [j.code for j in jurisdictions],
+                                      (months[0], months[-1]) if months else ("", ""))
+    return [{"type": "subheader", "text": "🤝 Side-by-Side Accuracy on Partner Data"}, *blocks,
+            {"type": "markdown", "text": f"*{caption}.*"}]
+
+
+@widget("partner_data", static=_partner_static)
+def _partner_data(deck, block):
+    from compdeck.render import render_blocks
+
+    spec, jurisdictions = deck.models["ingest"], deck.models["demo"].jurisdictions
+    codes = [j.code for j in jurisdictions]
+    st.subheader("🤝 Side-by-Side Accuracy on Partner Data")
+    months = sorted({m for _, m in partner_dataset(spec, jurisdictions).partitions()})
+    if not months:
+        st.info("No partner data yet: `python -m compdeck.ingest FILE.csv` loads a CSV or Excel dump.")
+        return
+    col1, col2 = st.columns([1, 2])
+    states = col1.multiselect("Jurisdictions", codes, default=codes[:1], key="partner_states") or codes
+    first, last = (col2.select_slider("Months", months, value=(months[0], months[-1]), key="partner_months")
+                   if len(months) > 1 else (months[0], months[0]))
+    blocks, caption = _partner_blocks(spec, jurisdictions, states, (first, last))
+    render_blocks(deck, blocks)
+    st.caption(f"{caption}. Load more with `python -m compdeck.ingest FILE.csv`; unchanged files are skipped.")
+
+
+# -- Activity classifier ------------------------------------------------------
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def activity_classifier(spec):
+    """The trained classifier and its held-out accuracy, shared by every session (and worker)."""
+    from compdeck.classify import train
+
+    return shared("classify.train", spec, lambda: train(spec))
+
+
+def _classified_rows(model, records):
+    from compdeck.classify import LABELS
+
+    classified = model.classify(records)
+    return {
+        "Contributor": list(records["contributor"]),
+        "Employer": [e or "—" for e in records["employer"]],
+        "Occupation": [o or "—" for o in records["occupation"]],
+        "Activity": [LABELS[a] for a in classified["activity"]],
+        "Confidence": [f"{c:.2f}" for c in classified["confidence"]],
+    }
+
+
+def _classifier_blocks(deck):
+    import pandas as pd
+
+    model, accuracy = activity_classifier(deck.models["classifier"])
+    samples, results, _ = demo_results(deck.models["demo"])
+    records = pd.DataFrame([{f: results[s.id]["fields"][f] or "" for f in ("contributor", "employer", "occupation")}
+                            for s in samples])
+    table = _classified_rows(model, records)
+    info = model.cache_info()
+    return [{"type": "table", "data": table}], (
+        f"Held-out accuracy {accuracy:.1%} · feature cache {info.currsize:,} strings, "
+        f"hit rate {info.hits / max(info.hits + info.misses, 1):.0%}")
+
+
+def _classifier_static(deck, block):
+    blocks, caption = _classifier_blocks(deck)
+    return [{"type": "subheader", "text": "🏷️ Contributor Activity Classification"}, *blocks,
+            {"type": "markdown", "text": f"*{caption}.*"}]
+
+
+@widget("activity_classifier", static=_classifier_static)
+def _activity_classifier(deck, block):
+    import pandas as pd
+
+    from compdeck.classify import LABELS
+    from compdeck.render import render_blocks
+
+    st.subheader("🏷️ Contributor Activity Classification")
+    blocks, caption = _classifier_blocks(deck)
+    render_blocks(deck, blocks)
+    col1, col2, col3 = st.columns(3)
+    record = {"contributor": col1.text_input("Contributor", "Maria Lopez", key="classify_contributor"),
+              "employer": col2.text_input("Employer", "Capitol Strategies LLC", key="classify_employer"),
+              "occupation": col3.text_input("Occupation", "Government Affairs Director", key="classify_occupation")}
+    model, _ = activity_classifier(deck.models["classifier"])
+    activity, confidence = model.classify(pd.DataFrame([record])).iloc[0]
+    st.success(f"**{LABELS[activity]}** (confidence {confidence:.2f})")
+    st.caption(f"{caption}. Scored offline: no external API calls.")
+
+
+# -- Demo selector ------------------------------------------------------------
+
+def _selector_static(deck, block):
+    return [child for demo in block["demos"]
+            for child in WIDGETS[demo["name"]].static(deck, {"type": "widget", **demo})]
+
+
+@widget("demo_selector", static=_selector_static)
+def _demo_selector(deck, block):
+    """One of ``block["demos"]`` at a time: a rerun renders only the selected demo."""
+    demos = {demo["label"]: demo for demo in block["demos"]}
+    label = st.radio("Live demo", list(demos), key="demo_selector", horizontal=True)
+    demo = demos[label]
+    WIDGETS[demo["name"]].render(deck, {"type": "widget", **demo})